@@ -0,0 +1,361 @@
+"""Asyncio load engine — many in-flight queries per core, no gevent loop.
+
+The Locust users run every query through psycogreen's wait callback on one
+gevent loop per process; a worker saturates its core long before the pooler
+does. This is a separate PROCESS (started by locustfile.AsyncEngineUser, one
+per Locust worker) that drives the same db_tasks workloads through psycopg 3's
+AsyncConnection on a plain asyncio loop:
+
+  closed loop  --concurrency N tasks, each with its own write + read
+               connection, running ops drawn by --mix weights back to back
+  open loop    --open-loop-rps (open_loop.ArrivalSchedule): N tasks = max
+               in flight, latency from the intended send time
+
+db_tasks functions call client.execute_query / execute_transaction and return
+what they return — here a coroutine, so the engine awaits the same function
+the gevent users call. Key ranges (@keys) refresh through a small synchronous
+connection (KeySpace loads synchronously; once per PG_KEYS_REFRESH_S).
+
+Results leave on stdout as JSON lines, one per FLUSH_S:
+
+  {"events": [[request_type, name, ms, length, error, context], …]}
+  {"gen": [cpu_pct, loop_lag_max_ms, gc_ms, gc_count]}        once a second
+
+error is [class name, message] or null. AsyncEngineUser fires each event as
+an ordinary Locust request event and records "gen" like genmon does, so
+stats, HDR, phases, backends and the report keep the gevent users' shape.
+
+Needs psycopg >= 3.1 (requirements.txt); psycopg2 is not used here."""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import signal
+import sys
+import time
+
+import psutil
+import psycopg
+
+import config
+from db_tasks import WORKLOADS
+from open_loop import ArrivalSchedule, parse_rates
+from postgres_session import (FETCH_MODES, ISOLATION_LEVELS, PostgresResponse, Query,
+                              compile_query)
+
+FLUSH_S = 0.05
+LAG_PROBE_S = 0.05
+FAIL_PAUSE_S = 0.1       # after a failed op, as a Locust wait_time would
+_IDENTITY_SQL = "SELECT inet_server_addr()::text, inet_server_port(), pg_is_in_recovery()"
+
+_events = []
+
+
+def _emit(request_type, name, ms, length, exc=None, context=None):
+    _events.append([request_type, name, round(ms, 3), length,
+                    [type(exc).__name__, str(exc).strip()] if exc is not None else None,
+                    context or {}])
+
+
+def _dsn(port):
+    return dict(host=config.PG_HOST, port=port, dbname=config.PG_DATABASE,
+                user=config.PG_USER, password=config.PG_PASSWORD,
+                connect_timeout=config.PG_CONNECT_TIMEOUT, **config.PG_TLS)
+
+
+class KeysClient:
+    """Synchronous session for db_tasks' key-range loader — blocks the loop
+    for one small query per keyspace refresh. Fires PG_QUERY like the gevent
+    sessions do for the same lookup."""
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+        self.conn = None
+
+    def execute_query(self, query, params=None, fetch="keep", **_kw):
+        if not isinstance(query, Query):
+            query = compile_query(query)
+        start = time.perf_counter_ns()
+        try:
+            if self.conn is None or self.conn.closed:
+                self.conn = psycopg.connect(**self.dsn, autocommit=True,
+                                            prepare_threshold=None)
+            with self.conn.cursor() as cur:
+                cur.execute(query.sql, params)
+                rows = cur.fetchall() if cur.description else []
+        except psycopg.Error as exc:
+            _emit("PG_QUERY", query.op, (time.perf_counter_ns() - start) / 1e6, 0, exc)
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+            raise
+        elapsed = (time.perf_counter_ns() - start) / 1e6
+        _emit("PG_QUERY", query.op, elapsed, len(rows))
+        return PostgresResponse(True, elapsed, None, len(rows), rows)
+
+
+class AsyncSession:
+    """The PostgresSession interface on a psycopg 3 AsyncConnection: lazy
+    connect, CONNECT events, PG_QUERY / PG_TXN events with the same phase
+    split and backend tags. Queries go unprepared, as the gevent sessions send
+    them — psycopg's automatic preparation (5th run of a text) is switched
+    off. prepared=True prepares the named queries only; their PREPARE travels
+    with the first execution, so it lands in that call's "execute" phase.
+    fetch "stream" is counted like "count" (no named cursors)."""
+
+    def __init__(self, port, role, keys_client, prepared=False, fetch="count",
+                 identify_every=0):
+        if fetch not in FETCH_MODES:
+            raise ValueError(f"fetch must be one of {FETCH_MODES}, got {fetch!r}")
+        self.dsn = _dsn(port)
+        self.role = role
+        self.keys_client = keys_client
+        self.prepared = prepared
+        self.fetch = fetch
+        self.identify_every = identify_every
+        self.conn = None
+        self.server = None
+        self._since_identify = 0
+
+    def _tags(self):
+        if self.server is None:
+            return {}
+        return {"backend": self.server["addr"], "standby": self.server["standby"]}
+
+    async def _connect(self):
+        start = time.perf_counter_ns()
+        # prepare_threshold: never prepare on repetition; when prepared=True,
+        # prepare=True per call still does (None would refuse even that)
+        self.conn = await psycopg.AsyncConnection.connect(
+            **self.dsn, autocommit=True, prepare_threshold=sys.maxsize if self.prepared else None)
+        took = time.perf_counter_ns() - start
+        _emit("PG", "CONNECT", took / 1e6, 0)
+        return took
+
+    async def _ready(self):
+        """Connection (connecting if needed) → ns spent connecting / identifying."""
+        connect = identify = 0
+        if self.conn is None or self.conn.closed:
+            self.server = None
+            connect = await self._connect()
+        if self.identify_every and (self.server is None
+                                    or self._since_identify >= self.identify_every):
+            start = time.perf_counter_ns()
+            prefix = "/*NO LOAD BALANCE*/ " if self.role == "write" else ""
+            cur = await self.conn.execute(prefix + _IDENTITY_SQL)
+            addr, port, standby = await cur.fetchone()
+            self.server = {"addr": f"{addr}:{port}" if addr else f"local:{port}",
+                           "standby": standby, "timeline": None}
+            self._since_identify = 0
+            identify = time.perf_counter_ns() - start
+        self._since_identify += 1
+        return connect, identify
+
+    def _failed(self, exc):
+        if self.conn is not None and (self.conn.closed or self.conn.broken):
+            self.conn = None
+
+    async def execute_query(self, query, params=None, scheduled_ns=None, fetch=None,
+                            copy=None):
+        entered = time.perf_counter_ns()
+        if not isinstance(query, Query):
+            query = compile_query(query)
+        fetch = fetch or self.fetch
+        try:
+            connect, identify = await self._ready()
+            rows = []
+            async with self.conn.cursor() as cur:
+                started = time.perf_counter_ns()
+                if copy is not None:
+                    copy.seek(0)
+                    async with cur.copy(query.sql) as pipe:
+                        await pipe.write(copy.read())
+                    executed = time.perf_counter_ns()
+                    length = max(cur.rowcount, 0)
+                else:
+                    await cur.execute(query.sql, params,
+                                      prepare=bool(self.prepared and query.name))
+                    executed = time.perf_counter_ns()
+                    if cur.description and fetch == "keep":
+                        rows = await cur.fetchall()
+                        length = len(rows)
+                    else:
+                        length = max(cur.rowcount, 0)
+            fetched = time.perf_counter_ns()
+        except Exception as exc:
+            elapsed = (time.perf_counter_ns() - (entered if scheduled_ns is None
+                                                 else scheduled_ns)) / 1e6
+            _emit("PG_QUERY", query.op, elapsed, 0, exc, self._tags())
+            self._failed(exc)
+            raise
+        elapsed = (fetched - (started if scheduled_ns is None else scheduled_ns)) / 1e6
+        split = {}
+        if scheduled_ns is not None:
+            split["queue"] = max(entered - scheduled_ns, 0) / 1e6
+        split.update({"pool_wait": 0.0, "connect": connect / 1e6, "prepare": 0.0,
+                      "identify": identify / 1e6, "execute": (executed - started) / 1e6,
+                      "fetch": (fetched - executed) / 1e6,
+                      "overhead": max((fetched - entered) - (fetched - started)
+                                      - connect - identify, 0) / 1e6})
+        _emit("PG_QUERY", query.op, elapsed, length, None, {"phases": split, **self._tags()})
+        return PostgresResponse(True, elapsed, None, length, rows, self.server)
+
+    async def execute_transaction(self, name, statements, params=None,
+                                  isolation="read_committed", retries=0, scheduled_ns=None):
+        begin = f"BEGIN ISOLATION LEVEL {ISOLATION_LEVELS[isolation]}"
+        origin = time.perf_counter_ns() if scheduled_ns is None else scheduled_ns
+        attempt = 0
+        while True:
+            attempt_start = time.perf_counter_ns()
+            try:
+                await self._ready()
+                length = 0
+                async with self.conn.cursor() as cur:
+                    await cur.execute(begin)
+                    for query in statements:
+                        await cur.execute(query.sql, params,
+                                          prepare=bool(self.prepared and query.name))
+                        length += max(cur.rowcount, 0)
+                    await cur.execute("COMMIT")
+                elapsed = (time.perf_counter_ns() - origin) / 1e6
+                _emit("PG_TXN", name, elapsed, length, None,
+                      {"attempts": attempt + 1, **self._tags()})
+                return PostgresResponse(True, elapsed, None, length, None, self.server)
+            except psycopg.errors.TransactionRollback as exc:
+                await self._rollback()
+                _emit("PG_TXN", f"{name} ABORT",
+                      (time.perf_counter_ns() - attempt_start) / 1e6, 0, exc, self._tags())
+                if attempt < retries:
+                    attempt += 1
+                    continue
+                _emit("PG_TXN", name, (time.perf_counter_ns() - origin) / 1e6, 0, exc,
+                      self._tags())
+                raise
+            except Exception as exc:
+                await self._rollback()
+                _emit("PG_TXN", name, (time.perf_counter_ns() - origin) / 1e6, 0, exc,
+                      self._tags())
+                self._failed(exc)
+                raise
+
+    async def _rollback(self):
+        if self.conn is None or self.conn.closed or self.conn.broken:
+            return
+        try:
+            await self.conn.execute("ROLLBACK")
+        except Exception:
+            pass
+
+    async def close(self):
+        if self.conn is not None:
+            await self.conn.close()
+            self.conn = None
+
+
+async def _lane(sessions, pick, schedule, stop):
+    """One in-flight request at a time, forever (until stop)."""
+    while not stop.is_set():
+        kw = {}
+        if schedule is not None:
+            op, due = schedule.next_slot()
+            delay = due - time.perf_counter_ns()
+            if delay > 0:
+                await asyncio.sleep(delay / 1e9)
+            kw["scheduled_ns"] = due
+        else:
+            op = pick()
+        fn, role = WORKLOADS[op]
+        try:
+            await fn(sessions[role], **kw)
+        except Exception:
+            if schedule is None:
+                await asyncio.sleep(FAIL_PAUSE_S)
+    for session in sessions.values():
+        await session.close()
+
+
+async def _flush(stop):
+    out = sys.stdout
+    while True:
+        if _events:
+            batch = _events[:]
+            del _events[:]
+            try:
+                out.write(json.dumps({"events": batch}) + "\n")
+                out.flush()
+            except BrokenPipeError:      # the Locust side went away
+                stop.set()
+                return
+        if stop.is_set():
+            return
+        await asyncio.sleep(FLUSH_S)
+
+
+async def _monitor(stop):
+    """genmon's per-second row for this process: CPU, loop lag, GC."""
+    proc = psutil.Process()
+    proc.cpu_percent(None)
+    gc_state = {"ms": 0.0, "n": 0, "t": None}
+
+    def on_gc(phase, _info):
+        if phase == "start":
+            gc_state["t"] = time.perf_counter()
+        elif gc_state["t"] is not None:
+            gc_state["ms"] += (time.perf_counter() - gc_state["t"]) * 1000
+            gc_state["n"] += 1
+            gc_state["t"] = None
+
+    gc.callbacks.append(on_gc)
+    lag_max, next_row = 0.0, time.monotonic() + 1
+    while not stop.is_set():
+        asked = time.perf_counter()
+        await asyncio.sleep(LAG_PROBE_S)
+        lag_max = max(lag_max, (time.perf_counter() - asked - LAG_PROBE_S) * 1000)
+        if time.monotonic() >= next_row:
+            next_row += 1
+            sys.stdout.write(json.dumps({"gen": [proc.cpu_percent(None), round(lag_max, 2),
+                                                 round(gc_state["ms"], 2), gc_state["n"]]})
+                             + "\n")
+            sys.stdout.flush()
+            lag_max, gc_state["ms"], gc_state["n"] = 0.0, 0.0, 0
+
+
+async def run(concurrency, mix, open_loop_rps):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    weights = parse_rates(mix) or {"read_simple": 5, "write_simple": 1}
+    unknown = set(weights) - set(WORKLOADS)
+    if unknown:
+        raise SystemExit(f"--mix: unknown ops {sorted(unknown)}; known: {sorted(WORKLOADS)}")
+    ops, w = list(weights), list(weights.values())
+    schedule = ArrivalSchedule(parse_rates(open_loop_rps)) if open_loop_rps else None
+    keys = KeysClient(_dsn(config.PG_READ_PORT))
+    common = dict(keys_client=keys, prepared=config.PG_PREPARED, fetch=config.PG_FETCH_MODE,
+                  identify_every=config.PG_BACKEND_SAMPLE_EVERY)
+    lanes = [_lane({"write": AsyncSession(config.PG_WRITE_PORT, "write", **common),
+                    "read": AsyncSession(config.PG_READ_PORT, "read", **common)},
+                   lambda: random.choices(ops, w)[0], schedule, stop)
+             for _ in range(concurrency)]
+    flusher = asyncio.create_task(_flush(stop))
+    monitor = asyncio.create_task(_monitor(stop))
+    await asyncio.gather(*lanes, return_exceptions=True)
+    await monitor
+    await flusher
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="in-flight requests (tasks, each with its own connections)")
+    parser.add_argument("--mix", default="", help="op weights, e.g. read_simple=5,write_simple=1")
+    parser.add_argument("--open-loop-rps", default="",
+                        help="open loop instead: per-op arrival rates of this process")
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.mix, args.open_loop_rps))
+
+
+if __name__ == "__main__":
+    main()
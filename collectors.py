@@ -0,0 +1,109 @@
+"""Background samplers for run_scenarios.py.
+
+The scenario loop used to poll Locust stats, then Patroni (get_members tries
+every node with a 3 s timeout) one after the other, every 2 s. During a
+leader crash the Patroni calls stall, the loop stalls with them and the "2 s"
+timeline stretches exactly when precision matters.
+
+Here every source runs in its own daemon thread on a fixed clock: tick k is
+due at t0 + k * interval, whatever the previous call cost. A call that
+overruns its tick makes the sampler skip the ticks it missed (counted) rather
+than fire a burst to catch up, and stalls only that one source. Every sample
+is stamped with the monotonic time it was ACQUIRED (the call returned), not
+the time it was due; the runner merges the series into one timeline
+afterwards (as_of).
+
+Nothing here knows about Locust or Patroni — run_scenarios passes callables."""
+import bisect
+import threading
+import time
+
+
+class Sampler(threading.Thread):
+    """Call `fn()` every `interval` seconds; keep (t, value) samples, t in
+    seconds since `t0` (time.monotonic base shared by all samplers of a run).
+    A call that raises or returns None records nothing."""
+
+    def __init__(self, name, fn, interval, t0=None):
+        super().__init__(name=f"sampler-{name}", daemon=True)
+        self.source = name
+        self.fn = fn
+        self.interval = interval
+        self.t0 = t0 if t0 is not None else time.monotonic()
+        self.samples = []
+        self.errors = 0
+        self.missed = 0
+        self._halt = threading.Event()
+
+    def run(self):
+        k = 0
+        while not self._halt.is_set():
+            try:
+                value = self.fn()
+            except Exception:
+                value = None
+                self.errors += 1
+            t = time.monotonic() - self.t0
+            if value is not None:
+                self.samples.append((t, value))
+            # next tick on the fixed grid; ticks already in the past are skipped
+            k += 1
+            behind = int(t // self.interval) + 1
+            if behind > k:
+                self.missed += behind - k
+                k = behind
+            self._halt.wait(max(self.t0 + k * self.interval - time.monotonic(), 0))
+        # a source holding a resource (connection) releases it on its own thread
+        close = getattr(self.fn, "close", None)
+        if close is not None:
+            close()
+
+    def stop(self, timeout=None):
+        self._halt.set()
+        self.join(timeout)
+
+    def drop_before(self, t):
+        """Forget samples acquired before t, keeping the newest of them (the
+        as_of value at t) — bounds memory for open-ended runs."""
+        i = bisect.bisect_left([s[0] for s in self.samples], t)
+        if i > 1:
+            del self.samples[:i - 1]
+
+    def health(self):
+        """Sample count, failed calls, skipped ticks and largest gap (s)."""
+        ts = [t for t, _ in self.samples]
+        gaps = [b - a for a, b in zip(ts, ts[1:])]
+        return {"interval_s": self.interval, "samples": len(ts), "errors": self.errors,
+                "missed_ticks": self.missed,
+                "max_gap_s": round(max(gaps), 2) if gaps else None}
+
+
+def start_all(samplers):
+    for s in samplers.values():
+        s.start()
+    return samplers
+
+
+def stop_all(samplers, timeout=5):
+    """Signal every sampler first, then join — a stalled call delays at most
+    one join, not the sum of them."""
+    for s in samplers.values():
+        s._halt.set()
+    for s in samplers.values():
+        s.join(timeout)
+
+
+def rate(samples, t):
+    """Per-second change of a counter between the last two samples acquired
+    at or before t (None until there are two)."""
+    i = bisect.bisect_right([s[0] for s in samples], t)
+    if i < 2:
+        return None
+    (t0, v0), (t1, v1) = samples[i - 2], samples[i - 1]
+    return (v1 - v0) / max(t1 - t0, 1e-6)
+
+
+def as_of(samples, t, default=None):
+    """Value of the latest sample acquired at or before t."""
+    i = bisect.bisect_right([s[0] for s in samples], t)
+    return samples[i - 1][1] if i else default
@@ -14,9 +14,79 @@ PG_PASSWORD      = os.getenv("PG_PASSWORD",      "ChangeMe_Postgres1")
 PG_WRITE_PORT    = int(os.getenv("PG_WRITE_PORT", "9999"))
 PG_READ_PORT     = int(os.getenv("PG_READ_PORT",  "9999"))
 PG_CONNECT_TIMEOUT = int(os.getenv("PG_CONNECT_TIMEOUT", "3"))
+# TLS / auth of every connection — libpq keywords, empty = libpq's default:
+#   PG_SSLMODE            disable | allow | prefer | require | verify-ca | verify-full
+#   PG_SSLROOTCERT        CA file for verify-ca / verify-full
+#   PG_SSLCERT, PG_SSLKEY client certificate + key (pg_hba "cert" / clientcert=…)
+#   PG_CHANNEL_BINDING    disable | prefer | require (SCRAM-SHA-256-PLUS, needs TLS)
+PG_SSLMODE         = os.getenv("PG_SSLMODE", "")
+PG_SSLROOTCERT     = os.getenv("PG_SSLROOTCERT", "")
+PG_SSLCERT         = os.getenv("PG_SSLCERT", "")
+PG_SSLKEY          = os.getenv("PG_SSLKEY", "")
+PG_CHANNEL_BINDING = os.getenv("PG_CHANNEL_BINDING", "")
+PG_TLS = {k: v for k, v in (("sslmode", PG_SSLMODE), ("sslrootcert", PG_SSLROOTCERT),
+                            ("sslcert", PG_SSLCERT), ("sslkey", PG_SSLKEY),
+                            ("channel_binding", PG_CHANNEL_BINDING)) if v}
+# HandshakeUser: connection profiles measured side by side, each as its own
+# "CONNECT <name>" event — "name:key=value,key=value;name:…" with libpq
+# keywords on top of PG_TLS (a profile with no keywords = PG_TLS as is).
+PG_AUTH_PROFILES = os.getenv("PG_AUTH_PROFILES", "plain:sslmode=disable;tls:sslmode=require")
+# What a session does after losing its connection (postgres_session.ReconnectPolicy):
+#   immediate (default) → reconnect on the next call
+#   backoff             → exponential backoff with full jitter, BASE_MS doubling up to MAX_MS
+#   breaker             → after PG_BREAKER_FAILURES connection errors fail fast for
+#                         PG_BREAKER_OPEN_MS, then one trial connect
+# Scenarios may override the policy per run (reconnect_policy → --reconnect-policy).
+PG_RECONNECT_POLICY  = os.getenv("PG_RECONNECT_POLICY", "immediate")
+PG_RECONNECT_BASE_MS = float(os.getenv("PG_RECONNECT_BASE_MS", "50"))
+PG_RECONNECT_MAX_MS  = float(os.getenv("PG_RECONNECT_MAX_MS", "5000"))
+PG_BREAKER_FAILURES  = int(os.getenv("PG_BREAKER_FAILURES", "3"))
+PG_BREAKER_OPEN_MS   = float(os.getenv("PG_BREAKER_OPEN_MS", "2000"))
+# PG_PREPARED=1 → workload queries are PREPAREd once per connection and run via
+# EXECUTE (no per-call parse/plan); re-prepared automatically after reconnect.
+PG_PREPARED = os.getenv("PG_PREPARED", "").lower() in ("1", "true", "yes")
+# Result rows are never read by the Locust users. PG_FETCH_MODE:
+#   count  (default) → report row counts only, no Python tuples per row
+#   stream           → SELECTs via a server-side cursor, PG_STREAM_ITERSIZE rows/fetch
+#   keep             → fetchall() into the response (debugging custom SQL)
+PG_FETCH_MODE      = os.getenv("PG_FETCH_MODE", "count")
+PG_STREAM_ITERSIZE = int(os.getenv("PG_STREAM_ITERSIZE", "2000"))
+# Connection topology for the workload users (FailoverProbe always keeps its own):
+#   per_user (default) → every user opens its own write + read connection
+#   pooled             → users borrow from one bounded write pool and one read
+#                        pool per worker process, PG_POOL_SIZE connections each
+PG_CONNECTION_MODE = os.getenv("PG_CONNECTION_MODE", "per_user")
+PG_POOL_SIZE       = int(os.getenv("PG_POOL_SIZE", "20"))
+PG_POOL_TIMEOUT    = float(os.getenv("PG_POOL_TIMEOUT", "5"))
+# Backend identification: each session asks which server answers it
+# (inet_server_addr, pg_is_in_recovery, timeline) after every connect and then
+# every N queries — per-backend throughput/latency in the report. 0 = off.
+PG_BACKEND_SAMPLE_EVERY = int(os.getenv("PG_BACKEND_SAMPLE_EVERY", "100"))
+
+# Keys for parameterized sql files (-- @keys …, see keygen.py): distribution
+# uniform | zipfian | hotspot | recent, and how often each process re-reads
+# the key range (sql/keys_<space>.sql).
+PG_KEY_DIST       = os.getenv("PG_KEY_DIST", "uniform")
+PG_ZIPF_THETA     = float(os.getenv("PG_ZIPF_THETA", "0.99"))
+PG_KEY_HOTSPOT    = tuple(float(x) for x in os.getenv("PG_KEY_HOTSPOT", "0.2,0.8").split(","))
+PG_KEY_RECENT_N   = int(os.getenv("PG_KEY_RECENT_N", "1000"))
+PG_KEYS_REFRESH_S = float(os.getenv("PG_KEYS_REFRESH_S", "30"))
+
+# BulkIngestUser: rows per round-trip and how they are sent —
+#   insert (multi-row INSERT … VALUES) | copy (COPY FROM STDIN) | alternate
+PG_BULK_BATCH = int(os.getenv("PG_BULK_BATCH", "500"))
+PG_BULK_MODE  = os.getenv("PG_BULK_MODE", "alternate")
+
+# Transaction workloads (sql/txn_*.sql): override every file's @txn isolation
+# (read_committed | repeatable_read | serializable) and serialization retries.
+PG_TXN_ISOLATION = os.getenv("PG_TXN_ISOLATION", "")
+PG_TXN_RETRIES   = os.getenv("PG_TXN_RETRIES", "")
 
 # ── SQL files ────────────────────────────────────────────────────────────────
 SQL_DIR = os.getenv("SQL_DIR", os.path.join(_HERE, "sql"))
+# Re-stat each sql file at most every N seconds and reload it when its content
+# changed (edits apply to running workers); 0 = load once at startup.
+PG_SQL_RELOAD_S = float(os.getenv("PG_SQL_RELOAD_S", "2"))
 
 # ── Locust web server ────────────────────────────────────────────────────────
 LOCUST_WEB_HOST = os.getenv("LOCUST_WEB_HOST", "0.0.0.0")
@@ -24,6 +94,15 @@ LOCUST_WEB_PORT = int(os.getenv("LOCUST_WEB_PORT", "8089"))
 
 # ── Report output ────────────────────────────────────────────────────────────
 REPORTS_DIR = os.getenv("REPORTS_DIR", os.path.join(_HERE, "reports"))
+# FailoverProbe per-request event log (probe_log.py). Must be a directory the
+# runner can read — shared volume when workers run in containers.
+PROBE_LOG_DIR = os.getenv("PROBE_LOG_DIR", os.path.join(REPORTS_DIR, "probe"))
+# Replication lag: pg_stat_replication on the primary, polled this many times
+# per second over one persistent connection (per replica, bytes and seconds).
+PG_REPL_LAG_HZ = float(os.getenv("PG_REPL_LAG_HZ", "4"))
+# Server counters (pgstats.py) are snapshotted before and after every scenario;
+# N > 0 also samples them every N seconds for a server-TPS / lock-wait series.
+PG_SERVER_STATS_S = float(os.getenv("PG_SERVER_STATS_S", "0"))
 
 # ── Standalone mode ──────────────────────────────────────────────────────────
 # STANDALONE=1 → benchmark ANY PostgreSQL (a single server, RDS, another
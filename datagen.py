@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+datagen.py — grow the DM schema to a target dataset size, fast.
+
+Usage:
+    python datagen.py --devices 4000000 [--jobs 8]
+    python datagen.py --target-gb 10    [--jobs 8]
+    python datagen.py --restore-constraints       # after a killed run
+
+seed.sql only inserts reference rows, so every scenario used to run against
+a dataset that fits in shared_buffers. This fills every DM table with
+realistic FK fan-out per device:
+
+    Device ─┬─ 3 DeviceItem ── 2 DeviceSpec each
+            ├─ 4 DeviceItemHistory, 1 SimCard, 1 DeviceConfig
+            └─ → Representation → Address → City → Province
+    DeviceItem → Manufacturer, DeviceConfig → DeviceConfigTemplate (+ items)
+
+How it stays in minutes for 10 GB:
+  * secondary indexes and FK constraints of "DM" are dropped first (their
+    definitions saved from the catalog to --constraints-file BEFORE anything
+    is dropped) and rebuilt after the load, in parallel, one statement per
+    connection — a sorted build instead of per-row index maintenance and FK
+    trigger checks;
+  * ids are assigned client-side from disjoint ranges above the current max,
+    so --jobs processes stream COPY in parallel without coordinating; the
+    identity sequences are moved past the new max at the end;
+  * rows are formatted straight into COPY text buffers (pre-built timestamp
+    pool, no per-row datetime / tuple objects).
+
+The run is additive: it appends above existing ids, so re-running grows the
+dataset further. Constraints are always rebuilt, also after a failed load;
+the file is removed once every one of them exists again. A run that died
+without rebuilding (SIGKILL, OOM, host loss) leaves the file behind: the next
+load refuses to start until `--restore-constraints` has put them back.
+Tables stay logged — standbys receive the whole dataset through WAL.
+
+Connects with the PG_* settings (PgPool write port by default); nothing
+here imports gevent or psycogreen, so COPY runs in blocking mode.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import psycopg2
+
+import config
+
+# rows per device of the device-dependent tables
+ITEMS_PER_DEVICE   = 3
+SPECS_PER_ITEM     = 2
+HISTORY_PER_DEVICE = 4
+
+# dimension rows per generated device (at least the floor)
+DIMENSIONS = {                   # table: (devices per row, minimum rows)
+    "Address":        (20,   100),
+    "Representation": (200,  50),
+    "Manufacturer":   (2000, 50),
+}
+PROVINCES, CITIES_PER_PROVINCE = 31, 10
+TEMPLATES, ITEMS_PER_TEMPLATE = 50, 10
+
+# heap + PK + secondary indexes per device incl. its fan-out; --target-gb
+# divides by this. Each run prints the measured value to refine it.
+BYTES_PER_DEVICE = 2600
+
+CHUNK_DEVICES = 20000            # devices per COPY batch (one job task)
+
+_NULL = "\\N"                   # COPY text NULL
+
+_TABLES = ("Province", "City", "Address", "Representation", "Manufacturer",
+           "DeviceConfigTemplate", "DeviceConfigTemplateItem", "Device", "DeviceItem",
+           "DeviceSpec", "SimCard", "DeviceItemHistory", "DeviceConfig")
+
+
+def _dsn(args):
+    return dict(host=args.host, port=args.port, dbname=config.PG_DATABASE,
+                user=config.PG_USER, password=config.PG_PASSWORD,
+                connect_timeout=config.PG_CONNECT_TIMEOUT, **config.PG_TLS)
+
+
+def _connect(dsn):
+    conn = psycopg2.connect(**dsn)
+    conn.autocommit = True
+    return conn
+
+
+def _sql_file(name):
+    with open(os.path.join(config.SQL_DIR, f"{name}.sql")) as fh:
+        return fh.read()
+
+
+# ── row formatting ───────────────────────────────────────────────────────────
+
+def _timestamps(n=4096, days=730, seed=0):
+    """Pool of COPY-ready timestamptz strings spread over the last `days`."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    return [(now - timedelta(seconds=rng.randrange(days * 86400))).isoformat(sep=" ")
+            for _ in range(n)]
+
+
+def _copy_rows(cur, table, columns, lines, totals):
+    """COPY one batch of pre-formatted text lines into "DM".<table>."""
+    data = "".join(lines).encode()
+    rows = data.count(b"\n")
+    if rows:
+        cur.copy_expert(f'COPY "DM"."{table}" (' + ", ".join(f'"{c}"' for c in columns)
+                        + ") FROM STDIN", io.BytesIO(data), size=1 << 20)
+    t = totals.setdefault(table, [0, 0])
+    t[0] += rows
+    t[1] += len(data)
+
+
+# ── plan ─────────────────────────────────────────────────────────────────────
+
+def _max_ids(cur):
+    ids = {}
+    for table in _TABLES:
+        cur.execute(f'SELECT COALESCE(MAX("Id"), 0) FROM "DM"."{table}"')
+        ids[table] = cur.fetchone()[0]
+    return ids
+
+
+def _plan(devices, base):
+    """Disjoint new id range per table: {table: (first_id, count)}."""
+    counts = {
+        "Province": PROVINCES,
+        "City": PROVINCES * CITIES_PER_PROVINCE,
+        "DeviceConfigTemplate": TEMPLATES,
+        "DeviceConfigTemplateItem": TEMPLATES * ITEMS_PER_TEMPLATE,
+        "Device": devices,
+        "DeviceItem": devices * ITEMS_PER_DEVICE,
+        "DeviceSpec": devices * ITEMS_PER_DEVICE * SPECS_PER_ITEM,
+        "SimCard": devices,
+        "DeviceItemHistory": devices * HISTORY_PER_DEVICE,
+        "DeviceConfig": devices,
+    }
+    for table, (per, floor) in DIMENSIONS.items():
+        counts[table] = max(devices // per, floor)
+    return {t: (base[t] + 1, counts[t]) for t in _TABLES}
+
+
+# ── dimension tables (single connection, small) ──────────────────────────────
+
+def _load_dimensions(cur, plan, totals, ts):
+    rng = random.Random(1)
+    n_ts = len(ts)
+    p0, np_ = plan["Province"]
+    _copy_rows(cur, "Province", ("Id", "Title", "CreationDate", "IsDeleted"),
+               (f"{p0 + i}\tProvince_{p0 + i}\t{ts[i % n_ts]}\tf\n" for i in range(np_)),
+               totals)
+    c0, nc = plan["City"]
+    _copy_rows(cur, "City", ("Id", "Title", "ProvinceId", "CreationDate", "IsDeleted"),
+               (f"{c0 + i}\tCity_{c0 + i}\t{p0 + i // CITIES_PER_PROVINCE}\t{ts[i % n_ts]}\tf\n"
+                for i in range(nc)), totals)
+    a0, na = plan["Address"]
+
+    def addresses():
+        for i in range(na):
+            city = rng.randrange(nc)
+            yield (f"{a0 + i}\tAddr_{a0 + i}\t{rng.randrange(10 ** 10):010d}\t"
+                   f"{9000000000 + rng.randrange(999999999)}\t021{rng.randrange(10 ** 8):08d}\t"
+                   f"addr{a0 + i}@example.com\t02100000000\t{p0 + city // CITIES_PER_PROVINCE}\t"
+                   f"{c0 + city}\t{ts[rng.randrange(n_ts)]}\tf\n")
+    _copy_rows(cur, "Address", ("Id", "Detail", "PostalCode", "Mobile", "Phone", "Email", "Fax",
+                                "ProvinceId", "CityId", "CreationDate", "IsDeleted"),
+               addresses(), totals)
+    r0, nr = plan["Representation"]
+    _copy_rows(cur, "Representation", ("Id", "Name", "Activated", "AddressId",
+                                       "CreationDate", "IsDeleted"),
+               (f"{r0 + i}\tRep_{r0 + i}\tt\t{a0 + rng.randrange(na)}\t{ts[rng.randrange(n_ts)]}\tf\n"
+                for i in range(nr)), totals)
+    m0, nm = plan["Manufacturer"]
+    _copy_rows(cur, "Manufacturer", ("Id", "Name", "ParentId", "AddressId",
+                                     "CreationDate", "IsDeleted"),
+               (f"{m0 + i}\tManu_{m0 + i}\t{m0 + rng.randrange(i) if i and rng.random() < .3 else _NULL}"
+                f"\t{a0 + rng.randrange(na)}\t{ts[rng.randrange(n_ts)]}\tf\n"
+                for i in range(nm)), totals)
+    t0, nt = plan["DeviceConfigTemplate"]
+    _copy_rows(cur, "DeviceConfigTemplate", ("Id", "Name", "OsVersion", "FreameverVersion",
+                                             "BootLoaderVersion", "StartTime", "EndTime",
+                                             "CreationDate", "IsDeleted"),
+               (f"{t0 + i}\tTpl_{t0 + i}\t{i % 9}.{i % 7}\t{i % 5}.{i % 11}\t1.{i % 3}\t"
+                f"{ts[i % n_ts]}\t{ts[(i + 1) % n_ts]}\t{ts[i % n_ts]}\tf\n"
+                for i in range(nt)), totals)
+    ti0, nti = plan["DeviceConfigTemplateItem"]
+    _copy_rows(cur, "DeviceConfigTemplateItem", ("Id", "Name", "Value", "DeviceConfigTemplateId",
+                                                 "CreationDate", "IsDeleted"),
+               (f"{ti0 + i}\tkey_{i % ITEMS_PER_TEMPLATE}\tval_{i}\t{t0 + i // ITEMS_PER_TEMPLATE}\t"
+                f"{ts[i % n_ts]}\tf\n" for i in range(nti)), totals)
+
+
+# ── device chunks (parallel jobs) ────────────────────────────────────────────
+
+def _load_chunk(task):
+    """Worker process: COPY devices [start, start+count) of the plan and all
+    their dependent rows. Returns {table: [rows, bytes]}."""
+    dsn, plan, start, count, seed = task
+    rng = random.Random(seed)
+    ts = _timestamps(seed=seed)
+    n_ts = len(ts)
+    d0 = plan["Device"][0] + start
+    r0, nr = plan["Representation"]
+    m0, nm = plan["Manufacturer"]
+    t0, nt = plan["DeviceConfigTemplate"]
+    i0 = plan["DeviceItem"][0] + start * ITEMS_PER_DEVICE
+    s0 = plan["DeviceSpec"][0] + start * ITEMS_PER_DEVICE * SPECS_PER_ITEM
+    sc0 = plan["SimCard"][0] + start
+    h0 = plan["DeviceItemHistory"][0] + start * HISTORY_PER_DEVICE
+    cf0 = plan["DeviceConfig"][0] + start
+    reps = [r0 + rng.randrange(nr) for _ in range(count)]
+    totals = {}
+    conn = _connect(dsn)
+    try:
+        cur = conn.cursor()
+
+        def devices():
+            for i in range(count):
+                t = ts[rng.randrange(n_ts)]
+                yield (f"{d0 + i}\t{rng.getrandbits(40)}\t{rng.randint(1, 5)}\t{rng.randrange(5000)}\t"
+                       f"{t}\tt\t{reps[i]}\t{reps[i]}\t{t}\t{_NULL}\tf\n")
+        _copy_rows(cur, "Device", ("Id", "EntityId", "DeviceStatus", "UserInstallerId",
+                                   "InstallationDate", "Activated", "RepresentationId",
+                                   "RepresentationInstallerId", "CreationDate",
+                                   "ModificationDate", "IsDeleted"), devices(), totals)
+
+        def items():
+            for k in range(count * ITEMS_PER_DEVICE):
+                i = k // ITEMS_PER_DEVICE
+                t = ts[rng.randrange(n_ts)]
+                yield (f"{i0 + k}\tItem_{k % ITEMS_PER_DEVICE}\t{k % ITEMS_PER_DEVICE}\t"
+                       f"v{rng.randrange(20)}\tSN{rng.getrandbits(48):012x}\t{rng.randrange(12)}.0\t"
+                       f"{rng.randrange(9)}.{rng.randrange(20)}\t1.{rng.randrange(5)}\t"
+                       f"r{rng.randrange(4)}\t{rng.getrandbits(50):015d}\t{_NULL}\t{t}\t{t}\t"
+                       f"{rng.randrange(5000)}\t{rng.randint(1, 4)}\tt\t{d0 + i}\t{reps[i]}\t"
+                       f"{reps[i]}\t{m0 + rng.randrange(nm)}\t{t}\t{_NULL}\tf\n")
+        _copy_rows(cur, "DeviceItem", ("Id", "Name", "DeviceItemType", "Version", "SerialNo",
+                                       "OsVersion", "FirmwareVersion", "BootLoaderVersion",
+                                       "BoardVersion", "IMEI1", "IMEI2", "ProductionDate",
+                                       "InstallationDate", "UserInstallerId", "DeviceItemStatus",
+                                       "Activated", "DeviceId", "RepresentationId",
+                                       "RepresentationInstallerId", "ManufacturerId",
+                                       "CreationDate", "ModificationDate", "IsDeleted"),
+                   items(), totals)
+
+        _copy_rows(cur, "DeviceSpec", ("Id", "DeviceItemSpecType", "SpecValue", "DeviceItemId",
+                                       "CreationDate", "IsDeleted"),
+                   (f"{s0 + k}\t{k % SPECS_PER_ITEM}\tspec_{rng.randrange(1000)}\t"
+                    f"{i0 + k // SPECS_PER_ITEM}\t{ts[rng.randrange(n_ts)]}\tf\n"
+                    for k in range(count * ITEMS_PER_DEVICE * SPECS_PER_ITEM)), totals)
+
+        _copy_rows(cur, "SimCard", ("Id", "Number", "Serial", "NetworkOperatorType", "Activated",
+                                    "RepresentationId", "DeviceId", "CreationDate", "IsDeleted"),
+                   (f"{sc0 + i}\t{9000000000 + rng.randrange(999999999)}\t"
+                    f"{rng.getrandbits(64):016x}\t{('MCI', 'MTN', 'RTL')[i % 3]}\tt\t{reps[i]}\t"
+                    f"{d0 + i}\t{ts[rng.randrange(n_ts)]}\tf\n" for i in range(count)), totals)
+
+        _copy_rows(cur, "DeviceItemHistory", ("Id", "Title", "Action", "EntityId", "UserId", "Date",
+                                              "DeviceItemId", "DeviceId", "RepresentationId",
+                                              "CreationDate", "IsDeleted"),
+                   (f"{h0 + k}\tHist_{k % HISTORY_PER_DEVICE}\t"
+                    f"{('install', 'update', 'repair', 'inspect')[k % 4]}\t{rng.getrandbits(40)}\t"
+                    f"{rng.randrange(5000)}\t{ts[rng.randrange(n_ts)]}\t"
+                    f"{i0 + (k // HISTORY_PER_DEVICE) * ITEMS_PER_DEVICE + rng.randrange(ITEMS_PER_DEVICE)}\t"
+                    f"{d0 + k // HISTORY_PER_DEVICE}\t{reps[k // HISTORY_PER_DEVICE]}\t"
+                    f"{ts[rng.randrange(n_ts)]}\tf\n"
+                    for k in range(count * HISTORY_PER_DEVICE)), totals)
+
+        _copy_rows(cur, "DeviceConfig", ("Id", "ConfigHex", "DeviceId", "DeviceConfigTemplateId",
+                                         "CreationDate", "IsDeleted"),
+                   (f"{cf0 + i}\t{rng.getrandbits(256):064x}\t{d0 + i}\t{t0 + rng.randrange(nt)}\t"
+                    f"{ts[rng.randrange(n_ts)]}\tf\n" for i in range(count)), totals)
+    finally:
+        conn.close()
+    return totals
+
+
+# ── constraints ──────────────────────────────────────────────────────────────
+# {"indexes": [[name, create, drop], …], "fks": [[table, name, alter, drop], …]}
+# is written (fsync'd) to the constraints file before the first DROP and
+# removed only after the rebuild — the catalog must never be the only copy.
+
+def _save_constraints(cur, path):
+    """Definitions of schema DM's FKs and secondary indexes, written to `path`."""
+    cur.execute("""
+        SELECT conrelid::regclass::text, conname,
+               format('ALTER TABLE %s ADD CONSTRAINT %I %s', conrelid::regclass, conname,
+                      pg_get_constraintdef(oid)),
+               format('ALTER TABLE %s DROP CONSTRAINT %I', conrelid::regclass, conname)
+        FROM pg_constraint
+        WHERE contype = 'f' AND connamespace = '"DM"'::regnamespace""")
+    fks = [list(r) for r in cur.fetchall()]
+    cur.execute("""
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid),
+               format('DROP INDEX %s', i.indexrelid::regclass)
+        FROM pg_index i JOIN pg_class c ON c.oid = i.indrelid
+        WHERE c.relnamespace = '"DM"'::regnamespace
+          AND NOT i.indisprimary AND NOT i.indisunique""")
+    saved = {"indexes": [list(r) for r in cur.fetchall()], "fks": fks}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(saved, fh, indent=2)
+        fh.flush()
+        os.fsync(fh.fileno())
+    return saved
+
+
+def _drop_constraints(cur, saved):
+    for *_, drop in saved["fks"] + saved["indexes"]:
+        cur.execute(drop)
+
+
+def _missing(cur, saved):
+    """CREATE INDEX / ADD CONSTRAINT statements of `saved` whose object does
+    not exist (a restore after a partial drop or rebuild skips the rest)."""
+    indexes = []
+    for name, create, _ in saved["indexes"]:
+        cur.execute("SELECT to_regclass(%s)", (name,))
+        if cur.fetchone()[0] is None:
+            indexes.append(create)
+    fks = []
+    for table, name, alter, _ in saved["fks"]:
+        cur.execute("SELECT 1 FROM pg_constraint WHERE conrelid = %s::regclass AND conname = %s",
+                    (table, name))
+        if cur.fetchone() is None:
+            fks.append(alter)
+    return indexes, fks
+
+
+def _run_statement(task):
+    dsn, sql, mem = task
+    started = time.perf_counter()
+    conn = _connect(dsn)
+    try:
+        cur = conn.cursor()
+        cur.execute(f"SET maintenance_work_mem = '{mem}'")
+        cur.execute(sql)
+    finally:
+        conn.close()
+    return sql, time.perf_counter() - started
+
+
+def _rebuild(pool, dsn, statements, mem):
+    return list(pool.imap_unordered(_run_statement, [(dsn, s, mem) for s in statements]))
+
+
+def _fix_sequences(cur):
+    for table in _TABLES:
+        cur.execute(f"""SELECT setval(pg_get_serial_sequence('"DM"."{table}"', 'Id'),
+                        (SELECT COALESCE(MAX("Id"), 0) + 1 FROM "DM"."{table}"), false)""")
+
+
+# ── main ─────────────────────────────────────────────────────────────────────
+
+def _db_bytes(cur):
+    cur.execute("SELECT pg_database_size(current_database())")
+    return cur.fetchone()[0]
+
+
+def _restore(cur, pool, dsn, saved, mem, phases):
+    """Rebuild whatever of `saved` is missing (indexes first, then FKs)."""
+    indexes, fks = _missing(cur, saved)
+    t = time.perf_counter()
+    print(f"  [datagen] building {len(indexes)} indexes …")
+    builds = _rebuild(pool, dsn, indexes, mem)
+    phases["index_s"] = round(time.perf_counter() - t, 1)
+    t = time.perf_counter()
+    print(f"  [datagen] validating {len(fks)} foreign keys …")
+    builds += _rebuild(pool, dsn, fks, mem)
+    phases["fk_s"] = round(time.perf_counter() - t, 1)
+    return builds
+
+
+def restore_constraints(args):
+    """--restore-constraints: put back what a killed run left dropped."""
+    if not os.path.exists(args.constraints_file):
+        print(f"  [datagen] no {args.constraints_file} — nothing to restore")
+        return
+    with open(args.constraints_file) as fh:
+        saved = json.load(fh)
+    dsn = _dsn(args)
+    conn = _connect(dsn)
+    pool = multiprocessing.Pool(args.jobs)
+    try:
+        _restore(conn.cursor(), pool, dsn, saved, args.maintenance_work_mem, {})
+    finally:
+        pool.close()
+        pool.join()
+    os.remove(args.constraints_file)
+    conn.close()
+    print(f"  [datagen] constraints restored, {args.constraints_file} removed")
+
+
+def generate(args):
+    if os.path.exists(args.constraints_file):
+        raise SystemExit(f"  [datagen] {args.constraints_file} exists: an earlier run left "
+                         f"indexes/FKs dropped — run with --restore-constraints first")
+    dsn = _dsn(args)
+    conn = _connect(dsn)
+    cur = conn.cursor()
+    print("  [datagen] schema + reference data …")
+    cur.execute(_sql_file("migration"))
+    cur.execute(_sql_file("seed"))
+    size_before = _db_bytes(cur)
+    devices = args.devices
+    if devices is None:
+        devices = max(int((args.target_gb * 1024 ** 3 - size_before) / BYTES_PER_DEVICE), 0)
+    if devices <= 0:
+        print(f"  [datagen] database already {size_before / 1024 ** 3:.2f} GB — nothing to do")
+        return {}
+    plan = _plan(devices, _max_ids(cur))
+    print(f"  [datagen] {devices:,} devices ({size_before / 1024 ** 2:.0f} MB now), "
+          f"{args.jobs} parallel COPY streams")
+
+    totals, phases = {}, {}
+    started = time.perf_counter()
+    saved = _save_constraints(cur, args.constraints_file)
+    pool = multiprocessing.Pool(args.jobs)
+    try:
+        _drop_constraints(cur, saved)
+        print(f"  [datagen] dropped {len(saved['indexes'])} secondary indexes, "
+              f"{len(saved['fks'])} foreign keys (saved to {args.constraints_file})")
+        t = time.perf_counter()
+        _load_dimensions(cur, plan, totals, _timestamps())
+        tasks = [(dsn, plan, s, min(CHUNK_DEVICES, devices - s), args.seed + s)
+                 for s in range(0, devices, CHUNK_DEVICES)]
+        done = 0
+        for chunk in pool.imap_unordered(_load_chunk, tasks):
+            for table, (rows, nbytes) in chunk.items():
+                tt = totals.setdefault(table, [0, 0])
+                tt[0] += rows
+                tt[1] += nbytes
+            done += 1
+            el = time.perf_counter() - t
+            mb = sum(b for _, b in totals.values()) / 1024 ** 2
+            print(f"  [datagen] {done}/{len(tasks)} chunks  "
+                  f"{sum(r for r, _ in totals.values()) / el:,.0f} rows/s  {mb / el:.1f} MB/s")
+        phases["load_s"] = round(time.perf_counter() - t, 1)
+    finally:
+        # always restore the schema's indexes and FKs, even after a failed load;
+        # if this fails too, the saved file is left for --restore-constraints
+        try:
+            builds = _restore(cur, pool, dsn, saved, args.maintenance_work_mem, phases)
+        finally:
+            pool.close()
+            pool.join()
+        os.remove(args.constraints_file)
+        _fix_sequences(cur)
+    t = time.perf_counter()
+    cur.execute('ANALYZE "DM"."Device", "DM"."DeviceItem", "DM"."DeviceSpec", '
+                '"DM"."SimCard", "DM"."DeviceItemHistory", "DM"."DeviceConfig"')
+    phases["analyze_s"] = round(time.perf_counter() - t, 1)
+    elapsed = time.perf_counter() - started
+    size_after = _db_bytes(cur)
+    conn.close()
+
+    rows = sum(r for r, _ in totals.values())
+    payload = sum(b for _, b in totals.values())
+    result = {
+        "devices": devices, "jobs": args.jobs, "elapsed_s": round(elapsed, 1), **phases,
+        "rows": rows, "rows_per_s": round(rows / max(phases["load_s"], 1e-6)),
+        "copy_mb": round(payload / 1024 ** 2, 1),
+        "copy_mb_per_s": round(payload / 1024 ** 2 / max(phases["load_s"], 1e-6), 1),
+        "db_mb_before": round(size_before / 1024 ** 2), "db_mb_after": round(size_after / 1024 ** 2),
+        "bytes_per_device": round((size_after - size_before) / devices),
+        "tables": {t: {"rows": r, "copy_mb": round(b / 1024 ** 2, 1)}
+                   for t, (r, b) in sorted(totals.items())},
+        "slowest_builds": [{"sql": s[:100], "s": round(d, 1)}
+                           for s, d in sorted(builds, key=lambda x: -x[1])[:5]],
+    }
+    print(f"\n  [datagen] {rows:,} rows in {elapsed:.0f}s — load {phases['load_s']}s "
+          f"({result['rows_per_s']:,} rows/s, {result['copy_mb_per_s']} MB/s COPY), "
+          f"indexes {phases['index_s']}s, FKs {phases['fk_s']}s")
+    print(f"  [datagen] database {result['db_mb_before']:,} MB → {result['db_mb_after']:,} MB "
+          f"({result['bytes_per_device']} bytes/device; BYTES_PER_DEVICE={BYTES_PER_DEVICE})")
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Grow the DM schema to a target dataset size")
+    size = ap.add_mutually_exclusive_group(required=True)
+    size.add_argument("--devices", type=int, help="devices to add (plus their fan-out)")
+    size.add_argument("--target-gb", type=float, help="grow the database to about this size")
+    size.add_argument("--restore-constraints", action="store_true",
+                      help="rebuild the indexes/FKs a killed run left dropped, then exit")
+    ap.add_argument("--jobs", type=int, default=min(os.cpu_count() or 4, 8),
+                    help="parallel COPY streams / index builds")
+    ap.add_argument("--host", default=config.PG_HOST)
+    ap.add_argument("--port", type=int, default=config.PG_WRITE_PORT,
+                    help="default PG_WRITE_PORT; the primary's own port avoids the proxy hop")
+    ap.add_argument("--maintenance-work-mem", default="512MB",
+                    help="per index build / FK validation connection")
+    ap.add_argument("--seed", type=int, default=42, help="random seed (reproducible data)")
+    ap.add_argument("--json", help="also write the result summary to this file")
+    ap.add_argument("--constraints-file",
+                    help="where dropped index/FK definitions are kept until rebuilt "
+                         "(default: next to --json, else ./datagen_constraints.json)")
+    args = ap.parse_args()
+    if not args.constraints_file:
+        args.constraints_file = os.path.join(os.path.dirname(args.json or "") or ".",
+                                             "datagen_constraints.json")
+
+    if args.restore_constraints:
+        restore_constraints(args)
+        return
+    result = generate(args)
+    if args.json and result:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"  [datagen] summary → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
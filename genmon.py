@@ -0,0 +1,73 @@
+"""Load-generator self-monitoring — is the client the bottleneck?
+
+A Locust process is one gevent loop on one core. When it saturates, every
+greenlet waits for its turn before it can read the server's answer, and that
+wait is reported as database latency. Every load process (worker, or the
+standalone runner) therefore samples itself once per second:
+
+  cpu      — process CPU %, 100 = one core busy (psutil, as Locust's own
+             heartbeat uses)
+  loop lag — worst scheduling delay of a probe greenlet that asks to wake
+             every LAG_PROBE_S: how late the loop gets to a ready greenlet
+  gc       — time spent in garbage collection pauses (gc.callbacks)
+
+and records one row per second into metrics.GeneratorStats, which ships to
+the master with the other metrics. run_scenarios flags a scenario as
+generator-limited from these rows."""
+import gc
+import time
+
+import gevent
+import psutil
+
+LAG_PROBE_S = 0.05
+
+
+class Monitor:
+    def __init__(self, stats, node):
+        self.stats = stats
+        self.node = node
+        self._proc = psutil.Process()
+        self._lag_max = 0.0
+        self._gc_ms = 0.0
+        self._gc_count = 0
+        self._gc_started = None
+        self._greenlets = []
+
+    def _on_gc(self, phase, _info):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started is not None:
+            self._gc_ms += (time.perf_counter() - self._gc_started) * 1000
+            self._gc_count += 1
+            self._gc_started = None
+
+    def _probe(self):
+        while True:
+            asked = time.perf_counter()
+            gevent.sleep(LAG_PROBE_S)
+            lag = (time.perf_counter() - asked - LAG_PROBE_S) * 1000
+            if lag > self._lag_max:
+                self._lag_max = lag
+
+    def _tick(self):
+        self._proc.cpu_percent(None)          # first call only sets the baseline
+        next_at = time.monotonic() + 1
+        while True:
+            gevent.sleep(max(next_at - time.monotonic(), 0))
+            next_at += 1
+            # stamped mid-window: the row belongs to the second just measured
+            self.stats.record(self.node, self._proc.cpu_percent(None), self._lag_max,
+                              self._gc_ms, self._gc_count, now=time.time() - 0.5)
+            self._lag_max = self._gc_ms = 0.0
+            self._gc_count = 0
+
+    def start(self):
+        gc.callbacks.append(self._on_gc)
+        self._greenlets = [gevent.spawn(self._probe), gevent.spawn(self._tick)]
+        return self
+
+    def stop(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        gevent.killall(self._greenlets)
@@ -0,0 +1,162 @@
+"""Client-side key generators for parameterized workloads.
+
+A read that picks its rows with `ORDER BY RANDOM() LIMIT n` scans the whole
+table, and the write scenarios keep growing that table — read latency then
+drifts with the benchmark's own history. Instead, sql files declare the keys
+they need and db_tasks draws them here, outside the timed window:
+
+    -- @keys device_ids device 100 [distribution]
+
+binds %(device_ids)s to a list of 100 keys from keyspace "device", i.e. the
+result of sql/keys_device.sql: either one row (min_id, max_id) — a cached ID
+range — or many single-column rows — a known-ID sample. Keyspaces refresh
+every PG_KEYS_REFRESH_S seconds per process, so rows inserted meanwhile
+become reachable without a lookup per query.
+
+Distributions (PG_KEY_DIST, or the 4th @keys field):
+  uniform  — every key equally likely
+  zipfian  — rank r drawn with P ∝ 1/r^PG_ZIPF_THETA (YCSB), ranks scattered
+             over the range so hot keys are not physically adjacent
+  hotspot  — PG_KEY_HOTSPOT "0.2,0.8": 80 % of draws hit the lowest 20 % of
+             the range (a stable hot set while the table grows)
+  recent   — uniform over the newest PG_KEY_RECENT_N keys
+
+Nothing here imports gevent or locust."""
+import random
+import time
+
+DISTRIBUTIONS = ("uniform", "zipfian", "hotspot", "recent")
+
+_rng = random.Random()
+
+
+class Zipfian:
+    """Gray et al. "Quickly generating billion-record synthetic databases"
+    (the YCSB generator). zeta(n) is summed exactly up to _EXACT terms and
+    extended by Euler–Maclaurin beyond, so a growing range costs nothing."""
+
+    _EXACT = 10000
+
+    def __init__(self, theta=0.99):
+        self.theta = theta
+        self._n = 0
+        self._exact = [0.0]       # partial sums of 1/i^theta, i <= len-1
+
+    def _zeta(self, n):
+        while len(self._exact) <= min(n, self._EXACT):
+            i = len(self._exact)
+            self._exact.append(self._exact[-1] + 1 / i ** self.theta)
+        if n <= self._EXACT:
+            return self._exact[n]
+        m, t = self._EXACT, self.theta
+        return (self._exact[m] + (n ** (1 - t) - m ** (1 - t)) / (1 - t)
+                + (n ** -t - m ** -t) / 2)
+
+    def _setup(self, n):
+        t = self.theta
+        self._n = n
+        self._zetan = self._zeta(n)
+        self._alpha = 1 / (1 - t)
+        self._eta = ((1 - (2 / n) ** (1 - t)) / (1 - self._zeta(2) / self._zetan)
+                     if n > 2 else 0.0)
+        self._half = 1 + 0.5 ** t
+
+    def rank(self, n, rng=_rng):
+        """Rank in [0, n): 0 is the most popular."""
+        if n < 2:
+            return 0
+        if n != self._n:
+            self._setup(n)
+        uz = rng.random() * self._zetan
+        if uz < 1:
+            return 0
+        if uz < self._half:
+            return 1
+        u = uz / self._zetan
+        return min(int(n * (self._eta * u - self._eta + 1) ** self._alpha), n - 1)
+
+
+def _scatter(rank, n):
+    """FNV-1a of the rank, mod n — spreads popular ranks over the range."""
+    h = 0xcbf29ce484222325
+    for _ in range(8):
+        h = ((h ^ (rank & 0xff)) * 0x100000001b3) & 0xFFFFFFFFFFFFFFFF
+        rank >>= 8
+    return h % n
+
+
+class KeyChooser:
+    """Index in [0, n) under one distribution; index 0 is the OLDEST key."""
+
+    def __init__(self, dist="uniform", theta=0.99, hotspot=(0.2, 0.8), recent_n=1000):
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(f"key distribution must be one of {DISTRIBUTIONS}, got {dist!r}")
+        self.dist = dist
+        self.hot_set, self.hot_ops = hotspot
+        self.recent_n = recent_n
+        self._zipf = Zipfian(theta) if dist == "zipfian" else None
+
+    def index(self, n, rng=_rng):
+        if n <= 0:
+            raise ValueError("empty keyspace")
+        if self.dist == "uniform":
+            return rng.randrange(n)
+        if self.dist == "zipfian":
+            return _scatter(self._zipf.rank(n, rng), n)
+        if self.dist == "hotspot":
+            hot = max(int(n * self.hot_set), 1)
+            if hot >= n or rng.random() < self.hot_ops:
+                return rng.randrange(hot)
+            return hot + rng.randrange(n - hot)
+        return n - 1 - rng.randrange(min(self.recent_n, n))
+
+
+class KeySpace:
+    """Cached keys of one table: an inclusive ID range or a sorted ID sample,
+    re-read by `loader(source)` once the cache is older than `ttl` seconds
+    (source: whatever the caller queries through — a session)."""
+
+    def __init__(self, loader, ttl=30.0):
+        self.loader = loader
+        self.ttl = ttl
+        self.lo = self.hi = None
+        self.sample = None
+        self._expires = 0.0
+
+    def refresh(self, source=None):
+        """Re-read the keys; raises — leaving the cache as it was — when the
+        lookup returns nothing usable (no rows, or a NULL range)."""
+        rows = self.loader(source)
+        if not rows or (len(rows) == 1 and len(rows[0]) == 2 and None in rows[0]):
+            raise ValueError("key lookup returned no keys")
+        if len(rows) == 1 and len(rows[0]) == 2:
+            self.lo, self.hi = rows[0]
+            self.sample = None
+        else:
+            self.sample = sorted(r[0] for r in rows)
+        self._expires = time.monotonic() + self.ttl
+
+    def size(self):
+        if self.sample is not None:
+            return len(self.sample)
+        if self.lo is None or self.hi is None:
+            return 0
+        return self.hi - self.lo + 1
+
+    def keys(self, count, chooser, source=None, rng=_rng):
+        """`count` keys (duplicates possible) — refreshing first if stale. A
+        failed refresh keeps serving the old keys and retries in 5 s; with no
+        keys cached yet it raises."""
+        if time.monotonic() >= self._expires:
+            try:
+                self.refresh(source)
+            except Exception:
+                if self.lo is None and self.sample is None:
+                    raise
+                self._expires = time.monotonic() + min(self.ttl, 5.0)
+        n = self.size()
+        if n <= 0:
+            return []
+        if self.sample is not None:
+            return [self.sample[chooser.index(n, rng)] for _ in range(count)]
+        return [self.lo + chooser.index(n, rng) for _ in range(count)]
@@ -4,25 +4,64 @@ User classes (select via --class-picker in the Web UI or LOCUST_USER_CLASSES env
   MixedUser       — balanced 5:1 read/write (default)
   ReadHeavyUser   — 20:1 read/write, uses read_heavy.sql JOIN query
   WriteHeavyUser  — 1:5 read/write, uses write_heavy.sql CTE chain
+  BulkIngestUser  — batched ingestion: PG_BULK_BATCH rows per multi-row INSERT
+                    or COPY (PG_BULK_MODE); drives WAL volume / replica lag
+  TransactionUser — explicit BEGIN … COMMIT transactions (sql/txn_*.sql) with
+                    isolation level and serialization retries; PG_TXN events
   FailoverProbe   — 10 probes/s single INSERT+SELECT; measures HA RTO precisely
+  OpenLoopUser    — constant arrival rate per op (--open-loop-rps), latency
+                    measured from the intended send time; users = max in flight
+  ConnectStormUser — connect, SELECT 1, disconnect, as fast as possible:
+                    the endpoint's connect-rate ceiling and CONNECT latency
+  ReconnectUser   — holds one connection, SELECT 1 every ~50 ms; under a
+                    failover all of them reconnect at once (--reconnect-policy)
+  HandshakeUser   — connect churn per auth profile (PG_AUTH_PROFILES: plain,
+                    TLS, channel binding, client cert): handshake cost by mode
+  AsyncEngineUser — one async_engine.py process (asyncio + psycopg 3) running
+                    --async-concurrency in-flight db_tasks ops (--async-mix);
+                    its events are fired here, so stats and reports match
 
 All connection details come from config.py / environment variables.
 SQL queries come from sql/*.sql files — edit those without touching Python.
 """
+import json
 import logging
+import os
+import sys
 import time
 
-from locust import User, between, events, tag, task
+import gevent
+import gevent.event
+import gevent.subprocess
+from locust import User, between, constant, events, tag, task
+from locust.event import EventHook
+from locust.runners import MasterRunner, WorkerRunner
 
 import config
-from db_tasks import read_heavy, read_simple, run_migration, run_seed, write_heavy, write_simple
-from postgres_session import PostgresSession
+import genmon
+import metrics
+from db_tasks import (WORKLOADS, BulkPayload, bootstrap, bulk_copy, bulk_insert, ping,
+                      read_heavy, read_simple, txn_device_status, write_heavy, write_simple)
+from open_loop import ArrivalSchedule, parse_rates
+from probe_log import ProbeLog
+from postgres_session import PostgresSession, SessionPool, parse_profiles
 
 logger = logging.getLogger(__name__)
 
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 
+_POOLS = {}   # "write"/"read" → SessionPool, one pair per worker process
+_OUTAGES = EventHook()   # sessions' client outages → metrics (not request events)
+
+
+def _reconnect_policy(environment):
+    """This run's --reconnect-policy (set per scenario through /swarm), else
+    PG_RECONNECT_POLICY."""
+    return (getattr(environment.parsed_options, "reconnect_policy", "")
+            or config.PG_RECONNECT_POLICY)
+
+
 def _make_clients(self):
     kwargs = dict(
         host=config.PG_HOST,
@@ -30,12 +69,28 @@ def _make_clients(self):
         user=config.PG_USER,
         password=config.PG_PASSWORD,
         request_event=self.environment.events.request,
+        outage_event=_OUTAGES,
+        prepared=config.PG_PREPARED,
+        fetch=config.PG_FETCH_MODE,
+        itersize=config.PG_STREAM_ITERSIZE,
+        identify_every=config.PG_BACKEND_SAMPLE_EVERY,
+        reconnect=_reconnect_policy(self.environment),
     )
-    self.write_client = PostgresSession(port=config.PG_WRITE_PORT, **kwargs)
-    self.read_client  = PostgresSession(port=config.PG_READ_PORT,  **kwargs)
+    if config.PG_CONNECTION_MODE == "pooled":
+        # pools are shared by every user of this process — on_stop leaves them open
+        for role, port in (("write", config.PG_WRITE_PORT), ("read", config.PG_READ_PORT)):
+            if role not in _POOLS:
+                _POOLS[role] = SessionPool(config.PG_POOL_SIZE, config.PG_POOL_TIMEOUT,
+                                           port=port, role=role, **kwargs)
+        self.write_client, self.read_client = _POOLS["write"], _POOLS["read"]
+        return
+    self.write_client = PostgresSession(port=config.PG_WRITE_PORT, role="write", **kwargs)
+    self.read_client  = PostgresSession(port=config.PG_READ_PORT,  role="read",  **kwargs)
 
 
 def _close_clients(self):
+    if config.PG_CONNECTION_MODE == "pooled":
+        return
     for c in (getattr(self, "write_client", None), getattr(self, "read_client", None)):
         if c:
             try:
@@ -44,27 +99,80 @@ def _close_clients(self):
                 pass
 
 
-_BOOTSTRAPPED = False
+# ── Bootstrap ────────────────────────────────────────────────────────────────
+# Migration + seed run ONCE per test, on the master (or the local runner), in
+# test_start — i.e. before any spawn message leaves — through a session whose
+# events go nowhere, so nothing lands in the scenario stats. The master then
+# broadcasts "bootstrap_done"; workers only wait for it (a worker that joins
+# later asks with "bootstrap_request"). An up-to-date database costs one
+# fingerprint query (db_tasks.bootstrap).
+
+_BOOTSTRAP_DONE = gevent.event.Event()
+_BOOTSTRAP_STATUS = {}
+_BOOTSTRAP_WAIT_S = 60
 
 
-def _bootstrap(write_client, attempts=5, delay=2):
-    """Run migration + seed once per process (idempotent). Retries so a user
-    spawned during a brief cluster hiccup still bootstraps; never raises — an
-    on_start exception would permanently kill the user before its first task.
-    The once-per-process guard keeps migration CREATEs out of scenario stats."""
-    global _BOOTSTRAPPED
-    if _BOOTSTRAPPED:
+def _run_bootstrap(environment, attempts=5, delay=2):
+    """Never raises — a failed bootstrap is logged and the test runs anyway
+    (the schema may well exist already)."""
+    if _BOOTSTRAP_DONE.is_set():
         return
-    for i in range(attempts):
-        try:
-            run_migration(write_client)
-            run_seed(write_client)
-            _BOOTSTRAPPED = True
-            return
-        except Exception as exc:
-            logger.warning("Bootstrap attempt %d/%d failed: %s", i + 1, attempts, exc)
-            time.sleep(delay)
-    logger.warning("Bootstrap gave up after %d attempts — schema may already exist.", attempts)
+    if getattr(environment.parsed_options, "skip_bootstrap", False):
+        _BOOTSTRAP_STATUS.update(ok=True, applied=False, skipped=True)
+        _BOOTSTRAP_DONE.set()
+        return
+    session = PostgresSession(host=config.PG_HOST, port=config.PG_WRITE_PORT,
+                              database=config.PG_DATABASE, user=config.PG_USER,
+                              password=config.PG_PASSWORD, request_event=EventHook(),
+                              role="write")
+    started = time.monotonic()
+    try:
+        for i in range(attempts):
+            try:
+                applied = bootstrap(session)
+                _BOOTSTRAP_STATUS.update(ok=True, applied=applied,
+                                         seconds=round(time.monotonic() - started, 2))
+                logger.info("Bootstrap: %s (%.2fs)",
+                            "schema applied" if applied else "schema up to date",
+                            _BOOTSTRAP_STATUS["seconds"])
+                break
+            except Exception as exc:
+                logger.warning("Bootstrap attempt %d/%d failed: %s", i + 1, attempts, exc)
+                _BOOTSTRAP_STATUS.update(ok=False, error=str(exc))
+                if i + 1 < attempts:
+                    gevent.sleep(delay)
+        else:
+            logger.warning("Bootstrap gave up after %d attempts — schema may already exist.",
+                           attempts)
+    finally:
+        session.close()
+    _BOOTSTRAP_DONE.set()
+
+
+def _await_bootstrap(environment):
+    """on_start: return once this test's bootstrap is done."""
+    if _BOOTSTRAP_DONE.is_set():
+        return
+    if isinstance(environment.runner, WorkerRunner):
+        if not _BOOTSTRAP_DONE.wait(_BOOTSTRAP_WAIT_S):
+            logger.warning("No bootstrap_done from master after %ds — starting anyway",
+                           _BOOTSTRAP_WAIT_S)
+            _BOOTSTRAP_DONE.set()
+        return
+    _run_bootstrap(environment)     # no test_start (e.g. run_single_user)
+
+
+def _on_bootstrap_done(environment, msg, **_kw):
+    _BOOTSTRAP_STATUS.update(msg.data or {})
+    if not _BOOTSTRAP_STATUS.get("ok", True):
+        logger.warning("Master bootstrap failed: %s", _BOOTSTRAP_STATUS.get("error"))
+    _BOOTSTRAP_DONE.set()
+
+
+def _on_bootstrap_request(environment, msg, **_kw):
+    if _BOOTSTRAP_DONE.is_set():
+        environment.runner.send_message("bootstrap_done", dict(_BOOTSTRAP_STATUS),
+                                        client_id=msg.node_id)
 
 
 # ── User classes ─────────────────────────────────────────────────────────────
@@ -79,7 +187,7 @@ class MixedUser(User):
 
     def on_start(self):
         _make_clients(self)
-        _bootstrap(self.write_client)
+        _await_bootstrap(self.environment)
 
     def on_stop(self):
         _close_clients(self)
@@ -109,7 +217,7 @@ class ReadHeavyUser(User):
 
     def on_start(self):
         _make_clients(self)
-        _bootstrap(self.write_client)
+        _await_bootstrap(self.environment)
 
     def on_stop(self):
         _close_clients(self)
@@ -138,7 +246,7 @@ class WriteHeavyUser(User):
 
     def on_start(self):
         _make_clients(self)
-        _bootstrap(self.write_client)
+        _await_bootstrap(self.environment)
 
     def on_stop(self):
         _close_clients(self)
@@ -158,10 +266,75 @@ class WriteHeavyUser(User):
             raise Exception("read_simple failed")
 
 
+class TransactionUser(User):
+    """Transaction workload: 4 multi-statement transactions per 1 read.
+    sql/txn_device_status.sql locks a few devices (FOR UPDATE), updates them
+    and inserts SIM cards under its @txn isolation level. Each transaction is
+    one PG_TXN event (latency across retries); every serialization failure or
+    deadlock adds a failed "<name> ABORT" event — lock contention and abort
+    rate, and what an in-flight transaction sees during a switchover."""
+
+    wait_time = between(0.05, 0.2)
+
+    def on_start(self):
+        _make_clients(self)
+        _await_bootstrap(self.environment)
+
+    def on_stop(self):
+        _close_clients(self)
+
+    @tag("write")
+    @task(4)
+    def task_txn(self):
+        result = txn_device_status(self.write_client)
+        if not result.success:
+            raise Exception("txn_device_status failed")
+
+    @tag("read")
+    @task(1)
+    def task_read(self):
+        result = read_simple(self.read_client)
+        if not result.success:
+            raise Exception("read_simple failed")
+
+
+class BulkIngestUser(User):
+    """Batched ingestion: every task sends PG_BULK_BATCH device rows in one
+    round-trip — a multi-row INSERT … VALUES (op INSERT_BATCH) or a COPY FROM
+    STDIN (op COPY), per PG_BULK_MODE. Event length = rows, so the report
+    shows rows/s next to requests/s; run_scenarios adds WAL MB/s.
+    This is the workload that actually makes standbys fall behind."""
+
+    wait_time = between(0.0, 0.05)
+
+    def on_start(self):
+        _make_clients(self)
+        _await_bootstrap(self.environment)
+        self.payload = BulkPayload(config.PG_BULK_BATCH)
+        self._batches = 0
+
+    def on_stop(self):
+        _close_clients(self)
+
+    @tag("write")
+    @task
+    def task_ingest(self):
+        mode = config.PG_BULK_MODE
+        use_copy = mode == "copy" or (mode == "alternate" and self._batches % 2)
+        self._batches += 1
+        fn = bulk_copy if use_copy else bulk_insert
+        result = fn(self.write_client, self.payload)
+        if not result.success:
+            raise Exception(f"{fn.__name__} failed")
+
+
 class FailoverProbe(User):
     """High-frequency HA probe: one INSERT + one SELECT per 100ms tick.
     Measures RTO precisely — each failed request = ~100ms of downtime.
-    Uses a SINGLE write+read connection through the HA endpoint.
+    Uses a SINGLE write+read connection through the HA endpoint (never pooled,
+    whatever PG_CONNECTION_MODE says — a pool would mask reconnect cost).
+    Every request is also appended to a per-request event log
+    (PROBE_LOG_DIR) from which the runner computes RTO to the millisecond.
     Fire this class alone with 1 user while triggering failover scenarios."""
 
     wait_time = between(0.08, 0.12)   # ~10 probes/s
@@ -173,9 +346,16 @@ class FailoverProbe(User):
             user=config.PG_USER,
             password=config.PG_PASSWORD,
             request_event=self.environment.events.request,
+            outage_event=_OUTAGES,
+            prepared=config.PG_PREPARED,
+            fetch=config.PG_FETCH_MODE,
+            itersize=config.PG_STREAM_ITERSIZE,
+            identify_every=config.PG_BACKEND_SAMPLE_EVERY,
         )
-        self.client = PostgresSession(port=config.PG_WRITE_PORT, **kwargs)
-        _bootstrap(self.client)
+        self.event_log = ProbeLog(config.PROBE_LOG_DIR)
+        self.client = PostgresSession(port=config.PG_WRITE_PORT, role="write",
+                                      event_log=self.event_log, **kwargs)
+        _await_bootstrap(self.environment)
 
     def on_stop(self):
         client = getattr(self, "client", None)
@@ -184,6 +364,8 @@ class FailoverProbe(User):
                 client.close()
             except Exception:
                 pass
+        if getattr(self, "event_log", None):
+            self.event_log.close()
 
     @task
     def probe(self):
@@ -198,9 +380,270 @@ class FailoverProbe(User):
             raise Exception("probe_read failed")
 
 
+def _single_client(user, **kwargs):
+    """One unpooled write-endpoint session (connection scenarios: a pool would
+    hide exactly the connects they measure)."""
+    return PostgresSession(host=config.PG_HOST, port=config.PG_WRITE_PORT,
+                           database=config.PG_DATABASE, user=config.PG_USER,
+                           password=config.PG_PASSWORD, role="write",
+                           request_event=user.environment.events.request,
+                           outage_event=_OUTAGES,
+                           fetch=config.PG_FETCH_MODE,
+                           reconnect=_reconnect_policy(user.environment), **kwargs)
+
+
+class ConnectStormUser(User):
+    """Connection churn: every task opens a fresh connection, runs SELECT 1
+    and drops it, with no pause. N users = N clients connecting in a loop;
+    CONNECT events/s is the endpoint's connect-rate ceiling (PgPool child
+    fork/reuse, CNPG service → primary) and their latency its distribution."""
+
+    wait_time = constant(0)
+
+    def on_start(self):
+        self.client = _single_client(self)
+        _await_bootstrap(self.environment)
+
+    def on_stop(self):
+        self.client.close()
+
+    @task
+    def churn(self):
+        self.client.close()
+        if not ping(self.client).success:
+            raise Exception("ping failed")
+
+
+class ReconnectUser(User):
+    """A long-lived client: one connection, SELECT 1 every ~50 ms. When a
+    failover drops every connection at once, all users reconnect together
+    under the run's reconnect policy (--reconnect-policy: immediate, backoff
+    or breaker). Each client's outage, from its first error to its next
+    successful connect, is timed into metrics' outage store (/stats/outages)."""
+
+    wait_time = between(0.04, 0.06)
+
+    def on_start(self):
+        self.client = _single_client(self)
+        _await_bootstrap(self.environment)
+
+    def on_stop(self):
+        self.client.close()
+
+    @task
+    def keepalive(self):
+        if not ping(self.client).success:
+            raise Exception("ping failed")
+
+
+_TLS_REPORTED = set()   # profiles whose negotiated TLS this process has logged
+
+
+class HandshakeUser(User):
+    """Connect cost per auth mode: round-robin over PG_AUTH_PROFILES (e.g.
+    plaintext, sslmode=require, + channel_binding=require, client cert), one
+    fresh connection + SELECT 1 per task, no pause. Every profile's
+    handshakes are their own "CONNECT <profile>" event — latency and
+    connects/s per mode side by side in one run. The TLS protocol actually
+    negotiated is logged once per profile (a "require" against a server
+    without ssl fails instead)."""
+
+    wait_time = constant(0)
+
+    def on_start(self):
+        self._turn = 0
+        self.clients = [_single_client(self, connect_args=args, connect_name=f"CONNECT {name}")
+                        for name, args in parse_profiles(config.PG_AUTH_PROFILES).items()]
+        if not self.clients:
+            raise ValueError(f"PG_AUTH_PROFILES defines no profile: "
+                             f"{config.PG_AUTH_PROFILES!r}")
+        _await_bootstrap(self.environment)
+
+    def on_stop(self):
+        for client in self.clients:
+            client.close()
+
+    @task
+    def handshake(self):
+        client = self.clients[self._turn % len(self.clients)]
+        self._turn += 1
+        client.close()
+        if not ping(client).success:
+            raise Exception(f"{client.connect_name} failed")
+        if client.connect_name not in _TLS_REPORTED:
+            _TLS_REPORTED.add(client.connect_name)
+            logger.info("%s: %s", client.connect_name, client.ssl or "plaintext")
+
+
+_SCHEDULE = None   # ArrivalSchedule shared by this worker's OpenLoopUsers
+
+
+def _arrival_schedule(environment):
+    global _SCHEDULE
+    if _SCHEDULE is None:
+        spec = getattr(environment.parsed_options, "open_loop_rps", "") or ""
+        rates = parse_rates(spec)
+        unknown = set(rates) - set(WORKLOADS)
+        if unknown:
+            raise ValueError(f"--open-loop-rps: unknown ops {sorted(unknown)}; "
+                             f"known: {sorted(WORKLOADS)}")
+        _SCHEDULE = ArrivalSchedule(rates)
+    return _SCHEDULE
+
+
+class OpenLoopUser(User):
+    """Open-loop load: requests arrive on a fixed schedule (--open-loop-rps,
+    per worker, e.g. "read_simple=80,write_simple=20") whatever the latency.
+    All users of the worker share one schedule; each user is one in-flight
+    lane, so `users` caps concurrency. Response times run from the slot's
+    intended send time — a stalled primary shows up as queueing, not as
+    politely reduced load (coordinated omission)."""
+
+    wait_time = constant(0)   # pacing comes from the schedule
+
+    def on_start(self):
+        _make_clients(self)
+        _await_bootstrap(self.environment)
+
+    def on_stop(self):
+        _close_clients(self)
+
+    @task
+    def arrive(self):
+        schedule = _arrival_schedule(self.environment)
+        op, due = schedule.next_slot()
+        delay = due - time.perf_counter_ns()
+        if delay > 0:
+            gevent.sleep(delay / 1e9)
+        fn, role = WORKLOADS[op]
+        client = self.write_client if role == "write" else self.read_client
+        result = fn(client, scheduled_ns=due)
+        if not result.success:
+            raise Exception(f"{op} failed")
+
+
+_GENERATOR = None      # this process's metrics.GeneratorStats (on_locust_init)
+_ENGINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "async_engine.py")
+_REMOTE_ERRORS = {}    # exception class name from the engine → local stand-in
+
+
+def _remote_error(name, message):
+    cls = _REMOTE_ERRORS.get(name)
+    if cls is None:
+        cls = _REMOTE_ERRORS[name] = type(name, (Exception,), {})
+    return cls(message)
+
+
+class AsyncEngineUser(User):
+    """Hands the load to a separate asyncio process (async_engine.py):
+    --async-concurrency in-flight requests over --async-mix op weights (or
+    --open-loop-rps when set), each its own psycopg 3 connection pair. The
+    engine reports its events in batches; they are fired here as ordinary
+    request events, and its CPU / loop-lag rows go to /stats/generator as
+    node "<worker>/async" — one gevent loop no longer caps the offered load,
+    but the reports read the same. Run one of these users per worker."""
+
+    wait_time = constant(1)
+
+    def on_start(self):
+        # set first: a bootstrap timeout below leaves the user without an engine
+        self.proc = self.reader = None
+        _await_bootstrap(self.environment)
+        opts = self.environment.parsed_options
+        cmd = [sys.executable, _ENGINE,
+               "--concurrency", str(getattr(opts, "async_concurrency", 0) or 100),
+               "--mix", getattr(opts, "async_mix", "") or ""]
+        rates = getattr(opts, "open_loop_rps", "") or ""
+        if rates:
+            cmd += ["--open-loop-rps", rates]
+        self.proc = gevent.subprocess.Popen(cmd, stdout=gevent.subprocess.PIPE)
+        runner = self.environment.runner
+        self.node = (runner.client_id if isinstance(runner, WorkerRunner) else "local") + "/async"
+        self.reader = gevent.spawn(self._relay)
+
+    def _relay(self):
+        fire = self.environment.events.request.fire
+        for line in self.proc.stdout:
+            msg = json.loads(line)
+            for request_type, name, ms, length, error, context in msg.get("events", ()):
+                fire(request_type=request_type, name=name, response_time=ms,
+                     response_length=length, context=context,
+                     exception=_remote_error(*error) if error else None)
+            if "gen" in msg and _GENERATOR is not None:
+                _GENERATOR.record(self.node, *msg["gen"], now=time.time() - 0.5)
+
+    def on_stop(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except gevent.subprocess.TimeoutExpired:
+                self.proc.kill()
+        if self.reader is not None:
+            self.reader.join(timeout=2)
+
+    @task
+    def watch(self):
+        if self.proc is None:
+            raise Exception("async_engine not started: on_start failed (bootstrap?) — see the log")
+        if self.proc.poll() is not None:
+            raise Exception(f"async_engine exited with {self.proc.returncode}")
+
+
 # ── Startup event ─────────────────────────────────────────────────────────────
 
+@events.init.add_listener
+def on_locust_init(environment, web_ui=None, **_kw):
+    # per-phase query timing (connect/execute/fetch/overhead) → GET /stats/phases
+    global _GENERATOR
+    generator = _GENERATOR = metrics.GeneratorStats()
+    metrics.register(environment, web_ui, generator=generator, outage_event=_OUTAGES)
+    runner = environment.runner
+    # every process that generates load watches its own CPU / loop lag / GC
+    # (→ GET /stats/generator); the master only aggregates
+    if not isinstance(runner, MasterRunner):
+        node = runner.client_id if isinstance(runner, WorkerRunner) else "local"
+        genmon.Monitor(generator, node).start()
+    if isinstance(runner, WorkerRunner):
+        runner.register_message("bootstrap_done", _on_bootstrap_done)
+        runner.send_message("bootstrap_request")
+    elif isinstance(runner, MasterRunner):
+        runner.register_message("bootstrap_request", _on_bootstrap_request)
+
+
+@events.test_start.add_listener
+def on_test_start(environment, **_kw):
+    if isinstance(environment.runner, WorkerRunner):
+        return
+    _run_bootstrap(environment)
+    if isinstance(environment.runner, MasterRunner):
+        environment.runner.send_message("bootstrap_done", dict(_BOOTSTRAP_STATUS))
+
+
+@events.test_stop.add_listener
+def on_test_stop(**_kw):
+    global _SCHEDULE
+    # every scenario starts with cold pools, like per-user mode starts with new users
+    for pool in _POOLS.values():
+        pool.close()
+    _SCHEDULE = None      # the next run may carry a different --open-loop-rps
+    # the next test re-checks the fingerprint (one query when nothing changed)
+    _BOOTSTRAP_DONE.clear()
+    _BOOTSTRAP_STATUS.clear()
+
+
 @events.init_command_line_parser.add_listener
 def add_custom_args(parser, **_kw):
     parser.add_argument("--skip-bootstrap", action="store_true",
-                        help="Skip migration/seed on first user start")
+                        help="Skip the migration/seed bootstrap at test start")
+    # settable per run through /swarm (run_scenarios passes it per scenario)
+    parser.add_argument("--open-loop-rps", default="", include_in_web_ui=True,
+                        help="OpenLoopUser target rate PER WORKER, "
+                             "e.g. read_simple=80,write_simple=20")
+    parser.add_argument("--reconnect-policy", default="", include_in_web_ui=True,
+                        help="Reconnect policy of every session: immediate | backoff | "
+                             "breaker (empty = PG_RECONNECT_POLICY)")
+    parser.add_argument("--async-concurrency", type=int, default=0, include_in_web_ui=True,
+                        help="AsyncEngineUser in-flight requests PER ENGINE (0 = 100)")
+    parser.add_argument("--async-mix", default="", include_in_web_ui=True,
+                        help="AsyncEngineUser op weights, e.g. read_simple=5,write_simple=1")
@@ -0,0 +1,394 @@
+"""Client-side custom metrics shipped alongside Locust's request stats.
+
+PostgresSession attaches a per-phase split (open-loop queue / pool wait /
+connect / prepare / execute / fetch / client overhead) to every PG_QUERY request event's
+context. Each process aggregates it here; workers forward their share with every
+report_to_master and the master merges it, so GET /stats/phases on the web
+port returns one cluster-wide breakdown (standalone mode: the local one).
+
+Every request's latency also lands in an HDR-style LatencyHistogram per
+(1-second wall-clock interval, operation, request type). Histograms merge losslessly by
+adding bucket counts, so workers ship deltas and the master's
+GET /stats/hdr?since=<epoch> serves exact per-interval p99 / p99.9 / max
+for the whole cluster — not Locust's smoothed "current" window. Rows carry
+the request type, so "query latency" aggregates (merge_intervals with
+latency_only) leave out CONNECT, PREPARE, POOL_ACQUIRE, KEYRANGE and aborts.
+
+Queries from sessions with backend identification on (PG_BACKEND_SAMPLE_EVERY)
+carry the answering server in their context; BackendStats keeps ok / failed
+counts and a latency histogram per (second, backend), served merged at
+GET /stats/backends?since=<epoch> — read routing across replicas and the
+moment traffic moves to a new primary.
+
+GeneratorStats holds the load generator's own health per (second, node):
+CPU %, worst event-loop lag and GC pause time, sampled inside every load
+process by genmon.py and served merged at GET /stats/generator?since=<epoch>
+— latency that was really the client's shows up next to the client's CPU.
+
+Client outages (a session's first connection error → its next successful
+connect, fired by PostgresSession on its outage_event) are not requests:
+they go to their own per-second histograms, GET /stats/outages?since=<epoch>,
+and never into Locust's request stats or the latency percentiles.
+
+All per-second stores only grow during a test; a long-running reader (the
+soak runner) POSTs /stats/prune?before=<epoch> once it has persisted
+those seconds, which also trims Locust's own per-second counters.
+
+Nothing here imports locust — run_scenarios.py can reuse the data classes."""
+import time
+
+PHASES = ("queue", "pool_wait", "connect", "prepare", "identify", "execute", "fetch",
+          "overhead")
+
+
+class PhaseStats:
+    """(op, phase) → [count, total_ms, max_ms]. Mergeable by summing."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, name, phases):
+        for phase, ms in phases.items():
+            e = self.entries.get((name, phase))
+            if e is None:
+                self.entries[(name, phase)] = [1, ms, ms]
+            else:
+                e[0] += 1
+                e[1] += ms
+                if ms > e[2]:
+                    e[2] = ms
+
+    def serialize(self):
+        return [[name, phase, c, total, mx] for (name, phase), (c, total, mx) in self.entries.items()]
+
+    def merge(self, rows):
+        for name, phase, c, total, mx in rows:
+            e = self.entries.setdefault((name, phase), [0, 0.0, 0.0])
+            e[0] += c
+            e[1] += total
+            e[2] = max(e[2], mx)
+
+    def reset(self):
+        self.entries = {}
+
+    def summary(self):
+        return [{"op": name, "phase": phase, "count": c,
+                 "avg_ms": round(total / c, 3) if c else 0, "max_ms": round(mx, 3)}
+                for (name, phase), (c, total, mx) in sorted(
+                    self.entries.items(),
+                    key=lambda kv: (kv[0][0], PHASES.index(kv[0][1])
+                                    if kv[0][1] in PHASES else len(PHASES)))]
+
+
+class LatencyHistogram:
+    """Sparse log-linear (HDR-style) histogram of latencies in microseconds.
+
+    Values below 2**SUB_BITS µs are exact; above, each power-of-two range is
+    split into 2**(SUB_BITS-1) linear buckets — relative error < 0.8 %
+    (two significant digits) from 1 µs to hours, a few hundred buckets for
+    a typical latency spread. The maximum is tracked exactly."""
+
+    SUB_BITS = 8
+    __slots__ = ("counts", "count", "max_us")
+
+    def __init__(self):
+        self.counts = {}          # bucket key → count
+        self.count = 0
+        self.max_us = 0
+
+    @classmethod
+    def _key(cls, us):
+        shift = us.bit_length() - cls.SUB_BITS
+        if shift <= 0:
+            return us
+        return (shift << cls.SUB_BITS) | (us >> shift)
+
+    @classmethod
+    def _upper(cls, key):
+        """Highest value that lands in bucket `key` (HDR "highest equivalent")."""
+        shift, sub = key >> cls.SUB_BITS, key & ((1 << cls.SUB_BITS) - 1)
+        if shift == 0:
+            return sub
+        return ((sub + 1) << shift) - 1
+
+    def record(self, ms):
+        us = max(int(ms * 1000), 0)
+        key = self._key(us)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        if us > self.max_us:
+            self.max_us = us
+
+    def merge(self, other):
+        for key, n in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + n
+        self.count += other.count
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, pct):
+        """Latency (ms) at percentile `pct` (0–100)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * pct // 100))      # ceil, at least the 1st sample
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(self._upper(key), self.max_us) / 1000
+        return self.max_us / 1000
+
+    def summary(self):
+        return {"count": self.count,
+                "p50": round(self.percentile(50), 2), "p95": round(self.percentile(95), 2),
+                "p99": round(self.percentile(99), 2), "p999": round(self.percentile(99.9), 2),
+                "max": round(self.max_us / 1000, 2)}
+
+    def serialize(self):
+        return [list(self.counts.items()), self.max_us]
+
+    @classmethod
+    def unserialize(cls, data):
+        h = cls()
+        pairs, h.max_us = data
+        h.counts = {int(k): n for k, n in pairs}
+        h.count = sum(h.counts.values())
+        return h
+
+
+class IntervalHistograms:
+    """(epoch second, op, request type) → LatencyHistogram. Workers ship and
+    clear it on every report; the master (or a standalone runner) accumulates.
+    Rows are [sec, op, pairs, max_us, request_type]."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, name, ms, now=None, request_type=None):
+        key = (int(now if now is not None else time.time()), name, request_type)
+        h = self.entries.get(key)
+        if h is None:
+            h = self.entries[key] = LatencyHistogram()
+        h.record(ms)
+
+    def serialize(self, since=0):
+        return [[sec, name, *h.serialize(), rtype]
+                for (sec, name, rtype), h in self.entries.items() if sec >= since]
+
+    def merge(self, rows):
+        for sec, name, pairs, max_us, rtype in rows:
+            h = LatencyHistogram.unserialize([pairs, max_us])
+            mine = self.entries.get((sec, name, rtype))
+            if mine is None:
+                self.entries[(sec, name, rtype)] = h
+            else:
+                mine.merge(h)
+
+    def reset(self):
+        self.entries = {}
+
+    def prune(self, before):
+        for key in [k for k in self.entries if k[0] < before]:
+            del self.entries[key]
+
+
+class BackendStats:
+    """(epoch second, backend) → [standby, ok, failed, LatencyHistogram of the
+    successful queries]. Same ship-deltas / merge-on-master life cycle."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, backend, standby, ms, ok=True, now=None):
+        key = (int(now if now is not None else time.time()), backend)
+        e = self.entries.get(key)
+        if e is None:
+            e = self.entries[key] = [standby, 0, 0, LatencyHistogram()]
+        e[0] = standby
+        if ok:
+            e[1] += 1
+            e[3].record(ms)
+        else:
+            e[2] += 1
+
+    def serialize(self, since=0):
+        return [[sec, backend, standby, ok, failed, *h.serialize()]
+                for (sec, backend), (standby, ok, failed, h) in self.entries.items()
+                if sec >= since]
+
+    def merge(self, rows):
+        for sec, backend, standby, ok, failed, pairs, max_us in rows:
+            h = LatencyHistogram.unserialize([pairs, max_us])
+            e = self.entries.get((sec, backend))
+            if e is None:
+                self.entries[(sec, backend)] = [standby, ok, failed, h]
+            else:
+                e[0] = standby
+                e[1] += ok
+                e[2] += failed
+                e[3].merge(h)
+
+    def reset(self):
+        self.entries = {}
+
+    def prune(self, before):
+        for key in [k for k in self.entries if k[0] < before]:
+            del self.entries[key]
+
+
+class GeneratorStats:
+    """(epoch second, node) → [cpu_pct, loop_lag_max_ms, gc_ms, gc_count].
+    One row per second per load process — nodes never collide, so merging is
+    a plain update."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, node, cpu, lag_ms, gc_ms, gc_count, now=None):
+        key = (int(now if now is not None else time.time()), node)
+        self.entries[key] = [round(cpu, 1), round(lag_ms, 2), round(gc_ms, 2), gc_count]
+
+    def serialize(self, since=0):
+        return [[sec, node, *e] for (sec, node), e in self.entries.items() if sec >= since]
+
+    def merge(self, rows):
+        for sec, node, *e in rows:
+            self.entries[(sec, node)] = e
+
+    def reset(self):
+        self.entries = {}
+
+    def prune(self, before):
+        for key in [k for k in self.entries if k[0] < before]:
+            del self.entries[key]
+
+
+def _prune_locust_stats(stats, before, keep_history=300):
+    """Locust keeps a per-second request/failure count per entry and a chart
+    history for the whole test — unbounded in a soak. Drop what is older."""
+    for entry in [*stats.entries.values(), stats.total]:
+        for per_sec in (entry.num_reqs_per_sec, entry.num_fail_per_sec):
+            for sec in [t for t in per_sec if t < before]:
+                del per_sec[sec]
+    del stats.history[:-keep_history]
+
+
+# "query latency" in timelines and summaries: the statements and transactions
+# the workload issued — not handshakes, PREPAREs, pool waits, key lookups or
+# rolled-back transaction attempts (those keep their own per-op rows)
+LATENCY_TYPES = ("PG_QUERY", "PG_TXN")
+SETUP_OPS = ("KEYRANGE",)
+
+
+def is_latency_op(request_type, name):
+    return (request_type in LATENCY_TYPES and name not in SETUP_OPS
+            and not name.endswith(" ABORT"))
+
+
+def merge_intervals(rows, start=None, end=None, ops=None, latency_only=False):
+    """Merge serialized IntervalHistograms rows whose second is in [start, end)
+    (and op in `ops`, if given; query/transaction ops only with latency_only)
+    into one LatencyHistogram."""
+    total = LatencyHistogram()
+    for sec, name, pairs, max_us, rtype in rows:
+        if (start is None or sec >= start) and (end is None or sec < end) \
+                and (ops is None or name in ops) \
+                and (not latency_only or is_latency_op(rtype, name)):
+            total.merge(LatencyHistogram.unserialize([pairs, max_us]))
+    return total
+
+
+def register(environment, web_ui=None, generator=None, outage_event=None):
+    """Wire the collectors into a Locust environment (call from events.init).
+    `generator`: the GeneratorStats genmon records into, if any;
+    `outage_event`: the EventHook the sessions report outages on."""
+    phases = PhaseStats()
+    hdr = IntervalHistograms()
+    outages = IntervalHistograms()
+    backends = BackendStats()
+    generator = generator if generator is not None else GeneratorStats()
+    events = environment.events
+
+    def on_request(request_type, name, response_time, context=None, exception=None, **_kw):
+        hdr.record(name, response_time, request_type=request_type)
+        context = context or {}
+        split = context.get("phases")
+        if split and exception is None:
+            phases.add(name, split)
+        backend = context.get("backend")
+        if backend:
+            backends.record(backend, context.get("standby"), response_time,
+                            ok=exception is None)
+
+    def on_outage(outage_ms, **_kw):
+        outages.record("RECONNECT", outage_ms)
+
+    def on_report_to_master(client_id, data):
+        data["phases"] = phases.serialize()
+        data["hdr"] = hdr.serialize()
+        data["outages"] = outages.serialize()
+        data["backends"] = backends.serialize()
+        data["generator"] = generator.serialize()
+        phases.reset()            # workers ship deltas; the master accumulates
+        hdr.reset()
+        outages.reset()
+        backends.reset()
+        generator.reset()
+
+    def on_worker_report(client_id, data):
+        phases.merge(data.get("phases", []))
+        hdr.merge(data.get("hdr", []))
+        outages.merge(data.get("outages", []))
+        backends.merge(data.get("backends", []))
+        generator.merge(data.get("generator", []))
+
+    def on_reset_stats():
+        phases.reset()
+        hdr.reset()
+        outages.reset()
+        backends.reset()
+        generator.reset()
+
+    events.request.add_listener(on_request)
+    if outage_event is not None:
+        outage_event.add_listener(on_outage)
+    events.report_to_master.add_listener(on_report_to_master)
+    events.worker_report.add_listener(on_worker_report)
+    events.reset_stats.add_listener(on_reset_stats)
+
+    if web_ui is not None:
+        from flask import jsonify, request
+
+        @web_ui.app.route("/stats/phases")
+        def stats_phases():
+            return jsonify({"phases": phases.summary()})
+
+        @web_ui.app.route("/stats/hdr")
+        def stats_hdr():
+            since = int(request.args.get("since", 0))
+            return jsonify({"intervals": hdr.serialize(since)})
+
+        @web_ui.app.route("/stats/outages")
+        def stats_outages():
+            since = int(request.args.get("since", 0))
+            return jsonify({"outages": outages.serialize(since)})
+
+        @web_ui.app.route("/stats/backends")
+        def stats_backends():
+            since = int(request.args.get("since", 0))
+            return jsonify({"backends": backends.serialize(since)})
+
+        @web_ui.app.route("/stats/generator")
+        def stats_generator():
+            since = int(request.args.get("since", 0))
+            return jsonify({"generator": generator.serialize(since)})
+
+        @web_ui.app.route("/stats/prune", methods=["POST"])
+        def stats_prune():
+            before = int(request.args.get("before", 0))
+            for store in (hdr, outages, backends, generator):
+                store.prune(before)
+            _prune_locust_stats(environment.runner.stats, before)
+            return jsonify({"pruned_before": before})
+
+    return phases
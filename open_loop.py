@@ -0,0 +1,70 @@
+"""Open-loop (constant arrival rate) load model.
+
+Closed-loop users (`between(...)` wait times) send their next request only
+after the previous one returned, so a slow or failing database receives LESS
+load exactly when it is struggling and queueing delay never shows up in the
+numbers (coordinated omission). Here the arrival times are fixed up front:
+
+    slot k is due at  start + k / total_rps
+
+Every OpenLoopUser of a worker process claims the next slot from one shared
+ArrivalSchedule (a token bucket that refills at total_rps with no burst),
+sleeps until it is due and runs the operation assigned to that slot. When
+every user is busy the slots pile up and are served late — and latency is
+measured from the slot's intended time, so the backlog is visible.
+
+Nothing here imports gevent or locust; callers do their own sleeping."""
+import time
+
+
+def parse_rates(spec: str) -> dict:
+    """"read_simple=80,write_simple=20" → {"read_simple": 80.0, "write_simple": 20.0}."""
+    rates = {}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        op, _, rps = part.partition("=")
+        rates[op.strip()] = float(rps)
+    return {op: rps for op, rps in rates.items() if rps > 0}
+
+
+def format_rates(rates: dict, divisor: int = 1) -> str:
+    """Inverse of parse_rates, optionally split across `divisor` workers."""
+    return ",".join(f"{op}={rps / divisor:g}" for op, rps in rates.items())
+
+
+class ArrivalSchedule:
+    """Fixed-rate schedule of (operation, intended perf_counter_ns) slots.
+
+    Operations are interleaved by smooth weighted round-robin, so any window
+    of the schedule carries the configured mix — not bursts of one op."""
+
+    def __init__(self, rates: dict):
+        if not rates:
+            raise ValueError("open-loop schedule needs at least one op with rps > 0")
+        self.rates = dict(rates)
+        self.total_rps = sum(rates.values())
+        self.interval_ns = 1e9 / self.total_rps
+        self._current = {op: 0.0 for op in rates}
+        self._start_ns = None
+        self._k = 0
+
+    def _pick(self):
+        for op, rps in self.rates.items():
+            self._current[op] += rps
+        op = max(self._current, key=self._current.get)
+        self._current[op] -= self.total_rps
+        return op
+
+    def next_slot(self):
+        """Claim the next slot: returns (op, intended_ns). Not thread-safe, but
+        greenlets only switch on I/O, and this never blocks."""
+        if self._start_ns is None:
+            self._start_ns = time.perf_counter_ns()
+        due = self._start_ns + int(self._k * self.interval_ns)
+        self._k += 1
+        return self._pick(), due
+
+    def lag_ns(self, due_ns):
+        """How late a slot is being served (0 when on time)."""
+        return max(time.perf_counter_ns() - due_ns, 0)
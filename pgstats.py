@@ -0,0 +1,162 @@
+"""Server-side counters around a scenario — what PostgreSQL itself saw.
+
+snapshot(cur) reads the cumulative statistics views in one go:
+
+  database    pg_stat_database of the current database (commits, rollbacks,
+              block hits/reads, tuples, deadlocks, temp bytes)
+  wal         pg_stat_wal (PG 14+): records, full-page images, bytes
+  checkpoint  pg_stat_checkpointer (PG 17+) or pg_stat_bgwriter: timed /
+              requested checkpoints, write + sync ms, buffers written
+  locks       gauges at that instant: ungranted pg_locks, backends waiting
+              on a Lock wait event
+  statements  pg_stat_statements (when installed) of the current database,
+              every entry, with calls / total / stddev time
+
+delta(before, after) turns two snapshots into rates and per-statement
+mean / stddev of the calls made BETWEEN them (stddev via the sum of squares
+pg_stat_statements implies). Counters are per server: when the two
+snapshots come from different servers (failover) or a reset happened in
+between, the delta is refused rather than computed across the boundary.
+
+A view that is missing (old server, extension not installed, no privilege)
+leaves its key out; nothing here opens connections — the runner passes a
+cursor. Every query carries PgPool's /*NO LOAD BALANCE*/ hint: the
+counters must come from the primary, not from whichever standby PgPool picks."""
+import decimal
+import time
+
+_NLB = "/*NO LOAD BALANCE*/ "
+
+_IDENTITY_SQL = _NLB + """SELECT inet_server_addr()::text, pg_postmaster_start_time()::text,
+       current_setting('server_version_num')::int"""
+
+_DATABASE_SQL = _NLB + """SELECT xact_commit, xact_rollback, blks_read, blks_hit,
+       tup_returned, tup_fetched, tup_inserted, tup_updated, tup_deleted,
+       deadlocks, conflicts, temp_files, temp_bytes, stats_reset::text
+  FROM pg_stat_database WHERE datname = current_database()"""
+
+_WAL_SQL = _NLB + "SELECT wal_records, wal_fpi, wal_bytes::bigint, stats_reset::text FROM pg_stat_wal"
+
+_CHECKPOINTER_SQL = _NLB + """SELECT num_timed, num_requested, write_time, sync_time,
+       buffers_written, stats_reset::text FROM pg_stat_checkpointer"""
+
+_BGWRITER_SQL = _NLB + """SELECT checkpoints_timed, checkpoints_req, checkpoint_write_time,
+       checkpoint_sync_time, buffers_checkpoint, stats_reset::text FROM pg_stat_bgwriter"""
+
+_LOCKS_SQL = _NLB + """SELECT (SELECT count(*) FROM pg_locks WHERE NOT granted),
+       (SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock')"""
+
+# PG 13 renamed total_time → total_exec_time (and stddev_time likewise)
+_STATEMENTS_SQL = _NLB + """SELECT queryid, left(regexp_replace(query, '\\s+', ' ', 'g'), 200),
+       calls, {total}, {stddev}, rows, shared_blks_hit, shared_blks_read
+  FROM pg_stat_statements
+ WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"""
+
+_DATABASE_COLS = ("xact_commit", "xact_rollback", "blks_read", "blks_hit",
+                  "tup_returned", "tup_fetched", "tup_inserted", "tup_updated",
+                  "tup_deleted", "deadlocks", "conflicts", "temp_files", "temp_bytes",
+                  "stats_reset")
+_WAL_COLS = ("records", "fpi", "bytes", "stats_reset")
+_CHECKPOINT_COLS = ("timed", "requested", "write_ms", "sync_ms", "buffers", "stats_reset")
+
+
+def _one(cur, sql, cols):
+    """First row of `sql` as a dict; None when the view is unavailable.
+    Autocommit connections only — a failed query must not poison the next."""
+    try:
+        cur.execute(sql)
+        row = cur.fetchone()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    return {c: float(v) if isinstance(v, decimal.Decimal) else v for c, v in zip(cols, row)}
+
+
+def snapshot(cur, statements=True):
+    """Cumulative server counters now (see module docstring)."""
+    cur.execute(_IDENTITY_SQL)
+    addr, started, version = cur.fetchone()
+    snap = {"t": time.monotonic(), "server": f"{addr or 'local'}@{started}",
+            "version": version,
+            "database": _one(cur, _DATABASE_SQL, _DATABASE_COLS),
+            "locks": _one(cur, _LOCKS_SQL, ("ungranted", "lock_waiters"))}
+    if version >= 140000:
+        snap["wal"] = _one(cur, _WAL_SQL, _WAL_COLS)
+    snap["checkpoint"] = _one(cur, _CHECKPOINTER_SQL if version >= 170000 else _BGWRITER_SQL,
+                              _CHECKPOINT_COLS)
+    if statements:
+        names = (("total_exec_time", "stddev_exec_time") if version >= 130000
+                 else ("total_time", "stddev_time"))
+        try:
+            cur.execute(_STATEMENTS_SQL.format(total=names[0], stddev=names[1]))
+            snap["statements"] = {
+                str(qid): {"query": q, "calls": calls, "total_ms": float(total),
+                           "stddev_ms": float(stddev), "rows": rows,
+                           "blks_hit": hit, "blks_read": read}
+                for qid, q, calls, total, stddev, rows, hit, read in cur.fetchall()}
+        except Exception:
+            pass
+    return {k: v for k, v in snap.items() if v is not None}
+
+
+def _sumsq(s):
+    """Σx² over all calls, from pg_stat_statements' mean and population stddev."""
+    mean = s["total_ms"] / max(s["calls"], 1)
+    return (s["stddev_ms"] ** 2 + mean ** 2) * s["calls"]
+
+
+def _statements(before, after, top):
+    out = []
+    for qid, a in after.items():
+        b = before.get(qid, {"calls": 0, "total_ms": 0.0, "stddev_ms": 0.0, "rows": 0,
+                             "blks_hit": 0, "blks_read": 0})
+        calls = a["calls"] - b["calls"]
+        if calls <= 0:
+            continue
+        total = a["total_ms"] - b["total_ms"]
+        mean = total / calls
+        var = max((_sumsq(a) - _sumsq(b)) / calls - mean ** 2, 0.0)
+        hit, read = a["blks_hit"] - b["blks_hit"], a["blks_read"] - b["blks_read"]
+        out.append({"queryid": qid, "query": a["query"], "calls": calls,
+                    "total_ms": round(total, 1), "mean_ms": round(mean, 3),
+                    "stddev_ms": round(var ** 0.5, 3), "rows": a["rows"] - b["rows"],
+                    "hit_pct": round(100 * hit / (hit + read), 2) if hit + read else None})
+    out.sort(key=lambda s: s["total_ms"], reverse=True)
+    return out[:top]
+
+
+def delta(before, after, top=20):
+    """Rates between two snapshots; {"error": …} when they are not comparable."""
+    if not before or not after:
+        return {"error": "snapshot missing"}
+    if before["server"] != after["server"]:
+        return {"error": f"server changed ({before['server']} → {after['server']})"}
+    dt = max(after["t"] - before["t"], 1e-6)
+    out = {"seconds": round(dt, 1), "locks_after": after.get("locks", {})}
+    a, b = after.get("database"), before.get("database")
+    if a and b and a["stats_reset"] == b["stats_reset"]:
+        d = {k: a[k] - b[k] for k in _DATABASE_COLS if k != "stats_reset"}
+        blks = d["blks_hit"] + d["blks_read"]
+        out.update(tps=round((d["xact_commit"] + d["xact_rollback"]) / dt, 1),
+                   commits=d["xact_commit"], rollbacks=d["xact_rollback"],
+                   cache_hit_pct=round(100 * d["blks_hit"] / blks, 2) if blks else None,
+                   tuples_written_s=round((d["tup_inserted"] + d["tup_updated"]
+                                           + d["tup_deleted"]) / dt, 1),
+                   deadlocks=d["deadlocks"], conflicts=d["conflicts"],
+                   temp_mb=round(d["temp_bytes"] / 1048576, 2))
+    a, b = after.get("wal"), before.get("wal")
+    if a and b and a["stats_reset"] == b["stats_reset"]:
+        out.update(wal_mb_s=round((a["bytes"] - b["bytes"]) / dt / 1048576, 2),
+                   wal_records_s=round((a["records"] - b["records"]) / dt, 1),
+                   wal_fpi=a["fpi"] - b["fpi"])
+    a, b = after.get("checkpoint"), before.get("checkpoint")
+    if a and b and a["stats_reset"] == b["stats_reset"]:
+        out.update(checkpoints_timed=a["timed"] - b["timed"],
+                   checkpoints_requested=a["requested"] - b["requested"],
+                   checkpoint_write_ms=round(a["write_ms"] - b["write_ms"]),
+                   checkpoint_sync_ms=round(a["sync_ms"] - b["sync_ms"]),
+                   checkpoint_buffers=a["buffers"] - b["buffers"])
+    if "statements" in before and "statements" in after:
+        out["statements"] = _statements(before["statements"], after["statements"], top)
+    return out
@@ -1,14 +1,20 @@
 """PostgreSQL session with Locust request event integration.
 Uses psycogreen for gevent-compatible async I/O."""
+import contextlib
+import functools
 import logging
+import random
+import re
 import time
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Union
 
 import psycopg2
-from psycopg2 import DatabaseError, OperationalError
+from psycopg2 import DatabaseError, OperationalError, errors, extensions
 
 import psycogreen.gevent
 psycogreen.gevent.patch_psycopg()
+import gevent
+from gevent.queue import Empty, LifoQueue
 
 import config as _cfg
 
@@ -18,20 +24,172 @@ logger = logging.getLogger(__name__)
 class PostgresResponse:
     def __init__(self, success: bool, response_time: float,
                  exception: Optional[Exception], response_length: int,
-                 result: Optional[List[Any]] = None):
+                 result: Optional[List[Any]] = None, server: Optional[dict] = None):
         self.success = success
         self.response_time = response_time
         self.exception = exception
         self.response_length = response_length
         self.result = result or []
+        # last backend identity sample of the session ({addr, standby, timeline})
+        self.server = server
 
     def __str__(self):
         return f"success={self.success} rows={self.response_length} exc={self.exception}"
 
 
+_PLACEHOLDER = re.compile(r"%%|%\((\w+)\)s|%s")
+
+
+class Query:
+    """SQL text parsed once: op name (first CODE token — sql files open with
+    -- comments), comment-stripped code and the PREPARE/EXECUTE form. Built
+    outside the timed window so only the round-trip is measured.
+
+    Placeholders are positional (%s) or named (%(name)s — pass a dict); a
+    named one used twice is one PREPARE parameter. Header lines of the form
+    `-- @<key> <args…>` are directives: `-- @op NAME` overrides the event
+    name, the rest are kept in `directives` for db_tasks (e.g. @keys)."""
+    __slots__ = ("name", "sql", "code", "op", "nparams", "param_names", "directives",
+                 "prepare_sql", "execute_sql")
+
+    def __init__(self, sql: str, name: Optional[str] = None):
+        self.name = name
+        self.sql = sql
+        self.directives = [l.strip()[4:].split() for l in sql.splitlines()
+                           if l.strip().startswith("-- @") and len(l.strip()) > 4]
+        self.code = "\n".join(l for l in sql.splitlines()
+                              if not l.strip().startswith("--")).strip()
+        head = self.code.split(None, 1)
+        self.op = head[0].upper() if head else "QUERY"
+        for d in self.directives:
+            if d[0] == "op" and len(d) > 1:
+                self.op = d[1]
+        n = 0
+        names = {}
+
+        def _number(m):
+            nonlocal n
+            if m.group(0) == "%%":
+                return "%%"
+            if m.group(1):
+                if m.group(1) not in names:
+                    n += 1
+                    names[m.group(1)] = n
+                return f"${names[m.group(1)]}"
+            n += 1
+            return f"${n}"
+
+        body = _PLACEHOLDER.sub(_number, self.code.rstrip(";").rstrip())
+        self.nparams = n
+        self.param_names = tuple(names)
+        # PREPARE text is sent without params, so psycopg2 will not un-escape %%
+        self.prepare_sql = f"PREPARE bench_{name} AS {body.replace('%%', '%')}"
+        args = [f"%({p})s" for p in names] if names else ["%s"] * n
+        self.execute_sql = (f"EXECUTE bench_{name}"
+                            + (f"({', '.join(args)})" if n else ""))
+
+    def __str__(self):
+        return self.sql
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_query(sql: str, name: Optional[str] = None) -> Query:
+    """Memoized Query for ad-hoc SQL strings (migration/seed statements)."""
+    return Query(sql, name)
+
+
+FETCH_MODES = ("keep", "count", "stream")
+ISOLATION_LEVELS = {"read_committed": "READ COMMITTED", "repeatable_read": "REPEATABLE READ",
+                    "serializable": "SERIALIZABLE"}
+
+
+RECONNECT_POLICIES = ("immediate", "backoff", "breaker")
+
+
+def parse_profiles(spec: str) -> dict:
+    """"plain:sslmode=disable;tls:sslmode=require,channel_binding=require"
+    → {"plain": {"sslmode": "disable"}, "tls": {…}} (PG_AUTH_PROFILES)."""
+    profiles = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        name, _, args = part.partition(":")
+        try:
+            profiles[name.strip()] = dict(
+                (k.strip(), v.strip()) for k, v in
+                (kv.split("=", 1) for kv in args.split(",") if kv.strip()))
+        except ValueError:
+            raise ValueError(f"bad connection profile {part!r}: expected "
+                             f"name:key=value,key=value") from None
+    return profiles
+
+
+class CircuitOpen(OperationalError):
+    """Raised instead of connecting while the session's breaker is open."""
+
+
+class ReconnectPolicy:
+    """What a session does before it reconnects after losing its connection.
+
+      immediate — connect on the next call (every client of a failed server
+                  hits the new one at the same instant)
+      backoff   — exponential backoff with full jitter: before attempt n
+                  after a loss, sleep uniform(0, min(max_ms, base_ms * 2^(n-1)))
+      breaker   — circuit breaker: after `failures` consecutive connection
+                  errors, calls fail fast (CircuitOpen, no connect) for
+                  open_ms; then one trial connect closes or re-opens it
+
+    Defaults come from config (PG_RECONNECT_*, PG_BREAKER_*)."""
+
+    def __init__(self, policy: str = "immediate", base_ms: Optional[float] = None,
+                 max_ms: Optional[float] = None, failures: Optional[int] = None,
+                 open_ms: Optional[float] = None):
+        if policy not in RECONNECT_POLICIES:
+            raise ValueError(f"reconnect policy must be one of {RECONNECT_POLICIES}, "
+                             f"got {policy!r}")
+        self.policy = policy
+        self.base_ms = _cfg.PG_RECONNECT_BASE_MS if base_ms is None else base_ms
+        self.max_ms = _cfg.PG_RECONNECT_MAX_MS if max_ms is None else max_ms
+        self.threshold = _cfg.PG_BREAKER_FAILURES if failures is None else failures
+        self.open_ms = _cfg.PG_BREAKER_OPEN_MS if open_ms is None else open_ms
+        self.failures = 0           # consecutive connection errors
+        self._open_until = 0        # perf_counter_ns
+
+    def before_connect(self) -> float:
+        """Seconds to wait before this connect; raises CircuitOpen instead
+        while the breaker is open."""
+        if self.policy == "breaker" and self.failures >= self.threshold \
+                and time.perf_counter_ns() < self._open_until:
+            raise CircuitOpen(f"circuit open after {self.failures} connection errors")
+        if self.policy == "backoff" and self.failures:
+            return random.uniform(0, min(self.max_ms,
+                                         self.base_ms * 2 ** (self.failures - 1))) / 1000
+        return 0.0
+
+    def failed(self):
+        self.failures += 1
+        if self.policy == "breaker" and self.failures >= self.threshold:
+            self._open_until = time.perf_counter_ns() + int(self.open_ms * 1e6)
+
+    def succeeded(self):
+        self.failures = 0
+
+
+# Which server answered: address, standby or primary, timeline. The timeline
+# comes from the last checkpoint/restartpoint (pg_control_checkpoint needs
+# superuser or pg_monitor) — without the privilege it is reported as None.
+_IDENTITY_SQL = ("SELECT inet_server_addr()::text, inet_server_port(), pg_is_in_recovery(), "
+                 "(SELECT timeline_id FROM pg_control_checkpoint())")
+_IDENTITY_SQL_NO_TLI = ("SELECT inet_server_addr()::text, inet_server_port(), "
+                        "pg_is_in_recovery(), NULL")
+
+
 class PostgresSession:
     def __init__(self, host: str, port: int, database: str,
-                 user: str, password: str, request_event):
+                 user: str, password: str, request_event,
+                 prepared: bool = False, fetch: str = "keep",
+                 itersize: int = 2000, event_log=None,
+                 role: str = "read", identify_every: int = 0,
+                 reconnect: str = "immediate", connect_args: Optional[dict] = None,
+                 connect_name: str = "CONNECT", outage_event=None):
         self.host = host
         self.port = port
         self.database = database
@@ -40,25 +198,99 @@ class PostgresSession:
         self.request_event = request_event
         self.connection = None
         self._cursor = None
+        self._copy_conn = None     # psycopg 3 connection for COPY (lazy)
+        # prepared=True: named queries are PREPAREd once per connection and run
+        # via EXECUTE. The set is per connection — close() clears it, so the
+        # first call after a reconnect/failover re-prepares on the new backend.
+        self.prepared = prepared
+        self._prepared = set()
+        # fetch policy for result rows:
+        #   keep   — fetchall() into PostgresResponse.result
+        #   count  — rows stay in libpq's buffer, only rowcount is reported
+        #   stream — SELECTs run through a named server-side cursor, `itersize`
+        #            rows per round-trip, counted and dropped (flat worker RSS)
+        if fetch not in FETCH_MODES:
+            raise ValueError(f"fetch must be one of {FETCH_MODES}, got {fetch!r}")
+        self.fetch = fetch
+        self.itersize = itersize
+        # optional probe_log.ProbeLog: one line per query (FailoverProbe)
+        self.event_log = event_log
+        # identify_every=N: ask the server who it is right after every
+        # (re)connect and then every N queries — never per query. Through
+        # PgPool a read session reports its load-balance node; role="write"
+        # adds the /*NO LOAD BALANCE*/ hint so the sample follows the primary,
+        # as the session's writes do. 0 disables; server stays None.
+        self.role = role
+        self.identify_every = identify_every
+        self.server = None
+        self._identity_sql = _IDENTITY_SQL
+        self._since_identify = 0
+        # reconnect=immediate | backoff | breaker (ReconnectPolicy). A lost
+        # connection is timed until the next successful connect: one
+        # outage_event.fire(outage_ms=…) per outage (metrics' outage store —
+        # a downtime is not a request, so it stays out of the request stats).
+        self.reconnect = ReconnectPolicy(reconnect)
+        self.outage_event = outage_event
+        self._lost_ns = None
+        # libpq keywords over config.PG_TLS (sslmode, sslcert, channel_binding,
+        # …) and the event name of this session's handshakes, so sessions with
+        # different auth profiles are measured apart. ssl: negotiated protocol
+        # of the current connection (None = plaintext).
+        self.connect_args = connect_args or {}
+        self.connect_name = connect_name
+        self.ssl = None
+        # ns spent in connect/prepare/identify during the current execute_query() call
+        self._phase_ns = {"connect": 0, "prepare": 0, "identify": 0}
         # Connection is LAZY: first execute_query() connects. A constructor that
         # raises would kill the Locust user in on_start during an outage —
         # exactly when the FailoverProbe must stay alive to measure RTO.
 
+    @property
+    def backend(self) -> str:
+        """Server that answered the last identity sample ("addr:port"), or the
+        configured endpoint when identification is off or pending."""
+        if self.server is not None:
+            return self.server["addr"]
+        return f"{self.host}:{self.port}"
+
+    def _tags(self):
+        """Backend fields for request event contexts (metrics.BackendStats)."""
+        if self.server is None:
+            return {}
+        return {"backend": self.server["addr"], "standby": self.server["standby"]}
+
     # ── connection management ─────────────────────────────────────────────────
 
+    def _dsn(self):
+        return dict(host=self.host, port=self.port,
+                    dbname=self.database, user=self.user, password=self.password,
+                    connect_timeout=_cfg.PG_CONNECT_TIMEOUT,
+                    **{**_cfg.PG_TLS, **self.connect_args})
+
     def _connect(self):
-        start = time.time()
+        waited = time.perf_counter_ns()
+        delay = self.reconnect.before_connect()
+        if delay:
+            gevent.sleep(delay)
+        start = time.perf_counter_ns()
+        # a backoff sleep is connect time for the caller, not for the CONNECT event
+        self._phase_ns["connect"] += start - waited
         try:
-            self.connection = psycopg2.connect(
-                host=self.host, port=self.port,
-                dbname=self.database, user=self.user, password=self.password,
-                connect_timeout=_cfg.PG_CONNECT_TIMEOUT,
-            )
+            self.connection = psycopg2.connect(**self._dsn())
             self.connection.autocommit = True
-            elapsed = (time.time() - start) * 1000
-            self.request_event.fire(request_type="PG", name="CONNECT",
-                                    response_time=elapsed, response_length=0)
+            took = time.perf_counter_ns() - start
+            self._phase_ns["connect"] += took
+            self.request_event.fire(request_type="PG", name=self.connect_name,
+                                    response_time=took / 1e6, response_length=0)
+            info = self.connection.info
+            self.ssl = info.ssl_attribute("protocol") if info.ssl_in_use else None
+            self.reconnect.succeeded()
+            if self._lost_ns is not None:
+                if self.outage_event is not None:
+                    self.outage_event.fire(outage_ms=(start + took - self._lost_ns) / 1e6)
+                self._lost_ns = None
         except Exception:
+            self._phase_ns["connect"] += time.perf_counter_ns() - start
             # Do NOT fire a failure event here: execute_query() records the
             # failure for the query that triggered the reconnect. Firing both
             # would double-count every probe failure (CONNECT + PG_QUERY).
@@ -76,6 +308,16 @@ class PostgresSession:
         self.close()
         self._connect()
 
+    def _connection_lost(self, exc):
+        """A connection-level error: close, and count it for the reconnect
+        policy (a CircuitOpen was no attempt). The outage clock starts at the
+        first error and runs until a connect succeeds."""
+        if not isinstance(exc, CircuitOpen):
+            self.reconnect.failed()
+        if self._lost_ns is None:
+            self._lost_ns = time.perf_counter_ns()
+        self.close()
+
     def close(self):
         try:
             if self.connection:
@@ -85,35 +327,354 @@ class PostgresSession:
         finally:
             self.connection = None
             self._cursor = None
+            self._prepared.clear()
+            self.server = None       # re-identified after the reconnect
+            if self._copy_conn is not None:
+                try:
+                    self._copy_conn.close()
+                except Exception:
+                    pass
+                self._copy_conn = None
+
+    def _prepare(self, cur, query: Query):
+        """PREPARE `query` on the current connection (once per connection)."""
+        if query.name not in self._prepared:
+            start = time.perf_counter_ns()
+            cur.execute(query.prepare_sql)
+            self._prepared.add(query.name)
+            took = time.perf_counter_ns() - start
+            self._phase_ns["prepare"] += took
+            self.request_event.fire(request_type="PG", name="PREPARE",
+                                    response_time=took / 1e6, response_length=0)
+
+    def _identify(self, cur):
+        """Sample the backend identity on the current connection."""
+        start = time.perf_counter_ns()
+        prefix = "/*NO LOAD BALANCE*/ " if self.role == "write" else ""
+        try:
+            cur.execute(prefix + self._identity_sql)
+        except errors.InsufficientPrivilege:
+            self._identity_sql = _IDENTITY_SQL_NO_TLI
+            cur.execute(prefix + self._identity_sql)
+        addr, port, standby, timeline = cur.fetchone()
+        self.server = {"addr": f"{addr}:{port}" if addr else f"local:{port}",
+                       "standby": standby, "timeline": timeline}
+        self._since_identify = 0
+        self._phase_ns["identify"] += time.perf_counter_ns() - start
 
     # ── query execution ───────────────────────────────────────────────────────
 
-    def execute_query(self, query: str,
-                      params: Optional[tuple] = None) -> PostgresResponse:
-        start = time.time()
-        # name the operation by its first CODE token — sql files open with -- comments
-        code = "\n".join(l for l in query.splitlines()
-                         if not l.strip().startswith("--")).strip()
-        op = code.split()[0].upper() if code.split() else "QUERY"
+    def execute_query(self, query: Union[Query, str], params: Union[tuple, dict, None] = None,
+                      scheduled_ns: Optional[int] = None,
+                      fetch: Optional[str] = None, copy=None) -> PostgresResponse:
+        """Run one statement and fire a PG_QUERY event. A named Query (from
+        db_tasks._sql) runs via its prepared statement when prepared=True.
+
+        response_time is execute + fetch only (monotonic perf_counter_ns): a
+        reconnect is reported by its own CONNECT event instead of inflating
+        the query. The per-phase split rides on the event context for
+        metrics.PhaseStats.
+
+        scheduled_ns (open-loop load, perf_counter_ns clock) is the intended
+        send time: response_time then runs from it, so time spent queued
+        behind a slow server counts (no coordinated omission).
+
+        fetch overrides the session's fetch policy for this call (e.g. "keep"
+        for a lookup whose rows the caller needs).
+
+        copy: a file object to stream into a `COPY … FROM STDIN` query
+        (rewound first); the event length is the rows copied. psycopg2
+        refuses COPY while psycogreen's wait callback is installed, so COPY
+        runs on a second connection of this session opened with psycopg 3,
+        which waits through the monkey-patched select — green like the rest."""
+        entered = time.perf_counter_ns()
+        if not isinstance(query, Query):
+            query = compile_query(query)
+        op = query.op
+        fetch = fetch or self.fetch
+        phase = self._phase_ns
+        phase["connect"] = phase["prepare"] = phase["identify"] = 0
+        io_start = time.perf_counter_ns()
         try:
             cur = self._cursor_obj()
-            cur.execute(query, params)
-            if cur.description:
-                rows = cur.fetchall()
-                length = len(rows)
+            if self.identify_every and (self.server is None
+                                        or self._since_identify >= self.identify_every):
+                self._identify(cur)
+            self._since_identify += 1
+            rows = []
+            if copy is not None:
+                copy.seek(0)
+                started = time.perf_counter_ns()
+                length = self._copy(query.sql, copy)
+                executed = time.perf_counter_ns()
+            elif fetch == "stream" and query.op == "SELECT":
+                # DECLARE cannot wrap EXECUTE, so streaming always sends the text
+                started = time.perf_counter_ns()
+                length, executed = self._stream(query.sql, params)
             else:
-                rows = []
-                length = cur.rowcount if cur.rowcount >= 0 else 0
-            elapsed = (time.time() - start) * 1000
+                if self.prepared and query.name:
+                    self._prepare(cur, query)
+                    sql = query.execute_sql
+                else:
+                    sql = query.sql
+                started = time.perf_counter_ns()
+                cur.execute(sql, params)
+                executed = time.perf_counter_ns()
+                if cur.description and fetch == "keep":
+                    rows = cur.fetchall()
+                    length = len(rows)
+                else:
+                    length = cur.rowcount if cur.rowcount >= 0 else 0
+            fetched = time.perf_counter_ns()
+            elapsed = (fetched - (started if scheduled_ns is None else scheduled_ns)) / 1e6
             self.request_event.fire(request_type="PG_QUERY", name=op,
-                                    response_time=elapsed, response_length=length)
-            return PostgresResponse(True, elapsed, None, length, rows)
+                                    response_time=elapsed, response_length=length,
+                                    context={"phases": self._phases(entered, started, executed,
+                                                                    fetched, scheduled_ns),
+                                             **self._tags()})
+            if self.event_log is not None:
+                self.event_log.record(op, True, elapsed, backend=self.backend)
+            return PostgresResponse(True, elapsed, None, length, rows, self.server)
         except (OperationalError, DatabaseError, Exception) as exc:
-            elapsed = (time.time() - start) * 1000
+            # a failure costs the caller everything after parsing — including
+            # a connect attempt that timed out — so that is what gets recorded
+            elapsed = (time.perf_counter_ns() -
+                       (io_start if scheduled_ns is None else scheduled_ns)) / 1e6
             self.request_event.fire(request_type="PG_QUERY", name=op,
                                     response_time=elapsed, response_length=0,
-                                    exception=exc)
+                                    exception=exc, context=self._tags())
+            if self.event_log is not None:
+                self.event_log.record(op, False, elapsed, exc, backend=self.backend)
+            phase.pop("pool_wait", None)
             # On connection-level errors, reset so the next call reconnects
             if isinstance(exc, (OperationalError, psycopg2.InterfaceError)):
-                self.close()
+                self._connection_lost(exc)
+            # A pooler that moved us to another backend (PgPool after failover)
+            # keeps the socket but loses the PREPAREd plans — re-prepare next call.
+            elif isinstance(exc, errors.InvalidSqlStatementName):
+                self._prepared.clear()
+            raise
+
+    def execute_transaction(self, name: str, statements: List[Query],
+                            params: Union[tuple, dict, None] = None,
+                            isolation: str = "read_committed", retries: int = 0,
+                            scheduled_ns: Optional[int] = None) -> PostgresResponse:
+        """BEGIN ISOLATION LEVEL …; every statement of `statements` with the
+        same params; COMMIT — fired as ONE PG_TXN event `name`.
+
+        A serialization failure or deadlock (SQLSTATE 40xxx) rolls back, fires
+        a failed PG_TXN "<name> ABORT" event for the wasted attempt and, while
+        `retries` remain, runs the whole transaction again. The PG_TXN latency
+        spans every attempt — what the application would have waited. Any
+        other error (e.g. the connection dying in a switchover) fails the
+        transaction at once; length = rows touched by all statements."""
+        begin = f"BEGIN ISOLATION LEVEL {ISOLATION_LEVELS[isolation]}"
+        io_start = time.perf_counter_ns()
+        origin = io_start if scheduled_ns is None else scheduled_ns
+        attempt = 0
+        while True:
+            attempt_start = time.perf_counter_ns()
+            cur = None
+            try:
+                cur = self._cursor_obj()
+                if self.identify_every and (self.server is None
+                                            or self._since_identify >= self.identify_every):
+                    self._identify(cur)
+                self._since_identify += 1
+                cur.execute(begin)
+                length = 0
+                for query in statements:
+                    if self.prepared and query.name:
+                        self._prepare(cur, query)
+                        cur.execute(query.execute_sql, params)
+                    else:
+                        cur.execute(query.sql, params)
+                    length += max(cur.rowcount, 0)
+                cur.execute("COMMIT")
+                elapsed = (time.perf_counter_ns() - origin) / 1e6
+                self.request_event.fire(request_type="PG_TXN", name=name,
+                                        response_time=elapsed, response_length=length,
+                                        context={"attempts": attempt + 1, **self._tags()})
+                if self.event_log is not None:
+                    self.event_log.record(name, True, elapsed, backend=self.backend)
+                self._phase_ns.pop("pool_wait", None)
+                return PostgresResponse(True, elapsed, None, length, None, self.server)
+            except extensions.TransactionRollbackError as exc:
+                self._rollback(cur)
+                self.request_event.fire(request_type="PG_TXN", name=f"{name} ABORT",
+                                        response_time=(time.perf_counter_ns() - attempt_start) / 1e6,
+                                        response_length=0, exception=exc, context=self._tags())
+                if attempt < retries:
+                    attempt += 1
+                    continue
+                self._txn_failed(name, origin, exc)
+                raise
+            except Exception as exc:
+                if not isinstance(exc, (OperationalError, psycopg2.InterfaceError)):
+                    self._rollback(cur)
+                self._txn_failed(name, origin, exc)
+                if isinstance(exc, (OperationalError, psycopg2.InterfaceError)):
+                    self._connection_lost(exc)
+                elif isinstance(exc, errors.InvalidSqlStatementName):
+                    self._prepared.clear()
+                raise
+
+    @staticmethod
+    def _rollback(cur):
+        if cur is None:
+            return
+        try:
+            cur.execute("ROLLBACK")
+        except Exception:
+            pass
+
+    def _txn_failed(self, name, origin, exc):
+        elapsed = (time.perf_counter_ns() - origin) / 1e6
+        self.request_event.fire(request_type="PG_TXN", name=name, response_time=elapsed,
+                                response_length=0, exception=exc, context=self._tags())
+        if self.event_log is not None:
+            self.event_log.record(name, False, elapsed, exc, backend=self.backend)
+        self._phase_ns.pop("pool_wait", None)
+
+    def _copy(self, sql, data):
+        """COPY FROM STDIN on the session's psycopg 3 connection; returns the
+        rows copied. Connect time lands in the connect phase. It is opened
+        right after the main connection answered, so the reconnect policy
+        already gated it; a connection error here counts as a lost
+        connection like any other and closes both."""
+        import psycopg      # after Locust's monkey-patching: waits cooperatively
+        try:
+            if self._copy_conn is None or self._copy_conn.closed:
+                start = time.perf_counter_ns()
+                try:
+                    self._copy_conn = psycopg.connect(**self._dsn(), autocommit=True,
+                                                      prepare_threshold=None)
+                finally:
+                    self._phase_ns["connect"] += time.perf_counter_ns() - start
+            with self._copy_conn.cursor() as cur:
+                with cur.copy(sql) as pipe:
+                    pipe.write(data.read())
+                return cur.rowcount if cur.rowcount >= 0 else 0
+        except (psycopg.OperationalError, psycopg.InterfaceError) as exc:
+            self._connection_lost(exc)
+            raise
+
+    def _stream(self, sql, params):
+        """Run a SELECT through a named (server-side) cursor and count its rows
+        `itersize` at a time. Named cursors need a transaction block, so
+        autocommit is dropped for the duration. Returns (rows, executed_ns)."""
+        conn = self.connection
+        conn.autocommit = False
+        try:
+            with conn.cursor(name="bench_stream") as cur:
+                cur.itersize = self.itersize
+                cur.execute(sql, params)          # DECLARE only — no rows yet
+                executed = time.perf_counter_ns()
+                length = 0
+                while True:
+                    chunk = cur.fetchmany(self.itersize)
+                    if not chunk:
+                        break
+                    length += len(chunk)
+            conn.commit()
+            return length, executed
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
             raise
+        finally:
+            try:
+                conn.autocommit = True
+            except Exception:
+                pass       # broken connection — execute_query() closes it
+
+    def _phases(self, entered, started, executed, fetched, scheduled_ns=None):
+        """ms per phase of one successful call; overhead = everything client-side."""
+        connect, prepare = self._phase_ns["connect"], self._phase_ns["prepare"]
+        identify = self._phase_ns["identify"]
+        overhead = ((time.perf_counter_ns() - entered) - (fetched - started)
+                    - connect - prepare - identify)
+        # set by SessionPool for the borrow that led to this call (0 per-user)
+        pool_wait = self._phase_ns.pop("pool_wait", 0)
+        split = {}
+        if scheduled_ns is not None:
+            # open loop: intended send time → call entry, minus the pool borrow
+            split["queue"] = max(entered - scheduled_ns - pool_wait, 0) / 1e6
+        split.update({"pool_wait": pool_wait / 1e6, "connect": connect / 1e6,
+                      "prepare": prepare / 1e6, "identify": identify / 1e6,
+                      "execute": (executed - started) / 1e6,
+                      "fetch": (fetched - executed) / 1e6, "overhead": max(overhead, 0) / 1e6})
+        return split
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class SessionPool:
+    """Bounded, gevent-safe pool of PostgresSessions shared by every user of
+    one worker process (PG_CONNECTION_MODE=pooled) — the "app-side pool"
+    topology, versus one connection per simulated client.
+
+    Quacks like a session: execute_query() borrows for exactly one call, so
+    db_tasks functions take either. Sessions stay lazy; a borrowed session
+    whose connection is closed or stuck in a transaction is reset first, and
+    a session that comes back broken (failover) evicts every idle connection,
+    since they point at the same dead backend."""
+
+    def __init__(self, size: int, timeout: float, request_event, **session_kwargs):
+        self.size = size
+        self.timeout = timeout
+        self.request_event = request_event
+        self._idle = LifoQueue()
+        for _ in range(size):
+            self._idle.put(PostgresSession(request_event=request_event, **session_kwargs))
+
+    @staticmethod
+    def _healthy(session):
+        conn = session.connection
+        return conn is None or (not conn.closed and conn.get_transaction_status()
+                                == extensions.TRANSACTION_STATUS_IDLE)
+
+    def _evict_idle(self):
+        for idle in list(self._idle.queue):
+            idle.close()
+
+    @contextlib.contextmanager
+    def session(self):
+        start = time.perf_counter_ns()
+        try:
+            session = self._idle.get(timeout=self.timeout)
+        except Empty:
+            exc = PoolTimeout(f"no idle connection within {self.timeout}s (pool size {self.size})")
+            self.request_event.fire(request_type="PG", name="POOL_ACQUIRE",
+                                    response_time=(time.perf_counter_ns() - start) / 1e6,
+                                    response_length=0, exception=exc)
+            raise exc
+        session._phase_ns["pool_wait"] = time.perf_counter_ns() - start
+        try:
+            if not self._healthy(session):
+                session.close()
+            yield session
+        finally:
+            if session.connection is None:
+                self._evict_idle()
+            self._idle.put(session)
+
+    def execute_query(self, query: Union[Query, str], params: Union[tuple, dict, None] = None,
+                      scheduled_ns: Optional[int] = None,
+                      fetch: Optional[str] = None, copy=None) -> PostgresResponse:
+        with self.session() as session:
+            return session.execute_query(query, params, scheduled_ns=scheduled_ns,
+                                         fetch=fetch, copy=copy)
+
+    def execute_transaction(self, name: str, statements: List[Query],
+                            params: Union[tuple, dict, None] = None, **kw) -> PostgresResponse:
+        with self.session() as session:
+            return session.execute_transaction(name, statements, params, **kw)
+
+    def close(self):
+        """Close idle connections (they reconnect lazily on the next borrow)."""
+        self._evict_idle()
@@ -0,0 +1,119 @@
+"""Per-request event stream of the FailoverProbe, and exact RTO from it.
+
+Every probe request appends one tab-separated line to an append-only file:
+
+    end_ns  ok  latency_ms  op  error_class  backend
+
+end_ns is the wall-clock completion time (time.time_ns(), comparable with
+the runner's injection timestamp); the send time is end_ns - latency. At
+~20 requests/s this is a few hundred bytes per second per probe — the run
+is reconstructed request by request instead of from 2 s polled deltas, so
+RTO and detection lag come out with millisecond precision.
+
+Files live in config.PROBE_LOG_DIR, one per probe user (probe_<pid>_<n>.tsv);
+the runner clears the directory before each scenario. Nothing here imports
+gevent or locust."""
+import glob
+import itertools
+import os
+import time
+
+_seq = itertools.count(1)
+
+
+class ProbeLog:
+    """Append-only writer — one line per request, flushed per line so a
+    crashed worker loses nothing already measured."""
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"probe_{os.getpid()}_{next(_seq)}.tsv")
+        self._fh = open(self.path, "a", buffering=1)
+
+    def record(self, op, ok, latency_ms, exception=None, backend=""):
+        if self._fh is None:
+            return
+        err = type(exception).__name__ if exception is not None else ""
+        self._fh.write(f"{time.time_ns()}\t{int(ok)}\t{latency_ms:.3f}\t{op}\t{err}\t{backend}\n")
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def clear(directory: str):
+    for path in glob.glob(os.path.join(directory, "probe_*.tsv")):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def read_events(directory: str, since_ns: int = 0):
+    """All events from every probe file, completed at/after since_ns, by time."""
+    events = []
+    for path in glob.glob(os.path.join(directory, "probe_*.tsv")):
+        with open(path) as fh:
+            for line in fh:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) != 6:
+                    continue          # torn last line of a killed worker
+                end_ns = int(parts[0])
+                if end_ns < since_ns:
+                    continue
+                events.append({"end_ns": end_ns, "ok": parts[1] == "1",
+                               "latency_ms": float(parts[2]), "op": parts[3],
+                               "error": parts[4], "backend": parts[5]})
+    events.sort(key=lambda e: e["end_ns"])
+    return events
+
+
+def compute_rto(events, inject_ns, stall_ms=1000, clean_run=10):
+    """Outage window from the per-request stream.
+
+    A request is *degraded* if it failed or took longer than stall_ms (a
+    query that hung through the switchover is downtime even if it finally
+    succeeded). The outage starts at the SEND time of the first degraded
+    request after injection and ends at the completion of the first request
+    that starts a run of `clean_run` consecutive clean ones (≈1 s of probe
+    traffic). A run cut short by the end of the log does not count: a probe
+    still flapping when the scenario ends is reported recovered=False. Returns
+    None when no events follow the injection."""
+    post = [e for e in events if e["end_ns"] >= inject_ns]
+    if not post:
+        return None
+
+    def degraded(e):
+        return not e["ok"] or e["latency_ms"] > stall_ms
+
+    before = [e for e in events if e["end_ns"] < inject_ns and e["ok"]]
+    first_bad = next((i for i, e in enumerate(post) if degraded(e)), None)
+    if first_bad is None:
+        return {"rto_s": 0, "detect_lag_s": None, "first_success_s": None,
+                "recovered": True, "failed_requests": 0, "error_classes": [],
+                "backend_before": before[-1]["backend"] if before else None,
+                "backend_after": post[-1]["backend"]}
+
+    outage_start = post[first_bad]["end_ns"] - int(post[first_bad]["latency_ms"] * 1e6)
+    outage_start = max(outage_start, inject_ns)
+    tail = post[first_bad:]
+    first_ok = next((e for e in tail if e["ok"]), None)
+    recovered_at = None
+    for i, e in enumerate(tail):
+        window = tail[i:i + clean_run]
+        if len(window) == clean_run and not any(degraded(w) for w in window):
+            recovered_at = e["end_ns"]
+            break
+    end = recovered_at if recovered_at is not None else post[-1]["end_ns"]
+    return {
+        "rto_s":           round((end - outage_start) / 1e9, 3),
+        "detect_lag_s":    round((outage_start - inject_ns) / 1e9, 3),
+        "first_success_s": round((first_ok["end_ns"] - inject_ns) / 1e9, 3) if first_ok else None,
+        "recovered":       recovered_at is not None,
+        "failed_requests": sum(1 for e in tail if not e["ok"]
+                               and (recovered_at is None or e["end_ns"] < recovered_at)),
+        "error_classes":   sorted({e["error"] for e in tail if e["error"]}),
+        "backend_before":  before[-1]["backend"] if before else None,
+        "backend_after":   first_ok["backend"] if first_ok else None,
+    }
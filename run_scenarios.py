@@ -4,7 +4,10 @@ run_scenarios.py — run all HA benchmark scenarios via the Locust REST API
 and generate a self-contained HTML report + raw JSON results.
 
 Usage:
-    python run_scenarios.py [--output reports/benchmark.html] [--scenarios id ...]
+    python run_scenarios.py [--output reports/benchmark.html] [--scenarios id ...] [--workers N]
+    python run_scenarios.py --capacity-search --scenarios baseline_mixed [--slo-p99-ms 250]
+    python run_scenarios.py --soak 24h --scenarios openloop_mixed [--soak-window 60]
+    python run_scenarios.py --resume reports/soak_<ts>      # after a runner crash
 
 Hardening (v2):
   * Health gate before EVERY scenario: 1 leader + 2 streaming replicas
@@ -13,9 +16,27 @@ Hardening (v2):
     leader_crash first moves the leader OFF the proxy node (the node whose
     PgPool the benchmark connects to) so we measure DB failover, not proxy death.
   * Timeline = per-interval deltas of num_requests/num_failures (not Locust's
-    smoothed current_rps), so outage windows line up with wall-clock.
+    smoothed current_rps), so outage windows line up with wall-clock. Locust
+    stats, Patroni state and replica lag are sampled by independent threads on
+    fixed clocks (collectors.py) and merged afterwards, so a hanging Patroni
+    node cannot stretch the sampling interval. Replica lag comes from
+    pg_stat_replication on the primary (PG_REPL_LAG_HZ, default 4 Hz), per
+    replica in bytes and seconds, over one persistent connection.
   * RTO = first failing/stalled sample after injection → first of 2 consecutive
     clean samples. Reported as "not recovered" if the window never closes.
+  * Load generator = Locust master + --workers processes (default: CPU
+    count); every /swarm waits for all workers. Each load process reports its
+    own CPU, event-loop lag and GC pauses per second (genmon.py); they join
+    the timeline, and a scenario over the GEN_* thresholds is marked
+    "generator-limited" — that latency is the client's, not the database's.
+    --generator-guard abort also stops such a scenario early.
+  * When the FailoverProbe ran, RTO / detection lag / first success come from
+    its per-request event log instead (probe_log.py) — millisecond precision;
+    the polled estimate is kept alongside as rto_poll_s.
+  * Server counters (pgstats.py: pg_stat_database / _wal / checkpointer,
+    pg_stat_statements, lock waits) are snapshotted before and after each
+    scenario; the deltas (TPS, cache hit, WAL, checkpoints, per-statement
+    mean / stddev) go into the JSON and the report.
 """
 import argparse
 import json
@@ -24,17 +45,31 @@ import subprocess
 import sys
 import time
 from datetime import datetime
+from html import escape
 
 import psycopg2
 import requests
 
+import collectors
 import config
+import pgstats
+import probe_log
+from metrics import LatencyHistogram, merge_intervals
+from open_loop import format_rates
 
 # ── scenario definitions ─────────────────────────────────────────────────────
 # inject.command / inject.recovery may contain {leader} / {replica} / {target}:
 #   {leader}  → current Patroni leader at injection time
 #   {replica} → a streaming replica that is NOT the proxy node
 #   {target}  → whatever the command killed (for recovery)
+#
+# Load model: closed loop by default (each user waits for its response, then
+# sleeps `between(...)`). "open_loop_rps" switches a scenario to OpenLoopUser:
+# {op: total rps} issued on a fixed schedule whatever the latency, with
+# "users" as the in-flight cap — the only honest model for outage latency.
+# "engine" runs the scenario on AsyncEngineUser instead: one async_engine.py
+# process per worker, "users" = total in-flight requests split across them,
+# "mix" = op weights (or the open_loop_rps schedule when both are set).
 
 SCENARIOS = [
     {
@@ -67,6 +102,28 @@ SCENARIOS = [
         "duration":    90,
         "inject":      None,
     },
+    {
+        "id":          "baseline_transactions",
+        "name":        "Baseline — Transactions",
+        "description": "BEGIN / SELECT FOR UPDATE / UPDATE / INSERT / COMMIT at the file's "
+                       "isolation level. Transaction latency and abort (retry) rate.",
+        "user_class":  "TransactionUser",
+        "users":       10,
+        "spawn_rate":  2,
+        "duration":    90,
+        "inject":      None,
+    },
+    {
+        "id":          "bulk_ingest",
+        "name":        "Bulk Ingest — Batched INSERT / COPY",
+        "description": "PG_BULK_BATCH-row multi-row INSERTs and COPYs, no failures. "
+                       "Reports rows/s and WAL MB/s; the scenario that builds replica lag.",
+        "user_class":  "BulkIngestUser",
+        "users":       4,
+        "spawn_rate":  4,
+        "duration":    90,
+        "inject":      None,
+    },
     {
         "id":          "failover_leader_crash",
         "name":        "HA — Leader Crash (A1)",
@@ -108,6 +165,25 @@ SCENARIOS = [
             "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
         },
     },
+    {
+        "id":          "failover_switchover_transactions",
+        "name":        "HA — Planned Switchover, Transactions (A6-TX)",
+        "description": "Switchover while multi-statement transactions are in flight: "
+                       "how many are lost mid-transaction and how fast commits resume.",
+        "user_class":  "TransactionUser",
+        "users":       10,
+        "spawn_rate":  5,
+        "duration":    120,
+        "inject": {
+            "name":          "switchover-inject",          # env: SWITCHOVER_INJECT_CMD
+            "delay":         45,
+            "command":       config.SWITCHOVER_INJECT_CMD,
+            "recovery_name": "switchover-recovery",        # env: SWITCHOVER_RECOVERY_CMD
+            "recovery":      config.SWITCHOVER_RECOVERY_CMD or None,
+            "stable_name":   "switchover-stable-check",    # env: SWITCHOVER_STABLE_CMD
+            "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
+        },
+    },
     {
         "id":          "failover_node_poweroff",
         "name":        "HA — Replica Power-Off (A2)",
@@ -128,6 +204,138 @@ SCENARIOS = [
             "stable_cmd":    config.REPLICA_POWEROFF_STABLE_CMD,
         },
     },
+    {
+        "id":          "openloop_mixed",
+        "name":        "Open Loop — Mixed Load",
+        "description": "Fixed 100 req/s (80 read / 20 write) on a constant arrival schedule. "
+                       "Latency is measured from the intended send time, so queueing shows.",
+        "user_class":  "OpenLoopUser",
+        "users":       50,             # max requests in flight, not the load level
+        "spawn_rate":  50,
+        "duration":    90,
+        "open_loop_rps": {"read_simple": 80, "write_simple": 20},
+        "inject":      None,
+    },
+    {
+        "id":          "async_mixed",
+        "name":        "Async Engine — Mixed Load",
+        "description": "Baseline mix with no think time from an asyncio engine (psycopg 3): "
+                       "500 requests in flight without a gevent loop per worker as the cap. "
+                       "Compare with baseline_mixed for the generator's share of latency.",
+        "user_class":  "AsyncEngineUser",
+        "users":       500,            # requests in flight, across all engines
+        "spawn_rate":  500,
+        "duration":    90,
+        "engine":      {"mix": {"read_simple": 5, "write_simple": 1}},
+        "inject":      None,
+    },
+    {
+        "id":          "connect_storm",
+        "name":        "Connection Storm — Connect-Rate Ceiling",
+        "description": "200 clients connect, SELECT 1 and disconnect in a tight loop. "
+                       "CONNECT/s is the endpoint's connect-rate ceiling (PgPool / CNPG "
+                       "service), CONNECT p50/p99 its handshake latency under the storm.",
+        "user_class":  "ConnectStormUser",
+        "users":       200,
+        "spawn_rate":  200,
+        "duration":    60,
+        "inject":      None,
+    },
+    {
+        "id":          "connect_handshake_cost",
+        "name":        "Connection Storm — Handshake Cost per Auth Mode",
+        "description": "50 clients churn connections round-robin over PG_AUTH_PROFILES "
+                       "(plaintext, TLS, channel binding, client cert). Per mode: "
+                       "handshake p50/p99 and connects/s — the TLS + SCRAM share of a "
+                       "reconnect storm.",
+        "user_class":  "HandshakeUser",
+        "users":       50,
+        "spawn_rate":  50,
+        "duration":    60,
+        "inject":      None,
+    },
+    {
+        "id":          "reconnect_storm_immediate",
+        "name":        "HA — Reconnect Storm, Immediate (A6-RC)",
+        "description": "Switchover with 200 connected clients that all reconnect on their "
+                       "next call. RECONNECT p50/p99 = per-client downtime; compare with "
+                       "the backoff and breaker variants.",
+        "user_class":  "ReconnectUser",
+        "users":       200,
+        "spawn_rate":  200,
+        "duration":    90,
+        "reconnect_policy": "immediate",
+        "inject": {
+            "name":          "switchover-inject",          # env: SWITCHOVER_INJECT_CMD
+            "delay":         30,
+            "command":       config.SWITCHOVER_INJECT_CMD,
+            "recovery_name": "switchover-recovery",        # env: SWITCHOVER_RECOVERY_CMD
+            "recovery":      config.SWITCHOVER_RECOVERY_CMD or None,
+            "stable_name":   "switchover-stable-check",    # env: SWITCHOVER_STABLE_CMD
+            "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
+        },
+    },
+    {
+        "id":          "reconnect_storm_backoff",
+        "name":        "HA — Reconnect Storm, Jittered Backoff (A6-RC)",
+        "description": "Same switchover; clients back off exponentially with full jitter "
+                       "(PG_RECONNECT_BASE_MS / _MAX_MS) — a spread-out herd.",
+        "user_class":  "ReconnectUser",
+        "users":       200,
+        "spawn_rate":  200,
+        "duration":    90,
+        "reconnect_policy": "backoff",
+        "inject": {
+            "name":          "switchover-inject",          # env: SWITCHOVER_INJECT_CMD
+            "delay":         30,
+            "command":       config.SWITCHOVER_INJECT_CMD,
+            "recovery_name": "switchover-recovery",        # env: SWITCHOVER_RECOVERY_CMD
+            "recovery":      config.SWITCHOVER_RECOVERY_CMD or None,
+            "stable_name":   "switchover-stable-check",    # env: SWITCHOVER_STABLE_CMD
+            "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
+        },
+    },
+    {
+        "id":          "reconnect_storm_breaker",
+        "name":        "HA — Reconnect Storm, Circuit Breaker (A6-RC)",
+        "description": "Same switchover; after PG_BREAKER_FAILURES errors a client fails "
+                       "fast for PG_BREAKER_OPEN_MS, then tries once.",
+        "user_class":  "ReconnectUser",
+        "users":       200,
+        "spawn_rate":  200,
+        "duration":    90,
+        "reconnect_policy": "breaker",
+        "inject": {
+            "name":          "switchover-inject",          # env: SWITCHOVER_INJECT_CMD
+            "delay":         30,
+            "command":       config.SWITCHOVER_INJECT_CMD,
+            "recovery_name": "switchover-recovery",        # env: SWITCHOVER_RECOVERY_CMD
+            "recovery":      config.SWITCHOVER_RECOVERY_CMD or None,
+            "stable_name":   "switchover-stable-check",    # env: SWITCHOVER_STABLE_CMD
+            "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
+        },
+    },
+    {
+        "id":          "failover_switchover_open_loop",
+        "name":        "HA — Planned Switchover, Open Loop (A6-OL)",
+        "description": "Switchover under a constant 40 req/s arrival rate. Unlike the closed-loop "
+                       "probe, offered load does not drop during the outage, so p99 and RTO "
+                       "include the requests that queued behind it.",
+        "user_class":  "OpenLoopUser",
+        "users":       50,
+        "spawn_rate":  50,
+        "duration":    120,
+        "open_loop_rps": {"read_simple": 20, "write_simple": 20},
+        "inject": {
+            "name":          "switchover-inject",          # env: SWITCHOVER_INJECT_CMD
+            "delay":         45,
+            "command":       config.SWITCHOVER_INJECT_CMD,
+            "recovery_name": "switchover-recovery",        # env: SWITCHOVER_RECOVERY_CMD
+            "recovery":      config.SWITCHOVER_RECOVERY_CMD or None,
+            "stable_name":   "switchover-stable-check",    # env: SWITCHOVER_STABLE_CMD
+            "stable_cmd":    config.SWITCHOVER_STABLE_CMD,
+        },
+    },
 ]
 
 # ── cluster helpers (Patroni REST + PgPool write check) ──────────────────────
@@ -168,11 +376,7 @@ def pick_replica(members=None, avoid=()):
 
 def write_check():
     """Prove the full write path: client → PgPool → current primary."""
-    conn = psycopg2.connect(
-        host=config.PG_HOST, port=config.PG_WRITE_PORT,
-        dbname=config.PG_DATABASE, user=config.PG_USER,
-        password=config.PG_PASSWORD, connect_timeout=3,
-    )
+    conn = _pg_connect(connect_timeout=3)
     try:
         conn.autocommit = True
         cur = conn.cursor()
@@ -222,21 +426,17 @@ def cluster_snapshot():
     }
 
 
-def max_replica_lag(members=None):
-    """Max streaming lag (bytes) across replicas — 0 when fully caught up."""
-    members = members if members is not None else get_members()
-    lags = [m.get("lag") or 0 for m in members
-            if m.get("role") in ("replica", "sync_standby") and isinstance(m.get("lag"), int)]
-    return max(lags) if lags else 0
+def _pg_connect(connect_timeout=5, **kwargs):
+    return psycopg2.connect(
+        host=config.PG_HOST, port=config.PG_WRITE_PORT,
+        dbname=config.PG_DATABASE, user=config.PG_USER,
+        password=config.PG_PASSWORD, connect_timeout=connect_timeout,
+        **{**config.PG_TLS, **kwargs})
 
 
 def _pg_query(sql):
     """One-shot query through the PgPool write port; returns list of tuples."""
-    conn = psycopg2.connect(
-        host=config.PG_HOST, port=config.PG_WRITE_PORT,
-        dbname=config.PG_DATABASE, user=config.PG_USER,
-        password=config.PG_PASSWORD, connect_timeout=5,
-    )
+    conn = _pg_connect()
     try:
         conn.autocommit = True
         cur = conn.cursor()
@@ -303,6 +503,7 @@ def capture_environment():
     for name in config.LAB_NODES:
         env["nodes"][name] = _node_specs(config.NODE_SHELL.format(node=name))
     env["nodes"]["host (load generator)"] = _node_specs("")
+    env["locust_workers"] = WORKERS or "standalone"
     env["cluster"] = cluster_snapshot()
     return env
 
@@ -328,6 +529,8 @@ PRE_STEPS = {"leader_off_proxy": pre_leader_off_proxy}
 # ── Locust API helpers ────────────────────────────────────────────────────────
 
 BASE_URL = f"http://127.0.0.1:{config.LOCUST_WEB_PORT}"
+WORKERS = 0       # Locust worker processes main() started (0 = standalone)
+GENERATOR_GUARD = "warn"
 
 
 def _api(method, path, **kwargs):
@@ -349,15 +552,46 @@ def _wait_locust_ready(timeout=30):
     return False
 
 
-def _swarm(user_class, users, spawn_rate):
+def _wait_workers(expected, timeout=60):
+    """Distributed mode: wait until `expected` workers are connected and not
+    missing. Returns the count actually connected."""
+    deadline = time.time() + timeout
+    connected = 0
+    while True:
+        snap = _get_stats()
+        connected = sum(1 for w in snap.get("workers", []) if w.get("state") != "missing")
+        if connected >= expected or time.time() >= deadline:
+            return connected
+        time.sleep(1)
+
+
+def _swarm(user_class, users, spawn_rate, open_loop_rps=None, workers=1,
+           reconnect_policy=None, engine=None):
+    concurrency = 0
+    if engine:
+        # one engine process (user) per worker, `users` in flight across them
+        concurrency, users, spawn_rate = -(-users // workers), workers, workers
     return _api("post", "/swarm", data={
         "user_count":   users,
         "spawn_rate":   spawn_rate,
         "user_classes": user_class,
         "host":         f"postgres://{config.PG_HOST}:{config.PG_WRITE_PORT}",
+        # always sent: an empty value clears the previous scenario's rate.
+        # The locustfile option is per worker, the scenario value is total —
+        # split over the workers that get a user: with users < workers Locust
+        # leaves the rest idle, and they would never issue their share.
+        "open_loop_rps": format_rates(open_loop_rps or {}, min(workers, users)),
+        "reconnect_policy": reconnect_policy or "",     # empty → PG_RECONNECT_POLICY
+        "async_concurrency": concurrency,
+        "async_mix": format_rates((engine or {}).get("mix", {})),
     })
 
 
+def _spawned_target(scenario, users, workers):
+    """User count to wait for after _swarm: engine scenarios run one per worker."""
+    return workers if scenario.get("engine") else users
+
+
 def _stop_and_wait(timeout=20):
     _api("get", "/stop")
     deadline = time.time() + timeout
@@ -380,6 +614,98 @@ def _get_stats():
     return {}
 
 
+def _get_phases():
+    """Per-op client phase breakdown (metrics.PhaseStats) from the locustfile."""
+    r = _api("get", "/stats/phases")
+    if r and r.status_code == 200:
+        return r.json().get("phases", [])
+    return []
+
+
+def _get_hdr(since):
+    """Serialized per-second, per-op latency histograms (metrics.IntervalHistograms)."""
+    r = _api("get", "/stats/hdr", params={"since": int(since)})
+    if r and r.status_code == 200:
+        return r.json().get("intervals", [])
+    return []
+
+
+def _apply_hdr(timeline, rows, start_wall):
+    """Replace the smoothed Locust percentiles on every timeline point with
+    exact ones from the merged HDR histograms of the seconds it covers, and
+    add p99 / p99.9 / max. Returns the per-second aggregate series."""
+    prev_t = 0.0
+    for pt in timeline:
+        h = merge_intervals(rows, int(start_wall + prev_t), int(start_wall + pt["t"]),
+                            latency_only=True)
+        if h.count:
+            sm = h.summary()
+            pt.update(p50=sm["p50"], p95=sm["p95"], p99=sm["p99"],
+                      p999=sm["p999"], max=sm["max"])
+        prev_t = pt["t"]
+    seconds = sorted({sec for sec, *_ in rows})
+    return [{"t": sec - int(start_wall),
+             **merge_intervals(rows, sec, sec + 1, latency_only=True).summary()}
+            for sec in seconds]
+
+
+def _get_outages(since):
+    """Serialized per-second client-outage histograms (metrics, op RECONNECT)."""
+    r = _api("get", "/stats/outages", params={"since": int(since)})
+    if r and r.status_code == 200:
+        return r.json().get("outages", [])
+    return []
+
+
+def _get_backends(since):
+    """Serialized per-second, per-backend counts/histograms (metrics.BackendStats)."""
+    r = _api("get", "/stats/backends", params={"since": int(since)})
+    if r and r.status_code == 200:
+        return r.json().get("backends", [])
+    return []
+
+
+def _backend_series(rows, timeline, start_wall):
+    """Per-backend totals plus, for every timeline point, the served req/s and
+    p50 / p95 over the seconds that point covers."""
+    by_backend = {}
+    for sec, backend, standby, ok, failed, pairs, max_us in rows:
+        b = by_backend.setdefault(backend, {"standby": standby, "rows": []})
+        b["standby"] = standby
+        b["rows"].append((sec, ok, failed, LatencyHistogram.unserialize([pairs, max_us])))
+    total_ok = sum(ok for b in by_backend.values() for _, ok, _, _ in b["rows"]) or 1
+    series = []
+    for backend, b in sorted(by_backend.items()):
+        whole = LatencyHistogram()
+        for *_, h in b["rows"]:
+            whole.merge(h)
+        ok = sum(r[1] for r in b["rows"])
+        points, prev_t = [], 0.0
+        for pt in timeline:
+            lo, hi = int(start_wall + prev_t), int(start_wall + pt["t"])
+            win = [r for r in b["rows"] if lo <= r[0] < hi]
+            h = LatencyHistogram()
+            for *_, wh in win:
+                h.merge(wh)
+            span = max(hi - lo, 1)
+            points.append({"t": pt["t"], "rps": round(sum(r[1] for r in win) / span, 1),
+                           "fail_rps": round(sum(r[2] for r in win) / span, 1),
+                           "p50": round(h.percentile(50), 2) if h.count else None,
+                           "p95": round(h.percentile(95), 2) if h.count else None})
+            prev_t = pt["t"]
+        series.append({"backend": backend,
+                       "role": {True: "standby", False: "primary"}.get(b["standby"], "?"),
+                       "requests": ok, "failures": sum(r[2] for r in b["rows"]),
+                       "share_pct": round(100 * ok / total_ok, 1),
+                       "p50_ms": round(whole.percentile(50), 2),
+                       "p95_ms": round(whole.percentile(95), 2),
+                       "p99_ms": round(whole.percentile(99), 2),
+                       "first_s": min(r[0] for r in b["rows"]) - int(start_wall),
+                       "last_s": max(r[0] for r in b["rows"]) - int(start_wall),
+                       "points": points})
+    return series
+
+
 def _aggregated(snap):
     for s in snap.get("stats", []):
         if s.get("name") == "Aggregated":
@@ -448,10 +774,303 @@ def _resolve_inject(inject):
     return resolved
 
 
+# ── timeline sampling ────────────────────────────────────────────────────────
+# Each source has its own thread and fixed clock (collectors.py): a Patroni
+# node that hangs for 3 s during a leader crash no longer delays the Locust
+# stats samples, and every value carries the time it was actually read.
+
+STATS_INTERVAL   = 2.0     # Locust /stats/requests → rps / fail_rps / p50 / p95 / rows
+CLUSTER_INTERVAL = 2.0     # Patroni /cluster → leader, timeline
+LAG_INTERVAL     = 1 / config.PG_REPL_LAG_HZ   # pg_stat_replication → per-replica lag
+WAL_INTERVAL     = 2.0     # pg_current_wal_lsn() on the primary → WAL MB/s
+
+# load-generator saturation (genmon.py rows, one per load process per second):
+# a second is "limited" when any process crossed one of these; a scenario is
+# generator-limited when a process spent GEN_LIMITED_SHARE of its seconds so
+GEN_CPU_LIMIT     = 90.0    # process CPU % (Locust's own warning threshold)
+GEN_LAG_LIMIT_MS  = 50.0    # worst greenlet scheduling delay in the second
+GEN_GC_LIMIT_MS   = 100.0   # GC pause time in the second
+GEN_LIMITED_SHARE = 0.10
+GEN_ABORT_AFTER_S = 10      # --generator-guard abort: consecutive limited seconds
+GENERATOR_INTERVAL = 2.0    # live /stats/generator poll (abort guard)
+
+# ops whose event length is rows written (the rest report rows read)
+WRITE_OPS = ("INSERT", "INSERT_BATCH", "COPY", "UPDATE", "DELETE")
+
+
+def _sample_stats():
+    snap = _get_stats()
+    agg = _aggregated(snap)
+    if not agg:
+        return None
+    pcts = snap.get("current_response_time_percentiles", {}) or {}
+    return {"req":  agg.get("num_requests", 0),
+            "rows": _rows_written(snap),
+            "fail": agg.get("num_failures", 0),
+            "p50":  pcts.get("response_time_percentile_0.5")
+                    or agg.get("median_response_time") or 0,
+            "p95":  pcts.get("response_time_percentile_0.95")
+                    or agg.get("response_time_percentile_0.95") or 0}
+
+
+def _rows_written(snap):
+    return round(sum(st.get("num_requests", 0) * st.get("avg_content_length", 0)
+                     for st in snap.get("stats", []) if st.get("name") in WRITE_OPS))
+
+
+def _sample_wal():
+    """Primary's WAL insert position in bytes (LSN is monotonic across promotion)."""
+    return int(_pg_query("/*NO LOAD BALANCE*/ SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")[0][0])
+
+
+def _sample_cluster():
+    snap = cluster_snapshot()
+    return snap if snap["members"] else None
+
+
+# bytes: primary's current LSN − replay_lsn (not yet sent + sent, not applied);
+# in_flight: sent_lsn − replay_lsn. The *_lag intervals are PostgreSQL's own
+# timings; NULL once an idle standby has caught up (reported as 0 then).
+_REPL_SQL = """/*NO LOAD BALANCE*/
+SELECT coalesce(nullif(application_name, ''), client_addr::text), state,
+       pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn)::bigint,
+       pg_wal_lsn_diff(sent_lsn, replay_lsn)::bigint,
+       extract(epoch FROM write_lag), extract(epoch FROM flush_lag),
+       extract(epoch FROM replay_lag)
+  FROM pg_stat_replication"""
+
+
+class _PgSource:
+    """Sampler source on ONE persistent autocommit connection — at several
+    calls a second a connect per call would cost more than the query. A
+    failed call drops it; the next tick reconnects (to the new primary after
+    a failover). Subclasses implement read(cur)."""
+    app_name = "bench-sampler"
+
+    def __init__(self):
+        self.conn = None
+
+    def __call__(self):
+        try:
+            if self.conn is None:
+                self.conn = _pg_connect(connect_timeout=2, application_name=self.app_name)
+                self.conn.autocommit = True
+            with self.conn.cursor() as cur:
+                return self.read(cur)
+        except psycopg2.Error:
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except psycopg2.Error:
+                pass
+            self.conn = None
+
+
+class _ReplicationLag(_PgSource):
+    """{replica: {state, bytes, in_flight, write_s, flush_s, replay_s}} from
+    pg_stat_replication on the primary. No replicas → None: unknown, not
+    "0 behind"."""
+    app_name = "bench-repl-lag"
+
+    def read(self, cur):
+        cur.execute(_REPL_SQL)
+        lag = {}
+        for name, state, behind, in_flight, write_s, flush_s, replay_s in cur.fetchall():
+            behind = int(behind or 0)
+            idle = 0.0 if behind == 0 else None
+            lag[name] = {"state": state, "bytes": behind, "in_flight": int(in_flight or 0),
+                         "write_s": float(write_s) if write_s is not None else idle,
+                         "flush_s": float(flush_s) if flush_s is not None else idle,
+                         "replay_s": float(replay_s) if replay_s is not None else idle}
+        return lag or None
+
+
+class _ServerCounters(_PgSource):
+    """pgstats.snapshot without pg_stat_statements (PG_SERVER_STATS_S series)."""
+    app_name = "bench-server-stats"
+
+    def read(self, cur):
+        return pgstats.snapshot(cur, statements=False)
+
+
+def _server_snapshot():
+    """Full pgstats snapshot (with pg_stat_statements) before / after a
+    scenario; None when the server cannot be reached."""
+    try:
+        conn = _pg_connect(application_name="bench-server-stats")
+    except psycopg2.Error as exc:
+        print(f"  [server] snapshot failed: {exc}")
+        return None
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            return pgstats.snapshot(cur)
+    except psycopg2.Error as exc:
+        print(f"  [server] snapshot failed: {exc}")
+        return None
+    finally:
+        conn.close()
+
+
+def _server_series(samples):
+    """Consecutive PG_SERVER_STATS_S samples → [(t, rates)] — TPS, cache hit,
+    WAL, checkpoints and the lock gauges of each interval."""
+    series = []
+    for (t0, a), (t1, b) in zip(samples, samples[1:]):
+        d = pgstats.delta(a, b)
+        if "error" not in d:
+            d.update(d.pop("locks_after", {}))
+            series.append((t1, d))
+    return series
+
+
+def _max_lag(value, key="bytes"):
+    """Worst replica's `key` in one lag sample (None when unknown)."""
+    vals = [r[key] for r in (value or {}).values() if r.get(key) is not None]
+    return max(vals) if vals else None
+
+
+def _replication_series(samples):
+    """Full-resolution per-replica lag: {replica: [[t, bytes, write_s,
+    flush_s, replay_s], …]} — the report plots these, not the 2 s timeline."""
+    series = {}
+    for t, value in samples:
+        for name, r in value.items():
+            series.setdefault(name, []).append(
+                [round(t, 2), r["bytes"], r["write_s"], r["flush_s"], r["replay_s"]])
+    return series
+
+
+def _samplers(t0):
+    return {
+        "stats":   collectors.Sampler("stats", _sample_stats, STATS_INTERVAL, t0),
+        "cluster": collectors.Sampler("cluster", _sample_cluster, CLUSTER_INTERVAL, t0),
+        "lag":     collectors.Sampler("lag", _ReplicationLag(), LAG_INTERVAL, t0),
+        "wal":     collectors.Sampler("wal", _sample_wal, WAL_INTERVAL, t0),
+    }
+
+
+def _round(rate, unit):
+    return round(rate / unit, 2) if rate is not None else None
+
+
+def _wal_mb_s(samples):
+    """Average WAL rate over the whole run, MB/s."""
+    if len(samples) < 2:
+        return None
+    (t0, w0), (t1, w1) = samples[0], samples[-1]
+    return round((w1 - w0) / max(t1 - t0, 1e-6) / 1048576, 2)
+
+
+def _build_timeline(samplers):
+    """One point per consecutive pair of stats samples: per-interval deltas
+    over the ACTUAL time between the two reads, plus the latest lag and
+    leader acquired at or before that read."""
+    stats = samplers["stats"].samples
+    lag, cluster = samplers["lag"].samples, samplers["cluster"].samples
+    wal = samplers["wal"].samples
+    timeline = []
+    for (t0, a), (t1, b) in zip(stats, stats[1:]):
+        dt = max(t1 - t0, 1e-6)
+        state = collectors.as_of(cluster, t1) or {}
+        timeline.append({
+            "t":        round(t1, 1),
+            "rps":      round((b["req"] - a["req"]) / dt, 1),
+            "fail_rps": round((b["fail"] - a["fail"]) / dt, 1),
+            "rows_s":   round((b["rows"] - a["rows"]) / dt, 1),
+            "wal_mbps": _round(collectors.rate(wal, t1), 1048576),
+            "p50":      b["p50"],
+            "p95":      b["p95"],
+            "lag":      _max_lag(collectors.as_of(lag, t1)),
+            "lag_s":    _max_lag(collectors.as_of(lag, t1), "replay_s"),
+            "leader":   state.get("leader"),
+        })
+    return timeline
+
+
+def _get_generator(since):
+    """Serialized per-second, per-process generator health (metrics.GeneratorStats)."""
+    r = _api("get", "/stats/generator", params={"since": int(since)})
+    if r and r.status_code == 200:
+        return r.json().get("generator", [])
+    return []
+
+
+def _limits(cpu, lag_ms, gc_ms):
+    """Which saturation thresholds one per-second row crossed."""
+    return [name for name, hit in (("cpu", cpu >= GEN_CPU_LIMIT),
+                                   ("loop lag", lag_ms >= GEN_LAG_LIMIT_MS),
+                                   ("gc", gc_ms >= GEN_GC_LIMIT_MS)) if hit]
+
+
+def _limited_streak(rows):
+    """Consecutive seconds, up to the newest one reported, in which some
+    load process was over a threshold."""
+    limited = {}
+    for sec, _node, cpu, lag_ms, gc_ms, _n in rows:
+        limited[sec] = limited.get(sec, False) or bool(_limits(cpu, lag_ms, gc_ms))
+    streak = 0
+    for sec in sorted(limited, reverse=True):
+        if not limited[sec]:
+            break
+        streak += 1
+    return streak
+
+
+def _sample_generator():
+    return _limited_streak(_get_generator(time.time() - GEN_ABORT_AFTER_S - 5))
+
+
+def _apply_generator(timeline, rows, start_wall):
+    """Add the worst generator CPU / loop lag / GC ms over the seconds every
+    timeline point covers (max across load processes)."""
+    prev_t = 0.0
+    for pt in timeline:
+        lo, hi = int(start_wall + prev_t), int(start_wall + pt["t"])
+        win = [r for r in rows if lo <= r[0] < hi]
+        pt["gen_cpu"] = max((r[2] for r in win), default=None)
+        pt["loop_lag_ms"] = max((r[3] for r in win), default=None)
+        pt["gc_ms"] = max((r[4] for r in win), default=None)
+        prev_t = pt["t"]
+
+
+def _generator_summary(rows, workers):
+    """Per load process: CPU, loop lag and GC over the run, the share of its
+    seconds over a threshold — and whether the load generator, not the
+    database, was the bottleneck."""
+    per = {}
+    for sec, node, cpu, lag_ms, gc_ms, _n in rows:
+        per.setdefault(node, []).append((cpu, lag_ms, gc_ms))
+    nodes, reasons = [], set()
+    for node, v in sorted(per.items()):
+        hits = [_limits(*x) for x in v]
+        over = sum(1 for h in hits if h)
+        nodes.append({"node": node, "seconds": len(v),
+                      "cpu_mean": round(sum(x[0] for x in v) / len(v), 1),
+                      "cpu_max": max(x[0] for x in v),
+                      "loop_lag_max_ms": max(x[1] for x in v),
+                      "gc_ms_s": round(sum(x[2] for x in v) / len(v), 1),
+                      "limited_pct": round(100 * over / len(v), 1)})
+        if over >= GEN_LIMITED_SHARE * len(v):
+            reasons.update(r for h in hits for r in h)
+    return {"workers": workers, "nodes": nodes, "limited": bool(reasons),
+            "reasons": sorted(reasons)}
+
+
 def run_scenario(scenario: dict) -> dict:
     print(f"\n{'='*60}")
     print(f"  Scenario: {scenario['name']}")
     print(f"  Class: {scenario['user_class']}  users={scenario['users']}  dur={scenario['duration']}s")
+    if scenario.get("open_loop_rps"):
+        print(f"  Open loop: {format_rates(scenario['open_loop_rps'])} "
+              f"({sum(scenario['open_loop_rps'].values()):g} req/s total)")
+    if scenario.get("engine"):
+        print(f"  Async engine: {scenario['users']} in flight, "
+              f"mix {format_rates(scenario['engine'].get('mix', {})) or 'default'}")
     print(f"{'='*60}")
 
     # 1. health gate — never start a scenario against a broken cluster
@@ -470,72 +1089,119 @@ def run_scenario(scenario: dict) -> dict:
 
     cluster_before = cluster_snapshot()
 
-    # 4. fresh stats, then swarm
+    # 4. fresh stats (and probe event log), then swarm — in distributed mode
+    #    only once every worker is (still) connected
+    workers = 1
+    if WORKERS:
+        workers = _wait_workers(WORKERS)
+        if workers < WORKERS:
+            print(f"  [WARN] only {workers}/{WORKERS} workers connected")
+        if not workers:
+            print("  [SKIP] no Locust workers connected — scenario skipped")
+            return {"scenario": scenario, "timeline": [], "summary": {}, "skipped": True}
+    probe_log.clear(config.PROBE_LOG_DIR)
     _reset()
     time.sleep(1)
-    resp = _swarm(scenario["user_class"], scenario["users"], scenario["spawn_rate"])
+    swarm_args = (scenario["user_class"], scenario["users"], scenario["spawn_rate"],
+                  scenario.get("open_loop_rps"), workers, scenario.get("reconnect_policy"),
+                  scenario.get("engine"))
+    resp = _swarm(*swarm_args)
     if not resp or resp.status_code not in (200, 201):
         print(f"  [WARN] swarm start returned {resp} — retrying once")
         time.sleep(2)
-        _swarm(scenario["user_class"], scenario["users"], scenario["spawn_rate"])
-    if not _verify_spawned(scenario["users"]):
+        _swarm(*swarm_args)
+    if not _verify_spawned(_spawned_target(scenario, scenario["users"], workers)):
         print("  [WARN] users did not spawn within 15s — results may be empty")
 
+    server_before = _server_snapshot()
     started_at = datetime.now().isoformat(timespec="seconds")
     start_ts = time.time()
+    start_wall = start_ts        # epoch base for the HDR per-second intervals
+    start_mono = time.monotonic()
     injected = False
     recovery_done = False
     inject_t = None
-    timeline = []
-    prev = None  # (t, num_requests, num_failures)
-
-    # 5. poll every 2s; timeline points are per-interval deltas
-    while time.time() - start_ts < scenario["duration"]:
-        elapsed = time.time() - start_ts
+    inject_ns = None             # wall clock, comparable with probe_log end_ns
+
+    # 5. collectors sample on their own fixed clocks; this thread only fires
+    #    the injection / recovery commands on time
+    samplers = _samplers(start_mono)
+    if GENERATOR_GUARD == "abort":
+        samplers["generator"] = collectors.Sampler(
+            "generator", _sample_generator, GENERATOR_INTERVAL, start_mono)
+    if config.PG_SERVER_STATS_S > 0:
+        samplers["server"] = collectors.Sampler(
+            "server", _ServerCounters(), config.PG_SERVER_STATS_S, start_mono)
+    collectors.start_all(samplers)
+    aborted = None
+    recovery_at = (inject.get("recovery_delay", scenario["duration"] - 20)
+                   if inject and inject.get("recovery") else None)
+    while True:
+        elapsed = time.monotonic() - start_mono
+        if elapsed >= scenario["duration"]:
+            break
+        streak = collectors.as_of(samplers["generator"].samples, elapsed, 0) \
+            if "generator" in samplers else 0
+        if streak >= GEN_ABORT_AFTER_S:
+            aborted = f"generator-limited for {streak}s"
+            print(f"  [t={elapsed:.1f}s] ABORT: load generator saturated {streak}s in a row")
+            break
 
         if inject and not injected and elapsed >= inject["delay"]:
-            print(f"  [t={elapsed:.0f}s] injecting failure")
+            print(f"  [t={elapsed:.1f}s] injecting failure")
+            inject_ns = time.time_ns()
             _run_command(inject["command"], name=inject["name"], block=False)
             injected = True
             inject_t = elapsed
 
-        if inject and injected and not recovery_done and inject.get("recovery"):
-            if elapsed >= inject.get("recovery_delay", scenario["duration"] - 20):
-                print(f"  [t={elapsed:.0f}s] running recovery")
-                _run_command(inject["recovery"], name=inject.get("recovery_name", "recovery"),
-                             block=False)
-                recovery_done = True
-
-        snap = _get_stats()
-        agg = _aggregated(snap)
-        if agg:
-            req, fail = agg.get("num_requests", 0), agg.get("num_failures", 0)
-            pcts = snap.get("current_response_time_percentiles", {}) or {}
-            try:
-                lag = max_replica_lag()
-            except Exception:
-                lag = None
-            elapsed = time.time() - start_ts   # re-stamp: the poll, not the loop top
-            if prev is not None:
-                dt = max(elapsed - prev[0], 1e-6)
-                timeline.append({
-                    "t":        round(elapsed, 1),
-                    "rps":      round((req - prev[1]) / dt, 1),
-                    "fail_rps": round((fail - prev[2]) / dt, 1),
-                    "p50":      pcts.get("response_time_percentile_0.5")
-                                or agg.get("median_response_time") or 0,
-                    "p95":      pcts.get("response_time_percentile_0.95")
-                                or agg.get("response_time_percentile_0.95") or 0,
-                    "lag":      lag,
-                })
-            prev = (elapsed, req, fail)
-        time.sleep(2)
+        if injected and not recovery_done and recovery_at is not None \
+                and elapsed >= recovery_at:
+            print(f"  [t={elapsed:.1f}s] running recovery")
+            _run_command(inject["recovery"], name=inject.get("recovery_name", "recovery"),
+                         block=False)
+            recovery_done = True
+
+        wake = [scenario["duration"]]
+        if inject and not injected:
+            wake.append(inject["delay"])
+        elif injected and not recovery_done and recovery_at is not None:
+            wake.append(recovery_at)
+        time.sleep(min(max(min(wake) - (time.monotonic() - start_mono), 0), 1.0))
+
+    collectors.stop_all(samplers)
+    server = pgstats.delta(server_before, _server_snapshot())
+    if "error" in server:
+        print(f"  [server] no counter deltas: {server['error']}")
+    timeline = _build_timeline(samplers)
+    if "server" in samplers:
+        series = _server_series(samplers["server"].samples)
+        server["series"] = [{"t": round(t, 1), **{k: v for k, v in d.items()
+                                                  if k != "statements"}}
+                            for t, d in series]
+        for pt in timeline:
+            pt["server_tps"] = (collectors.as_of(series, pt["t"]) or {}).get("tps")
+    sampling = {name: s.health() for name, s in samplers.items()}
+    generator_rows = _get_generator(start_wall - 1)
+    _apply_generator(timeline, generator_rows, start_wall)
+    generator = _generator_summary(generator_rows, workers if WORKERS else 0)
+    if generator["limited"]:
+        print(f"  [generator] LIMITED ({', '.join(generator['reasons'])}) — latency here "
+              f"is partly the client's; add workers (--workers) or lower the load")
+    wal_mb_s = _wal_mb_s(samplers["wal"].samples)
+    for name, h in sampling.items():
+        if h["missed_ticks"] or h["errors"]:
+            print(f"  [sampling] {name}: {h['missed_ticks']} ticks missed, "
+                  f"{h['errors']} failed calls, max gap {h['max_gap_s']}s")
 
     _stop_and_wait()
     ended_at = datetime.now().isoformat(timespec="seconds")
 
     # 6. final cumulative stats — aggregated + per-operation + error signatures
     final = _get_stats()
+    phases = _get_phases()
+    hdr_rows = _get_hdr(start_wall - 1)
+    intervals = _apply_hdr(timeline, hdr_rows, start_wall) if hdr_rows else []
+    backend_rows = _get_backends(start_wall - 1)
     agg = _aggregated(final)
     operations = [
         {"op": s.get("name"), "requests": s.get("num_requests", 0),
@@ -547,6 +1213,18 @@ def run_scenario(scenario: dict) -> dict:
          "max_ms": round(s.get("max_response_time", 0), 1)}
         for s in final.get("stats", []) if s.get("name") != "Aggregated"
     ]
+    for o in operations:
+        h = merge_intervals(hdr_rows, ops={o["op"]})
+        if h.count:
+            o["p999_ms"] = round(h.percentile(99.9), 2)
+    # transactions: "<name> ABORT" counts rolled-back attempts (serialization
+    # failure / deadlock); abort rate = aborted attempts / all attempts
+    by_name = {o["op"]: o for o in operations}
+    for o in operations:
+        base = by_name.get(o["op"][:-len(" ABORT")]) if o["op"].endswith(" ABORT") else None
+        if base is not None:
+            attempts = base["requests"] + o["requests"]
+            base["abort_pct"] = round(100 * o["requests"] / max(attempts, 1), 2)
     errors = [
         {"op": e.get("name"), "error": e.get("error"),
          "occurrences": e.get("occurrences", 0)}
@@ -559,10 +1237,17 @@ def run_scenario(scenario: dict) -> dict:
               "cluster_before": cluster_before,
               "operations": operations,
               "errors": errors,
-              "timeline": timeline}
+              "phases": phases,
+              "timeline": timeline,
+              "sampling": sampling,
+              "generator": generator,
+              "intervals": intervals,
+              "replication": _replication_series(samplers["lag"].samples),
+              "server": server,
+              "backends": _backend_series(backend_rows, timeline, start_wall)}
 
     if agg:
-        duration = scenario["duration"]
+        duration = round(time.monotonic() - start_mono) if aborted else scenario["duration"]
         result["summary"] = {
             "total_requests": agg.get("num_requests", 0),
             "failures":       agg.get("num_failures", 0),
@@ -571,14 +1256,65 @@ def run_scenario(scenario: dict) -> dict:
             "p95_ms":         agg.get("response_time_percentile_0.95", 0),
             "p99_ms":         agg.get("response_time_percentile_0.99", 0),
             "rps":            round(agg.get("num_requests", 0) / duration, 1),
+            "rows_written_s": round(_rows_written(final) / duration, 1),
+            "wal_mb_s":       wal_mb_s,
             "fail_pct":       round(100 * agg.get("num_failures", 0) /
                                     max(agg.get("num_requests", 1), 1), 2),
+            "generator_limited": generator["limited"],
         }
+        lag_bytes = [b for b in (_max_lag(v) for _, v in samplers["lag"].samples)
+                     if b is not None]
+        lag_s = [s for s in (_max_lag(v, "replay_s") for _, v in samplers["lag"].samples)
+                 if s is not None]
+        if lag_bytes:
+            result["summary"]["lag_max_mb"] = round(max(lag_bytes) / 1048576, 2)
+        if lag_s:
+            result["summary"]["replay_lag_max_s"] = round(max(lag_s), 3)
+        for key in ("tps", "cache_hit_pct"):
+            if server.get(key) is not None:
+                result["summary"][f"server_{key}"] = server[key]
+        # connection scenarios: CONNECT = one handshake; an outage = one
+        # client's first error → next successful connect (/stats/outages,
+        # kept out of the request stats and latency percentiles)
+        conn = by_name.get("CONNECT")
+        if conn and conn["requests"]:
+            result["summary"].update(connects_s=round(conn["requests"] / duration, 1),
+                                     connect_p50_ms=conn["p50_ms"],
+                                     connect_p99_ms=conn["p99_ms"])
+        rec = merge_intervals(_get_outages(start_wall - 1))
+        if rec.count:
+            sm = rec.summary()
+            result["summary"].update(reconnects=sm["count"], reconnect_p50_ms=sm["p50"],
+                                     reconnect_p99_ms=sm["p99"], reconnect_max_ms=sm["max"])
+        handshakes = {o["op"][len("CONNECT "):]: {"connects_s": round(o["requests"] / duration, 1),
+                                                  "p50_ms": o["p50_ms"], "p99_ms": o["p99_ms"]}
+                      for o in operations if o["op"].startswith("CONNECT ") and o["requests"]}
+        if handshakes:
+            result["summary"]["handshakes"] = handshakes
+        if scenario.get("reconnect_policy"):
+            result["summary"]["reconnect_policy"] = scenario["reconnect_policy"]
+        if aborted:
+            result["summary"]["aborted"] = aborted
+        if hdr_rows:
+            h = merge_intervals(hdr_rows, latency_only=True)
+            result["summary"]["p999_ms"] = round(h.percentile(99.9), 2)
+            result["summary"]["max_ms"] = round(h.max_us / 1000, 2)
         if inject and inject_t is not None and timeline:
             rto, detect_lag, recovered = _estimate_rto(timeline, inject_t)
             result["summary"]["rto_s"] = rto
             result["summary"]["detect_lag_s"] = detect_lag
             result["summary"]["recovered"] = recovered
+            result["summary"]["rto_source"] = "poll"
+        if inject and inject_ns is not None:
+            probe = probe_log.compute_rto(
+                probe_log.read_events(config.PROBE_LOG_DIR, int(start_wall * 1e9)), inject_ns)
+            if probe:
+                result["probe"] = probe
+                result["summary"]["rto_poll_s"] = result["summary"].get("rto_s")
+                result["summary"].update(rto_s=probe["rto_s"], detect_lag_s=probe["detect_lag_s"],
+                                         recovered=probe["recovered"],
+                                         first_success_s=probe["first_success_s"],
+                                         rto_source="probe_log")
     else:
         result["summary"] = {}
 
@@ -606,6 +1342,385 @@ def run_scenario(scenario: dict) -> dict:
     return result
 
 
+# ── capacity search ──────────────────────────────────────────────────────────
+# --capacity-search turns a (non-HA) scenario into a step ramp: users (closed
+# loop) or offered req/s (open loop) grow by --capacity-factor per step; each
+# step is held until CAPACITY_STABLE_WINDOWS consecutive CAPACITY_WINDOW_S
+# windows agree on throughput and p99, then measured over those windows. The
+# ramp stops at the first step that breaks the SLO (--slo-p99-ms,
+# --slo-error-pct), when throughput stops growing, or when the load generator
+# itself is the limit.
+#
+#   max sustainable throughput — highest req/s of a step within the SLO
+#   knee                       — step with the highest "power" (req/s ÷ p99,
+#                                Kleinrock): past it, added load buys more
+#                                latency than throughput
+
+CAPACITY_WINDOW_S       = 5
+CAPACITY_STABLE_WINDOWS = 3
+CAPACITY_MIN_HOLD_S     = 20
+CAPACITY_MAX_HOLD_S     = 120
+CAPACITY_RPS_TOLERANCE  = 0.10    # window req/s within ±10 % of their mean
+CAPACITY_P99_TOLERANCE  = 0.25    # window p99 within ±25 % of their mean
+CAPACITY_PLATEAU        = 0.03    # < 3 % more req/s than the best step …
+CAPACITY_PLATEAU_STEPS  = 2       # … this many steps in a row → plateau
+
+
+def _capacity_window(a, b, hdr_rows):
+    """Measurement between two stats samples (t, sample) — req/s, error %
+    and exact latency percentiles from the HDR seconds in between."""
+    (ta, sa), (tb, sb) = a, b
+    req, fail = sb["req"] - sa["req"], sb["fail"] - sa["fail"]
+    h = merge_intervals(hdr_rows, int(ta), int(tb), latency_only=True)
+    return {"t0": ta, "t1": tb, "requests": req, "failures": fail,
+            "rps": round(req / max(tb - ta, 1e-6), 1),
+            "error_pct": round(100 * fail / max(req, 1), 2),
+            "p50": round(h.percentile(50), 2) if h.count else None,
+            "p95": round(h.percentile(95), 2) if h.count else None,
+            "p99": round(h.percentile(99), 2) if h.count else None}
+
+
+def _stable(windows):
+    if len(windows) < CAPACITY_STABLE_WINDOWS:
+        return False
+    recent = windows[-CAPACITY_STABLE_WINDOWS:]
+    for key, tol in (("rps", CAPACITY_RPS_TOLERANCE), ("p99", CAPACITY_P99_TOLERANCE)):
+        vals = [w[key] for w in recent]
+        if None in vals:
+            return False
+        mean = sum(vals) / len(vals)
+        if mean and any(abs(v - mean) > tol * mean for v in vals):
+            return False
+    return True
+
+
+def _hold_step():
+    """Sample every CAPACITY_WINDOW_S until stable (or CAPACITY_MAX_HOLD_S);
+    returns the step measured over its last stable windows."""
+    started = time.time()
+    prev = (time.time(), _sample_stats())
+    windows = []
+    while True:
+        time.sleep(CAPACITY_WINDOW_S)
+        cur = (time.time(), _sample_stats())
+        if prev[1] and cur[1]:
+            windows.append(_capacity_window(prev, cur, _get_hdr(int(started))))
+        prev = cur
+        held = time.time() - started
+        stable = held >= CAPACITY_MIN_HOLD_S and _stable(windows)
+        if stable or held >= CAPACITY_MAX_HOLD_S:
+            break
+    recent = windows[-CAPACITY_STABLE_WINDOWS:]
+    if not recent:
+        return {"stable": False, "hold_s": round(held, 1)}
+    t0, t1 = recent[0]["t0"], recent[-1]["t1"]
+    req = sum(w["requests"] for w in recent)
+    fail = sum(w["failures"] for w in recent)
+    h = merge_intervals(_get_hdr(int(started)), int(t0), int(t1), latency_only=True)
+    gen = _generator_summary(_get_generator(int(t0)), WORKERS)
+    return {"stable": stable, "hold_s": round(held, 1),
+            "rps": round(req / max(t1 - t0, 1e-6), 1),
+            "error_pct": round(100 * fail / max(req, 1), 2),
+            "p50": round(h.percentile(50), 2) if h.count else None,
+            "p95": round(h.percentile(95), 2) if h.count else None,
+            "p99": round(h.percentile(99), 2) if h.count else None,
+            "generator_limited": gen["limited"]}
+
+
+def run_capacity_search(scenario: dict, slo_p99_ms: float, slo_error_pct: float,
+                        factor: float = 1.5, max_steps: int = 12) -> dict:
+    open_loop = bool(scenario.get("open_loop_rps"))
+    print(f"\n{'='*60}")
+    print(f"  Capacity search: {scenario['name']}")
+    print(f"  Ramp {'offered req/s' if open_loop else 'users'} ×{factor:g} per step, "
+          f"SLO p99 ≤ {slo_p99_ms:g} ms, errors ≤ {slo_error_pct:g}%")
+    print(f"{'='*60}")
+    skipped = {"scenario": scenario, "timeline": [], "summary": {}, "skipped": True}
+    if not wait_cluster_healthy(timeout=300):
+        print("  [SKIP] cluster did not become healthy — search skipped")
+        return skipped
+    workers = 1
+    if WORKERS:
+        workers = _wait_workers(WORKERS)
+        if not workers:
+            print("  [SKIP] no Locust workers connected — search skipped")
+            return skipped
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    _reset()
+    time.sleep(1)
+    steps, stop_reason, best, flat = [], "max steps", 0.0, 0
+    for k in range(max_steps):
+        scale = factor ** k
+        users = max(round(scenario["users"] * scale), scenario["users"] + k)
+        rates = ({op: round(r * scale, 1) for op, r in scenario["open_loop_rps"].items()}
+                 if open_loop else None)
+        if (open_loop or scenario.get("engine")) and k:
+            # a worker's arrival schedule / engine concurrency is fixed per test
+            _stop_and_wait()
+        # closed loop ramps in place: Locust only adds the extra users
+        _swarm(scenario["user_class"], users, max(scenario["spawn_rate"], users / 5),
+               rates, workers, scenario.get("reconnect_policy"), scenario.get("engine"))
+        _verify_spawned(_spawned_target(scenario, users, workers), timeout=30)
+        step = {"step": k + 1, "users": users,
+                "offered_rps": round(sum(rates.values()), 1) if rates else None,
+                **_hold_step()}
+        step["within_slo"] = (step.get("p99") is not None and step["p99"] <= slo_p99_ms
+                              and step.get("error_pct", 100) <= slo_error_pct)
+        steps.append(step)
+        print(f"  step {step['step']:>2}: users={users:<5}"
+              + (f" offered={step['offered_rps']:<8g}" if rates else "")
+              + f" rps={step.get('rps')}  p99={step.get('p99')}ms  "
+                f"err={step.get('error_pct')}%  {'stable' if step['stable'] else 'UNSTABLE'}"
+                f" in {step['hold_s']}s{'' if step['within_slo'] else '  ✗ SLO'}")
+        if not step["within_slo"]:
+            stop_reason = "SLO breached"
+            break
+        if step.get("generator_limited"):
+            stop_reason = "load generator limited"
+            break
+        if step["rps"] < best * (1 + CAPACITY_PLATEAU):
+            flat += 1
+            if flat >= CAPACITY_PLATEAU_STEPS:
+                stop_reason = "throughput plateau"
+                break
+        else:
+            flat = 0
+        best = max(best, step["rps"])
+    _stop_and_wait()
+
+    within = [st for st in steps if st["within_slo"] and st.get("rps")]
+    best_step = max(within, key=lambda st: st["rps"]) if within else None
+    knee = max(within, key=lambda st: st["rps"] / max(st["p99"], 1e-3)) if within else None
+    print(f"  → stop: {stop_reason}; max sustainable "
+          f"{best_step['rps'] if best_step else '—'} req/s; knee at step "
+          f"{knee['step'] if knee else '—'}")
+    final = _get_stats()
+    agg = _aggregated(final) or {}
+    summary = {"total_requests": agg.get("num_requests", 0),
+               "failures": agg.get("num_failures", 0)}
+    if best_step:
+        summary.update(rps=best_step["rps"], p50_ms=best_step["p50"], p95_ms=best_step["p95"],
+                       p99_ms=best_step["p99"], fail_pct=best_step["error_pct"],
+                       max_sustainable_rps=best_step["rps"], knee_rps=knee["rps"],
+                       knee_users=knee["users"])
+    return {"scenario": {key: v for key, v in scenario.items() if key != "inject"},
+            "started_at": started_at,
+            "ended_at": datetime.now().isoformat(timespec="seconds"),
+            "timeline": [],
+            "summary": summary,
+            "capacity": {"slo_p99_ms": slo_p99_ms, "slo_error_pct": slo_error_pct,
+                         "factor": factor, "open_loop": open_loop, "steps": steps,
+                         "stop_reason": stop_reason,
+                         "max_sustainable_step": best_step["step"] if best_step else None,
+                         "knee_step": knee["step"] if knee else None}}
+
+
+# ── soak mode ────────────────────────────────────────────────────────────────
+# --soak 24h runs ONE scenario for a long time in fixed --soak-window windows.
+# Nothing per-second is kept past its window: each window is summarised,
+# appended to <dir>/windows.jsonl (flushed + fsync'd) and then pruned from the
+# runner's samplers and from Locust (/stats/prune). A window is read
+# SOAK_SETTLE_S behind real time so worker reports for its last seconds have
+# arrived. <dir>/state.json holds the plan; --resume <dir> restarts Locust and
+# continues after the last complete window (the outage is recorded as a gap).
+# The report streams windows.jsonl twice (count, then bucket) into at most
+# SOAK_REPORT_POINTS points — memory and report size do not grow with the run.
+
+SOAK_SETTLE_S      = 5
+SOAK_REPORT_POINTS = 500
+
+
+def _parse_duration(text):
+    """"90" / "90s" / "45m" / "24h" → seconds."""
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    text = str(text).strip().lower()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+
+def _soak_windows(path):
+    """Complete window records of a windows.jsonl; a torn last line (runner
+    killed mid-write) is cut off so appends continue cleanly."""
+    if not os.path.exists(path):
+        return 0, None
+    count, last, good = 0, None, 0
+    with open(path, "rb") as fh:
+        for line in fh:
+            try:
+                last = json.loads(line)
+            except ValueError:
+                break
+            count += 1
+            good += len(line)
+    if good != os.path.getsize(path):
+        with open(path, "r+b") as fh:
+            fh.truncate(good)
+    return count, last
+
+
+def _soak_window(i, t0, t1, prev_stats, cur_stats, samplers, mono_of):
+    """Summary of wall-clock window [t0, t1)."""
+    rows = _get_hdr(int(t0))
+    h = merge_intervals(rows, int(t0), int(t1), latency_only=True)
+    req = cur_stats["req"] - prev_stats["req"] if prev_stats and cur_stats else 0
+    fail = cur_stats["fail"] - prev_stats["fail"] if prev_stats and cur_stats else 0
+    lo, hi = mono_of(t0), mono_of(t1)
+    lag = [v for t, v in samplers["lag"].samples if lo <= t < hi]
+    lag_bytes = [b for b in map(_max_lag, lag) if b is not None]
+    lag_s = [s for s in (_max_lag(v, "replay_s") for v in lag) if s is not None]
+    leaders = sorted({v.get("leader") for t, v in samplers["cluster"].samples
+                      if lo <= t < hi and v.get("leader")})
+    wal = [(t, v) for t, v in samplers["wal"].samples if lo <= t < hi]
+    gen = _generator_summary([r for r in _get_generator(int(t0)) if r[0] < int(t1)], WORKERS)
+    return {"i": i, "t0": round(t0, 1), "t1": round(t1, 1),
+            "requests": req, "failures": fail,
+            "rps": round(req / max(t1 - t0, 1e-6), 1),
+            "fail_pct": round(100 * fail / max(req, 1), 2),
+            **({k: v for k, v in h.summary().items() if k != "count"} if h.count else {}),
+            "lag_max": max(lag_bytes) if lag_bytes else None,
+            "replay_lag_max_s": max(lag_s) if lag_s else None,
+            "leaders": leaders,
+            "wal_mb_s": _wal_mb_s(wal),
+            "gen_cpu_max": max((n["cpu_max"] for n in gen["nodes"]), default=None),
+            "generator_limited": gen["limited"]}
+
+
+def run_soak(scenario: dict, soak_dir: str, duration_s: int, window_s: int) -> str:
+    """Run (or resume) a soak in soak_dir; returns the windows.jsonl path."""
+    os.makedirs(soak_dir, exist_ok=True)
+    state_path = os.path.join(soak_dir, "state.json")
+    windows_path = os.path.join(soak_dir, "windows.jsonl")
+    if scenario.get("inject"):
+        print(f"  [soak] {scenario['id']}: fault injection is ignored, steady load only")
+    if os.path.exists(state_path):
+        with open(state_path) as fh:
+            state = json.load(fh)
+    else:
+        state = {"scenario": {k: v for k, v in scenario.items() if k != "inject"},
+                 "started": time.time(), "duration_s": duration_s, "window_s": window_s,
+                 "workers": WORKERS}
+        with open(state_path, "w") as fh:
+            json.dump(state, fh, indent=2)
+    scenario, window_s = state["scenario"], state["window_s"]
+    end = state["started"] + state["duration_s"]
+    done, last = _soak_windows(windows_path)
+    print(f"\n{'='*60}")
+    print(f"  Soak: {scenario['name']}  window={window_s}s  → {soak_dir}")
+    print(f"  {done} windows on disk, {max(end - time.time(), 0) / 3600:.2f} h left")
+    print(f"{'='*60}")
+    if time.time() >= end:
+        return windows_path
+    if not wait_cluster_healthy(timeout=300):
+        print("  [SKIP] cluster did not become healthy — soak not (re)started")
+        return windows_path
+    workers = _wait_workers(WORKERS) if WORKERS else 1
+    _reset()
+    time.sleep(1)
+    _swarm(scenario["user_class"], scenario["users"], scenario["spawn_rate"],
+           scenario.get("open_loop_rps"), workers, scenario.get("reconnect_policy"),
+           scenario.get("engine"))
+    _verify_spawned(_spawned_target(scenario, scenario["users"], workers))
+
+    # window boundaries on the wall clock of the original start, so a resumed
+    # run keeps the grid; the first one after a restart begins now
+    start_mono, start_wall = time.monotonic(), time.time()
+    mono_of = lambda wall: wall - start_wall   # noqa: E731 — sampler time base
+    samplers = collectors.start_all({k: v for k, v in _samplers(start_mono).items()
+                                     if k != "stats"})
+    gap = round(start_wall - last["t1"], 1) if last else None
+    t0 = start_wall
+    prev_stats = _sample_stats()
+    i = done
+    try:
+        with open(windows_path, "a") as out:
+            while t0 < end:
+                k = int((t0 - state["started"]) // window_s) + 1
+                t1 = min(state["started"] + k * window_s, end)
+                time.sleep(max(t1 + SOAK_SETTLE_S - time.time(), 0))
+                cur_stats = _sample_stats()
+                w = _soak_window(i, t0, t1, prev_stats, cur_stats, samplers, mono_of)
+                if gap is not None:
+                    w["gap_before_s"], gap = gap, None
+                out.write(json.dumps(w) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                print(f"  [window {i}] rps={w['rps']} p99={w.get('p99')}ms "
+                      f"fail={w['fail_pct']}% lag={w['lag_max']}")
+                # forget everything older than the next window's start
+                _api("post", "/stats/prune", params={"before": int(t1)})
+                for sm in samplers.values():
+                    sm.drop_before(mono_of(t1))
+                prev_stats, t0, i = cur_stats, t1, i + 1
+    finally:
+        collectors.stop_all(samplers)
+        _stop_and_wait()
+    return windows_path
+
+
+def _soak_result(soak_dir):
+    """One result dict for generate_report, built by streaming windows.jsonl:
+    totals over every window, timeline downsampled to SOAK_REPORT_POINTS."""
+    with open(os.path.join(soak_dir, "state.json")) as fh:
+        state = json.load(fh)
+    path = os.path.join(soak_dir, "windows.jsonl")
+    n, _ = _soak_windows(path)
+    per = max(-(-n // SOAK_REPORT_POINTS), 1)          # windows per report point
+    timeline, bucket = [], []
+    tot = {"req": 0, "fail": 0, "p99": 0.0, "max": 0.0, "gaps": 0, "gap_s": 0.0,
+           "leaders": set(), "limited": 0}
+
+    def flush():
+        dt = sum(w["t1"] - w["t0"] for w in bucket) or 1
+        worst = lambda key: max((w[key] for w in bucket if w.get(key) is not None),  # noqa: E731
+                                default=None)
+        timeline.append({
+            "t": round(bucket[-1]["t1"] - state["started"], 1),
+            "rps": round(sum(w["requests"] for w in bucket) / dt, 1),
+            "fail_rps": round(sum(w["failures"] for w in bucket) / dt, 1),
+            # percentiles of a bucket: the worst window (a merge would need histograms)
+            "p50": worst("p50"), "p95": worst("p95"), "p99": worst("p99"),
+            "p999": worst("p999"), "max": worst("max"), "lag": worst("lag_max"),
+            "lag_s": worst("replay_lag_max_s"),
+            "wal_mbps": worst("wal_mb_s"), "gen_cpu": worst("gen_cpu_max"),
+            "leader": (bucket[-1].get("leaders") or [None])[-1]})
+        bucket.clear()
+
+    with open(path) as fh:
+        for line_no, line in enumerate(fh):
+            if line_no >= n:
+                break
+            w = json.loads(line)
+            tot["req"] += w["requests"]
+            tot["fail"] += w["failures"]
+            tot["p99"] = max(tot["p99"], w.get("p99") or 0)
+            tot["max"] = max(tot["max"], w.get("max") or 0)
+            tot["leaders"].update(w.get("leaders", []))
+            tot["limited"] += bool(w.get("generator_limited"))
+            if w.get("gap_before_s"):
+                tot["gaps"] += 1
+                tot["gap_s"] += w["gap_before_s"]
+            bucket.append(w)
+            if len(bucket) == per:
+                flush()
+    if bucket:
+        flush()
+    span = timeline[-1]["t"] if timeline else 0
+    scenario = dict(state["scenario"], duration=round(span),
+                    name=f"Soak — {state['scenario']['name']}")
+    summary = {"total_requests": tot["req"], "failures": tot["fail"],
+               "rps": round(tot["req"] / max(span - tot["gap_s"], 1), 1),
+               "fail_pct": round(100 * tot["fail"] / max(tot["req"], 1), 2),
+               "p99_ms": tot["p99"], "max_ms": tot["max"],
+               "windows": n, "window_s": state["window_s"],
+               "restarts": tot["gaps"], "downtime_s": round(tot["gap_s"], 1),
+               "leaders_seen": sorted(tot["leaders"]),
+               "generator_limited": tot["limited"] > 0.1 * max(n, 1)}
+    return {"scenario": scenario, "summary": summary, "timeline": timeline,
+            "soak": {"dir": soak_dir, "points_per_window": per}}
+
+
 def _estimate_rto(timeline, inject_t):
     """Outage = first sample after injection with failures or zero throughput,
     until the first of >=2 consecutive clean samples. Returns (rto_s,
@@ -658,6 +1773,7 @@ _HTML_TMPL = """\
   .tag {{ display:inline-block; padding:.15rem .5rem; border-radius:4px; font-size:.75rem; margin-left:.5rem; }}
   .tag-ha {{ background:#4c1d95; color:#c4b5fd; }}
   .tag-base {{ background:#1e3a2e; color:#6ee7b7; }}
+  .tag-gen {{ background:#4a1d1d; color:#fca5a5; }}
 </style>
 </head>
 <body>
@@ -671,17 +1787,20 @@ _HTML_TMPL = """\
 <table>
 <thead><tr>
   <th>Scenario</th><th>Users</th><th>Requests</th><th>Fail%</th>
-  <th>Avg ms</th><th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>RPS</th>
-  <th>RTO</th><th>Recovered</th><th>Cluster stable</th>
+  <th>Avg ms</th><th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>P99.9 ms</th><th>Max ms</th>
+  <th>RPS</th><th>RTO</th><th>Recovered</th><th>Cluster stable</th>
 </tr></thead>
 <tbody>
 {summary_rows}
 </tbody>
 </table>
 <p style="color:var(--muted);font-size:.8rem;margin-top:.5rem;">
-RTO = duration of the observed outage window (first failing/stalled 2&nbsp;s sample after
-injection → first of two consecutive clean samples). Timeline charts plot per-interval
-deltas, not cumulative averages.</p>
+RTO = duration of the observed outage window. FailoverProbe scenarios: from the probe's
+per-request event log — send time of the first failed/stalled (&gt;1&nbsp;s) request after
+injection → completion of the first request of 10 consecutive clean ones (ms precision).
+Otherwise: first failing/stalled 2&nbsp;s sample → first of two consecutive clean samples. Timeline charts plot per-interval
+deltas, not cumulative averages. Latency percentiles per interval, P99.9 and Max come from
+per-second HDR histograms merged across all workers (&lt;1% bucket error).</p>
 </div>
 
 <div class="section">
@@ -690,15 +1809,19 @@ deltas, not cumulative averages.</p>
 </div>
 
 <div class="section">
-<h2 style="margin-bottom:1rem;font-size:1.1rem;">Latency Over Time (P50 / P95 ms)</h2>
+<h2 style="margin-bottom:1rem;font-size:1.1rem;">Latency Over Time (P50 / P95 / P99 / P99.9 / Max ms)</h2>
 {latency_charts}
 </div>
 
 <div class="section">
-<h2 style="margin-bottom:1rem;font-size:1.1rem;">Replication Lag Over Time (MB behind primary)</h2>
+<h2 style="margin-bottom:1rem;font-size:1.1rem;">Replication Lag Over Time (MB behind primary) &amp; WAL Rate (MB/s)</h2>
 {lag_charts}
 </div>
 
+{backend_section}
+
+{capacity_section}
+
 <div class="section">
 <h2 style="margin-bottom:1rem;font-size:1.1rem;">Per-Operation Breakdown &amp; Errors</h2>
 {ops_sections}
@@ -749,6 +1872,7 @@ def _environment_html(env):
      <b>Database size:</b> {env.get('database_size', '?')} &nbsp;•&nbsp;
      <b>Cluster at start:</b> leader={cluster.get('leader')}, timeline={cluster.get('timeline')},
      members: {', '.join(cluster.get('members', []))}<br>
+     <b>Locust workers:</b> {env.get('locust_workers', '?')} &nbsp;•&nbsp;
      <b>Captured:</b> {env.get('captured_at', '?')}</p>
   <table>
     <thead><tr><th>Node</th><th>CPU</th><th>Cores</th><th>RAM</th><th>Kernel</th><th>OS</th></tr></thead>
@@ -776,7 +1900,7 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
     generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     summary_rows, rps_charts, latency_charts, chart_scripts = [], [], [], []
-    lag_charts, ops_sections = [], []
+    lag_charts, ops_sections, backend_charts, capacity_charts = [], [], [], []
 
     for i, res in enumerate(results):
         sc = res["scenario"]
@@ -785,6 +1909,10 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
         inject = res.get("inject_resolved")
         tag_html = ('<span class="tag tag-ha">HA</span>' if inject
                     else '<span class="tag tag-base">Baseline</span>')
+        if sm.get("generator_limited"):
+            tag_html += '<span class="tag tag-gen">generator-limited</span>'
+        if sm.get("aborted"):
+            tag_html += '<span class="tag tag-gen">aborted</span>'
 
         fail_pct = sm.get("fail_pct", 0)
         rto = sm.get("rto_s")
@@ -815,12 +1943,61 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
   <td>{sm.get('p50_ms', '—')}</td>
   <td>{sm.get('p95_ms', '—')}</td>
   <td>{sm.get('p99_ms', '—')}</td>
+  <td>{sm.get('p999_ms', '—')}</td>
+  <td>{sm.get('max_ms', '—')}</td>
   <td>{sm.get('rps', '—')}</td>
   <td class="{rto_cls}">{rto_str}</td>
   <td class="{rec_cls}">{rec_str}</td>
   <td class="{stable_cls}">{stable_str}</td>
 </tr>""")
 
+        cap = res.get("capacity")
+        if cap and cap.get("steps"):
+            cid = f"cap_{i}"
+            knee, best = cap.get("knee_step"), cap.get("max_sustainable_step")
+            step_rows = "".join(
+                f"<tr><td>{st['step']}{' ◆ knee' if st['step'] == knee else ''}"
+                f"{' ★ max' if st['step'] == best else ''}</td><td>{st['users']}</td>"
+                f"<td>{st.get('offered_rps') or '—'}</td><td>{st.get('rps', '—')}</td>"
+                f"<td>{st.get('p50', '—')}</td><td>{st.get('p95', '—')}</td>"
+                f"<td class=\"{'ok' if st['within_slo'] else 'bad'}\">{st.get('p99', '—')}</td>"
+                f"<td>{st.get('error_pct', '—')}%</td>"
+                f"<td>{'yes' if st['stable'] else 'no'} ({st['hold_s']}s)</td></tr>"
+                for st in cap["steps"])
+            capacity_charts.append(f"""
+<div class="chart-wrap">
+  <h2>{sc['name']}</h2>
+  <p>SLO p99 ≤ {cap['slo_p99_ms']:g} ms, errors ≤ {cap['slo_error_pct']:g}% &nbsp;•&nbsp;
+     max sustainable <b>{sm.get('max_sustainable_rps', '—')} req/s</b> &nbsp;•&nbsp;
+     knee {sm.get('knee_rps', '—')} req/s at {sm.get('knee_users', '—')} users &nbsp;•&nbsp;
+     stopped: {cap['stop_reason']}</p>
+  <canvas id="{cid}" height="80"></canvas>
+  <table>
+    <thead><tr><th>Step</th><th>Users</th><th>Offered req/s</th><th>Achieved req/s</th>
+    <th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>Errors</th><th>Stable</th></tr></thead>
+    <tbody>{step_rows}</tbody>
+  </table>
+</div>""")
+            pts = [st for st in cap["steps"] if st.get("rps") is not None]
+            curve = {key: json.dumps([{"x": st["rps"], "y": st.get(key)} for st in pts])
+                     for key in ("p50", "p95", "p99")}
+            knee_pt = json.dumps([{"x": st["rps"], "y": st["p99"]} for st in pts
+                                  if st["step"] == knee])
+            chart_scripts.append(f"""
+new Chart(document.getElementById('{cid}'), {{
+  type:'scatter', data:{{ datasets:[
+      {{label:'P50 ms', data:{curve['p50']}, borderColor:'#00d085', showLine:true, tension:.2}},
+      {{label:'P95 ms', data:{curve['p95']}, borderColor:'#f6c90e', showLine:true, tension:.2}},
+      {{label:'P99 ms', data:{curve['p99']}, borderColor:'#fb923c', showLine:true, tension:.2}},
+      {{label:'Knee', data:{knee_pt}, borderColor:'#ff4757', backgroundColor:'#ff4757',
+        pointRadius:7, pointStyle:'rectRot'}}
+  ]}}, options:{{...chartDefaults, scales:{{
+      x:{{...chartDefaults.scales.x, type:'linear',
+          title:{{display:true, text:'achieved req/s', color:'#94a3b8'}}}},
+      y:{{...chartDefaults.scales.y, title:{{display:true, text:'latency ms', color:'#94a3b8'}}}}
+  }}}}
+}});""")
+
         if tl:
             cid = f"chart_{i}"
             labels = json.dumps([f"{pt['t']:.0f}s" for pt in tl])
@@ -828,10 +2005,44 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
             fail_data = json.dumps([pt["fail_rps"] for pt in tl])
             p50_data = json.dumps([pt["p50"] for pt in tl])
             p95_data = json.dumps([pt["p95"] for pt in tl])
+            p99_data = json.dumps([pt.get("p99") for pt in tl])
+            p999_data = json.dumps([pt.get("p999") for pt in tl])
+            max_data = json.dumps([pt.get("max") for pt in tl])
+            loop_lag_data = json.dumps([pt.get("loop_lag_ms") for pt in tl])
             lag_data = json.dumps([round((pt.get("lag") or 0) / 1048576, 2) for pt in tl])
+            wal_data = json.dumps([pt.get("wal_mbps") for pt in tl])
+            server_tps = ""
+            if any(pt.get("server_tps") is not None for pt in tl):
+                server_tps = (f",\n      {{label:'Server TPS (pg_stat_database)', "
+                              f"data:{json.dumps([pt.get('server_tps') for pt in tl])}, "
+                              f"borderColor:'#00d085', borderDash:[4,3], tension:.3, pointRadius:0}}")
+            # per replica at pg_stat_replication resolution: MB behind (fill)
+            # and replay lag seconds (dashed, right axis); WAL rate from the timeline
+            palette = ["#38bdf8", "#00d085", "#f6c90e", "#ff4757"]
+            lag_sets = []
+            for j, (name, pts) in enumerate(sorted(res.get("replication", {}).items())):
+                color = palette[j % len(palette)]
+                lag_sets.append({"label": f"{name} behind (MB)", "borderColor": color,
+                                 "data": [{"x": p[0], "y": round(p[1] / 1048576, 3)}
+                                          for p in pts],
+                                 "pointRadius": 0, "borderWidth": 1.5})
+                lag_sets.append({"label": f"{name} replay lag (s)", "borderColor": color,
+                                 "data": [{"x": p[0], "y": p[4]} for p in pts],
+                                 "borderDash": [4, 3], "yAxisID": "y1",
+                                 "pointRadius": 0, "borderWidth": 1})
+            if lag_sets:
+                lag_sets.append({"label": "WAL generated (MB/s)", "borderColor": "#fb923c",
+                                 "data": [{"x": pt["t"], "y": pt.get("wal_mbps")} for pt in tl],
+                                 "pointRadius": 0, "tension": .3})
             parts = []
             if res.get("started_at"):
                 parts.append(f"run {res['started_at']} → {res.get('ended_at', '?')}")
+            if sc.get("open_loop_rps"):
+                parts.append(f"open loop {sum(sc['open_loop_rps'].values()):g} req/s "
+                             f"(<code>{format_rates(sc['open_loop_rps'])}</code>)")
+            if sc.get("engine"):
+                parts.append(f"async engine, {sc['users']} in flight "
+                             f"(<code>{format_rates(sc['engine'].get('mix', {}))}</code>)")
             before, after = res.get("cluster_before", {}), res.get("cluster_after", {})
             if before or after:
                 if before.get("leader") != after.get("leader") or \
@@ -854,6 +2065,67 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
                                  f"<code>{inject['stable_cmd']}</code>")
                 if sm.get("stabilize_s") is not None:
                     parts.append(f"cluster stable after {sm['stabilize_s']}s")
+            probe = res.get("probe")
+            if probe:
+                parts.append(f"probe log: outage {probe['rto_s']}s, detected "
+                             f"{probe['detect_lag_s']}s after inject, first success at "
+                             f"t+{probe['first_success_s']}s, {probe['failed_requests']} failed "
+                             f"requests ({', '.join(probe.get('error_classes', [])) or '—'}); "
+                             f"backend {probe['backend_before']} → {probe['backend_after']}")
+            if sm.get("rows_written_s"):
+                parts.append(f"ingest {sm['rows_written_s']} rows/s written"
+                             + (f", WAL {sm['wal_mb_s']} MB/s" if sm.get("wal_mb_s") is not None
+                                else ""))
+            elif sm.get("wal_mb_s") is not None:
+                parts.append(f"WAL {sm['wal_mb_s']} MB/s")
+            srv = res.get("server") or {}
+            if srv.get("error"):
+                parts.append(f"server counters: {srv['error']}")
+            elif srv.get("tps") is not None:
+                text = (f"server {srv['tps']} TPS ({srv['rollbacks']} rollbacks), "
+                        f"cache hit {srv.get('cache_hit_pct', '—')}%")
+                if srv.get("wal_mb_s") is not None:
+                    text += f", WAL {srv['wal_mb_s']} MB/s ({srv['wal_fpi']} FPI)"
+                if "checkpoints_timed" in srv:
+                    text += (f", checkpoints {srv['checkpoints_timed']} timed / "
+                             f"{srv['checkpoints_requested']} requested")
+                if srv.get("deadlocks"):
+                    text += f", <b>{srv['deadlocks']} deadlocks</b>"
+                if srv.get("temp_mb"):
+                    text += f", temp {srv['temp_mb']} MB"
+                parts.append(text)
+            if sm.get("lag_max_mb") is not None:
+                parts.append(f"replication lag max {sm['lag_max_mb']} MB"
+                             + (f" / {sm['replay_lag_max_s']} s replay"
+                                if sm.get("replay_lag_max_s") is not None else ""))
+            slow = [f"{name} max gap {h['max_gap_s']}s ({h['missed_ticks']} ticks missed)"
+                    for name, h in res.get("sampling", {}).items() if h.get("missed_ticks")]
+            if slow:
+                parts.append("sampling: " + ", ".join(slow))
+            gen = res.get("generator") or {}
+            if gen.get("nodes"):
+                n = gen["nodes"]
+                text = (f"{len(n)} load process{'es' if len(n) > 1 else ''}, CPU mean "
+                        f"{max(w['cpu_mean'] for w in n)}% / max {max(w['cpu_max'] for w in n)}%, "
+                        f"loop lag max {max(w['loop_lag_max_ms'] for w in n)} ms, "
+                        f"GC {max(w['gc_ms_s'] for w in n)} ms/s")
+                parts.append(f"<b style='color:#c0392b'>generator-limited</b> "
+                             f"({', '.join(gen['reasons'])}; {text})"
+                             if gen.get("limited") else f"generator: {text}")
+            if sm.get("connects_s") is not None:
+                parts.append(f"{sm['connects_s']} connects/s, CONNECT p50 "
+                             f"{sm['connect_p50_ms']} / p99 {sm['connect_p99_ms']} ms")
+            if sm.get("handshakes"):
+                parts.append("handshakes: " + ", ".join(
+                    f"<b>{mode}</b> {h['connects_s']}/s p50 {h['p50_ms']} / p99 {h['p99_ms']} ms"
+                    for mode, h in sm["handshakes"].items()))
+            if sm.get("reconnects"):
+                parts.append(f"reconnect policy <b>{sm.get('reconnect_policy', 'default')}</b>: "
+                             f"{sm['reconnects']} client outages, downtime p50 "
+                             f"{sm['reconnect_p50_ms']} / p99 {sm['reconnect_p99_ms']} / max "
+                             f"{sm['reconnect_max_ms']} ms")
+            if sm.get("aborted"):
+                parts.append(f"<b style='color:#c0392b'>aborted</b>: {sm['aborted']}")
             meta = " &nbsp;•&nbsp; ".join(parts)
 
             rps_charts.append(f"""
@@ -873,13 +2145,83 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
   <canvas id="{cid}_lag" height="60"></canvas>
 </div>""")
 
+            backends = res.get("backends", [])
+            if backends:
+                palette = ["#6c63ff", "#00d085", "#f6c90e", "#fb923c", "#38bdf8", "#ff4757"]
+                be_rows = "".join(
+                    f"<tr><td><code>{b['backend']}</code></td><td>{b['role']}</td>"
+                    f"<td>{b['requests']}</td>"
+                    f"<td class=\"{'bad' if b['failures'] else 'ok'}\">{b['failures']}</td>"
+                    f"<td>{b['share_pct']}%</td><td>{b['p50_ms']}</td><td>{b['p95_ms']}</td>"
+                    f"<td>{b['p99_ms']}</td><td>{b['first_s']}s → {b['last_s']}s</td></tr>"
+                    for b in backends)
+                backend_charts.append(f"""
+<div class="chart-wrap">
+  <h2>{sc['name']}</h2>
+  <table>
+    <thead><tr><th>Backend</th><th>Role</th><th>Served</th><th>Failures</th><th>Share</th>
+    <th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>Seen</th></tr></thead>
+    <tbody>{be_rows}</tbody>
+  </table>
+  <canvas id="{cid}_be_rps" height="70"></canvas>
+  <canvas id="{cid}_be_lat" height="70"></canvas>
+</div>""")
+                rps_sets = ",\n      ".join(
+                    f"{{label:{json.dumps(b['backend'] + ' (' + b['role'] + ') RPS')}, "
+                    f"data:{json.dumps([p['rps'] for p in b['points']])}, "
+                    f"borderColor:'{palette[n % len(palette)]}', tension:.3, pointRadius:0}}"
+                    for n, b in enumerate(backends))
+                lat_sets = ",\n      ".join(
+                    f"{{label:{json.dumps(b['backend'] + ' P95 ms')}, "
+                    f"data:{json.dumps([p['p95'] for p in b['points']])}, "
+                    f"borderColor:'{palette[n % len(palette)]}', spanGaps:false, tension:.3, pointRadius:0}}"
+                    for n, b in enumerate(backends))
+                chart_scripts.append(f"""
+new Chart(document.getElementById('{cid}_be_rps'), {{
+  type:'line', data:{{ labels:{labels}, datasets:[
+      {rps_sets}
+  ]}}, options:chartDefaults
+}});
+new Chart(document.getElementById('{cid}_be_lat'), {{
+  type:'line', data:{{ labels:{labels}, datasets:[
+      {lat_sets}
+  ]}}, options:chartDefaults
+}});""")
+
             ops = res.get("operations", [])
             errs = res.get("errors", [])
+            phase_html = ""
+            stmt_html = ""
+            stmts = (res.get("server") or {}).get("statements")
+            if stmts:
+                stmt_rows = "".join(
+                    f"<tr><td><code>{escape(s['query'])}</code></td><td>{s['calls']}</td>"
+                    f"<td>{s['mean_ms']}</td><td>{s['stddev_ms']}</td><td>{s['total_ms']}</td>"
+                    f"<td>{s['rows']}</td><td>{s['hit_pct'] if s['hit_pct'] is not None else '—'}"
+                    f"</td></tr>" for s in stmts)
+                stmt_html = (f"<details style='margin-top:1rem;'><summary style='cursor:pointer;"
+                             f"color:var(--accent);'>Server-side statements "
+                             f"(pg_stat_statements, calls during this scenario)</summary>"
+                             f"<table><thead><tr><th>Query</th><th>Calls</th><th>Mean ms</th>"
+                             f"<th>Stddev ms</th><th>Total ms</th><th>Rows</th><th>Hit %</th>"
+                             f"</tr></thead><tbody>{stmt_rows}</tbody></table></details>")
+            if res.get("phases"):
+                phase_rows = "".join(
+                    f"<tr><td>{p['op']}</td><td>{p['phase']}</td><td>{p['count']}</td>"
+                    f"<td>{p['avg_ms']}</td><td>{p['max_ms']}</td></tr>"
+                    for p in res["phases"])
+                phase_html = (f"<details style='margin-top:1rem;'><summary style='cursor:pointer;"
+                              f"color:var(--accent);'>Client-side phase breakdown "
+                              f"(connect / prepare / execute / fetch / overhead)</summary>"
+                              f"<table><thead><tr><th>Operation</th><th>Phase</th><th>Count</th>"
+                              f"<th>Avg ms</th><th>Max ms</th></tr></thead>"
+                              f"<tbody>{phase_rows}</tbody></table></details>")
             ops_rows = "".join(
                 f"<tr><td>{o['op']}</td><td>{o['requests']}</td>"
                 f"<td class=\"{'bad' if o['failures'] else 'ok'}\">{o['failures']}</td>"
                 f"<td>{o['avg_ms']}</td><td>{o['p50_ms']}</td><td>{o['p95_ms']}</td>"
-                f"<td>{o['p99_ms']}</td><td>{o['max_ms']}</td></tr>"
+                f"<td>{o['p99_ms']}</td><td>{o.get('p999_ms', '—')}</td><td>{o['max_ms']}</td>"
+                f"<td>{o['abort_pct'] if 'abort_pct' in o else '—'}</td></tr>"
                 for o in ops)
             err_html = ""
             if errs:
@@ -895,9 +2237,12 @@ def generate_report(results: list, output_path: str, environment=None, run_windo
   <h2>{sc['name']}</h2>
   <table>
     <thead><tr><th>Operation</th><th>Requests</th><th>Failures</th>
-    <th>Avg ms</th><th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>Max ms</th></tr></thead>
+    <th>Avg ms</th><th>P50 ms</th><th>P95 ms</th><th>P99 ms</th><th>P99.9 ms</th><th>Max ms</th>
+    <th>Abort %</th></tr></thead>
     <tbody>{ops_rows}</tbody>
   </table>
+  {phase_html}
+  {stmt_html}
   {err_html}
 </div>""")
 
@@ -907,7 +2252,7 @@ new Chart(document.getElementById('{cid}_rps'), {{
     labels:{labels},
     datasets:[
       {{label:'RPS',      data:{rps_data},  borderColor:'#6c63ff', backgroundColor:'rgba(108,99,255,.15)', fill:true, tension:.3, pointRadius:0}},
-      {{label:'Fail RPS', data:{fail_data}, borderColor:'#ff4757', backgroundColor:'rgba(255,71,87,.15)',  fill:true, tension:.3, pointRadius:0}}
+      {{label:'Fail RPS', data:{fail_data}, borderColor:'#ff4757', backgroundColor:'rgba(255,71,87,.15)',  fill:true, tension:.3, pointRadius:0}}{server_tps}
     ]
   }}, options:chartDefaults
 }});
@@ -916,19 +2261,36 @@ new Chart(document.getElementById('{cid}_lat'), {{
     labels:{labels},
     datasets:[
       {{label:'P50 ms', data:{p50_data}, borderColor:'#00d085', tension:.3, pointRadius:0}},
-      {{label:'P95 ms', data:{p95_data}, borderColor:'#f6c90e', tension:.3, pointRadius:0}}
+      {{label:'P95 ms', data:{p95_data}, borderColor:'#f6c90e', tension:.3, pointRadius:0}},
+      {{label:'P99 ms', data:{p99_data}, borderColor:'#fb923c', tension:.3, pointRadius:0}},
+      {{label:'P99.9 ms', data:{p999_data}, borderColor:'#ff4757', tension:.3, pointRadius:0}},
+      {{label:'Max ms', data:{max_data}, borderColor:'#94a3b8', borderDash:[4,4], tension:0, pointRadius:0, hidden:true}},
+      {{label:'Generator loop lag ms', data:{loop_lag_data}, borderColor:'#f97316', borderDash:[2,3], tension:0, pointRadius:0}}
     ]
   }}, options:chartDefaults
 }});
+""" + (f"""
+new Chart(document.getElementById('{cid}_lag'), {{
+  type:'line', data:{{ datasets:{json.dumps(lag_sets)} }},
+  options:{{...chartDefaults, scales:{{
+      x:{{...chartDefaults.scales.x, type:'linear',
+          title:{{display:true, text:'s since start', color:'#94a3b8'}}}},
+      y:{{...chartDefaults.scales.y, title:{{display:true, text:'MB', color:'#94a3b8'}}}},
+      y1:{{...chartDefaults.scales.y, position:'right', grid:{{drawOnChartArea:false}},
+           title:{{display:true, text:'replay lag s', color:'#94a3b8'}}}}
+  }}}}
+}});""" if lag_sets else f"""
 new Chart(document.getElementById('{cid}_lag'), {{
   type:'line', data:{{
     labels:{labels},
     datasets:[
       {{label:'Max replica lag (MB)', data:{lag_data}, borderColor:'#38bdf8',
-        backgroundColor:'rgba(56,189,248,.15)', fill:true, tension:.3, pointRadius:0}}
+        backgroundColor:'rgba(56,189,248,.15)', fill:true, tension:.3, pointRadius:0}},
+      {{label:'WAL generated (MB/s)', data:{wal_data}, borderColor:'#fb923c',
+        tension:.3, pointRadius:0}}
     ]
   }}, options:chartDefaults
-}});""")
+}});"""))
 
     html = _HTML_TMPL.format(
         generated=generated,
@@ -942,6 +2304,22 @@ new Chart(document.getElementById('{cid}_lag'), {{
         latency_charts="\n".join(latency_charts) or "",
         lag_charts="\n".join(lag_charts) or "",
         ops_sections="\n".join(ops_sections) or "",
+        backend_section=(f"""<div class="section">
+<h2 style="margin-bottom:1rem;font-size:1.1rem;">Per-Backend Routing (served req/s and P95 ms per server)</h2>
+<p style="color:var(--muted);font-size:.85rem;margin-bottom:1rem;">Backend identity is sampled
+per session after every connect and every PG_BACKEND_SAMPLE_EVERY queries
+(<code>inet_server_addr()</code>, <code>pg_is_in_recovery()</code>); write sessions sample with
+<code>/*NO LOAD BALANCE*/</code>. Shows read spread across replicas and when traffic moved
+to a new primary.</p>
+{"".join(backend_charts)}
+</div>""" if backend_charts else ""),
+        capacity_section=(f"""<div class="section">
+<h2 style="margin-bottom:1rem;font-size:1.1rem;">Capacity Search (latency vs throughput)</h2>
+<p style="color:var(--muted);font-size:.85rem;margin-bottom:1rem;">Load stepped up until the SLO
+broke; every point is one step held until throughput and p99 were stable, latencies from the
+merged HDR histograms. Knee = highest req/s ÷ p99 within the SLO.</p>
+{"".join(capacity_charts)}
+</div>""" if capacity_charts else ""),
         chart_scripts="\n".join(chart_scripts),
     )
 
@@ -960,6 +2338,30 @@ def main():
     parser.add_argument("--override-duration", type=int, default=0,
                         help="Cap every scenario duration (smoke testing)")
     parser.add_argument("--dry-run", action="store_true", help="Print scenario list and exit")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Locust worker processes next to a master (default: CPU count); "
+                             "0 = one standalone process")
+    parser.add_argument("--master-port", type=int, default=5557,
+                        help="master ↔ worker port (distributed mode)")
+    parser.add_argument("--capacity-search", action="store_true",
+                        help="Step-ramp each selected non-HA scenario until the SLO breaks "
+                             "(users, or req/s for open-loop scenarios)")
+    parser.add_argument("--slo-p99-ms", type=float, default=250.0,
+                        help="capacity search: p99 latency SLO (ms)")
+    parser.add_argument("--slo-error-pct", type=float, default=1.0,
+                        help="capacity search: error-rate SLO (%%)")
+    parser.add_argument("--capacity-factor", type=float, default=1.5,
+                        help="capacity search: load multiplier per step")
+    parser.add_argument("--capacity-max-steps", type=int, default=12)
+    parser.add_argument("--soak", default="",
+                        help="Soak mode: run the first selected scenario for this long "
+                             "(e.g. 24h, 90m) in rolling windows persisted to disk")
+    parser.add_argument("--soak-window", type=int, default=60, help="soak window length (s)")
+    parser.add_argument("--resume", default="",
+                        help="Resume the soak whose directory (reports/soak_*) is given")
+    parser.add_argument("--generator-guard", choices=("warn", "abort"), default="warn",
+                        help="when the load generator saturates: flag the scenario (warn) "
+                             f"or also stop it after {GEN_ABORT_AFTER_S}s in a row (abort)")
     args = parser.parse_args()
 
     selected = [s for s in SCENARIOS if not args.scenarios or s["id"] in args.scenarios]
@@ -969,6 +2371,11 @@ def main():
             print(f"  {s['id']:<35} {s['name']}")
         return
 
+    soak_dir = args.resume or ""
+    if args.soak and not soak_dir:
+        soak_dir = os.path.join(config.REPORTS_DIR,
+                                f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
     if args.override_duration:
         for s in selected:
             s["duration"] = min(s["duration"], args.override_duration)
@@ -989,28 +2396,58 @@ def main():
         if inj.get("stable_cmd"):
             print(f"  {inj.get('stable_name', 'stable-check'):<32} {inj['stable_cmd']}")
 
-    # start locust in standalone web mode — API on /swarm controls start/stop
+    # start locust in web mode — API on /swarm controls start/stop. One
+    # gevent process tops out at one core, so by default a master plus one
+    # worker per CPU; the master only aggregates and serves the API.
+    global WORKERS, GENERATOR_GUARD
+    WORKERS = max(args.workers, 0)
+    GENERATOR_GUARD = args.generator_guard
+    locustfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locustfile.py")
     locust_cmd = [
         sys.executable, "-m", "locust",
-        "-f", os.path.join(os.path.dirname(__file__), "locustfile.py"),
+        "-f", locustfile,
         "--web-host", "127.0.0.1",
         "--web-port", str(args.locust_port),
         "--class-picker",   # REQUIRED: /swarm's user_classes is ignored without it
     ]
-    print(f"Starting Locust (standalone) on port {args.locust_port} …")
+    if WORKERS:
+        locust_cmd += ["--master", "--master-bind-host", "127.0.0.1",
+                       "--master-bind-port", str(args.master_port)]
+        print(f"Starting Locust master on port {args.locust_port} + {WORKERS} workers …")
+    else:
+        print(f"Starting Locust (standalone) on port {args.locust_port} …")
     proc = subprocess.Popen(locust_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    worker_procs = [
+        subprocess.Popen([sys.executable, "-m", "locust", "-f", locustfile, "--worker",
+                          "--master-host", "127.0.0.1", "--master-port", str(args.master_port)],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(WORKERS)]
 
     results = []
     try:
         if not _wait_locust_ready(timeout=30):
             print("ERROR: Locust master did not start in time.")
-            proc.terminate()
             sys.exit(1)
         print("Locust master ready.")
+        if WORKERS:
+            connected = _wait_workers(WORKERS, timeout=60)
+            if not connected:
+                print("ERROR: no Locust worker connected to the master.")
+                sys.exit(1)
+            print(f"{connected}/{WORKERS} workers connected.")
 
         environment = capture_environment()
 
-        for scenario in selected:
+        for scenario in selected if not soak_dir else []:
+            if args.capacity_search:
+                if scenario.get("inject"):
+                    print(f"  [capacity] skipping HA scenario {scenario['id']}")
+                    continue
+                results.append(run_capacity_search(
+                    scenario, args.slo_p99_ms, args.slo_error_pct,
+                    args.capacity_factor, args.capacity_max_steps))
+                time.sleep(5)
+                continue
             result = run_scenario(scenario)
             results.append(result)
             sm = result.get("summary", {})
@@ -1021,17 +2458,25 @@ def main():
                   f"stable={sm.get('cluster_stable','—')} in {sm.get('stabilize_s','—')}s")
             time.sleep(5)
 
+        if soak_dir:
+            run_soak(selected[0], soak_dir, _parse_duration(args.soak or 0), args.soak_window)
+
         # leave the cluster healthy after the last scenario
         wait_cluster_healthy(timeout=300, label="final")
 
     finally:
-        proc.terminate()
-        try:
-            proc.wait(timeout=10)
-        except subprocess.TimeoutExpired:
-            proc.kill()
+        for p in worker_procs + [proc]:
+            p.terminate()
+        for p in worker_procs + [proc]:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
 
     run_finished = datetime.now().isoformat(timespec="seconds")
+    if soak_dir:
+        results = [_soak_result(soak_dir)]
+        output = args.output or os.path.join(soak_dir, "report.html")
     report_path = generate_report(results, output, environment=environment,
                                   run_window=f"{run_started} → {run_finished}")
     json_path = os.path.splitext(report_path)[0] + ".json"
@@ -0,0 +1,7 @@
+-- bulk_copy.sql — COPY ingestion of devices, used by BulkIngestUser.
+-- Rows come from db_tasks.BulkPayload in COPY text format, one line per row:
+--   EntityId \t DeviceStatus \t Activated \t CreationDate \t IsDeleted
+-- Keep the column list in that order if you edit this file.
+-- @op COPY
+COPY "DM"."Device" ("EntityId", "DeviceStatus", "Activated", "CreationDate", "IsDeleted")
+FROM STDIN
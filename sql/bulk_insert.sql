@@ -0,0 +1,7 @@
+-- bulk_insert.sql — multi-row device insert, used by BulkIngestUser.
+-- Write exactly ONE row tuple after VALUES: db_tasks repeats it PG_BULK_BATCH
+-- times (one statement text — and one prepared plan — per batch size).
+-- Parameters per row, in order: EntityId, DeviceStatus (db_tasks.BulkPayload).
+-- @op INSERT_BATCH
+INSERT INTO "DM"."Device" ("EntityId", "DeviceStatus", "Activated", "CreationDate", "IsDeleted")
+VALUES (%s, %s, TRUE, NOW(), FALSE);
@@ -0,0 +1,7 @@
+-- keys_device.sql — keyspace "device" for `-- @keys … device …` parameters.
+-- Re-read every PG_KEYS_REFRESH_S seconds per worker process (keygen.py).
+-- Return ONE row (min_id, max_id) for a dense ID range, or many one-column
+-- rows for a known-ID sample. MIN/MAX on the primary key are index lookups.
+-- @op KEYRANGE
+SELECT COALESCE(MIN("Id"), 0) AS lo, COALESCE(MAX("Id"), -1) AS hi
+FROM "DM"."Device";
@@ -1,5 +1,6 @@
 -- migration.sql — full DM schema.
--- Run once before benchmarking: python -c "from db_tasks import run_migration; run_migration()"
+-- Applied at test start by db_tasks.bootstrap() (with seed.sql, as one transaction,
+-- skipped while the schema fingerprint matches); datagen.py applies it too.
 -- Safe to re-run (CREATE IF NOT EXISTS / ON CONFLICT DO NOTHING).
 -- Bug fix vs original: DeviceItemHistory FK on DeviceItemId (was incorrectly DeviceId twice).
 
@@ -0,0 +1,4 @@
+-- ping.sql — one round-trip that touches no table.
+-- Used by ConnectStormUser / ReconnectUser: what they measure is the
+-- connection (handshake, reroute, reconnect), not the query.
+SELECT 1;
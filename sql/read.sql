@@ -1,12 +1,15 @@
 -- read.sql — balanced read: recent devices with status.
 -- Used by MixedUser and as a baseline single-table read.
--- No parameters required.
+-- 50 keys among the newest PG_KEY_RECENT_N devices, drawn client-side and
+-- looked up by primary key (no sort over the whole, growing table).
+-- @keys device_ids device 50 recent
 SELECT
     d."Id"            AS device_id,
     d."DeviceStatus",
     d."Activated",
     d."CreationDate"
 FROM "DM"."Device" d
-WHERE d."IsDeleted" = FALSE
+WHERE d."Id" = ANY(%(device_ids)s)
+  AND d."IsDeleted" = FALSE
 ORDER BY d."CreationDate" DESC
 LIMIT 50;
@@ -1,6 +1,8 @@
 -- read_heavy.sql — complex 8-table join + window aggregate.
--- Used by ReadHeavyUser. No parameters required (sampling via RANDOM()).
--- Exercises the read-replica load balancing in PgPool / CNPG.
+-- Used by ReadHeavyUser. Exercises the read-replica load balancing in PgPool / CNPG.
+-- The 100 devices are drawn client-side (keygen.py, PG_KEY_DIST) and looked up
+-- by primary key — cost does not grow with the table as writes add devices.
+-- @keys device_ids device 100
 SELECT
     d."Id"                          AS device_id,
     d."DeviceStatus",
@@ -24,11 +26,6 @@ LEFT JOIN "DM"."City"           c  ON c."Id"               = a."CityId" AND c."I
 LEFT JOIN "DM"."SimCard"        sc ON sc."DeviceId"         = d."Id"   AND sc."IsDeleted" = FALSE
 LEFT JOIN "DM"."DeviceItemHistory" dih ON dih."DeviceId"   = d."Id"   AND dih."IsDeleted" = FALSE
 WHERE d."IsDeleted" = FALSE
-  AND d."Id" IN (
-      SELECT "Id" FROM "DM"."Device"
-      WHERE "IsDeleted" = FALSE
-      ORDER BY RANDOM()
-      LIMIT 100
-  )
+  AND d."Id" = ANY(%(device_ids)s)
 ORDER BY d."CreationDate" DESC
 LIMIT 25;
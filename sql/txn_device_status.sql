@@ -0,0 +1,31 @@
+-- txn_device_status.sql — status change of a few devices as ONE transaction.
+-- Used by TransactionUser. The statements below run in order between
+-- BEGIN ISOLATION LEVEL … and COMMIT; @txn sets the isolation level and how
+-- often a serialization failure / deadlock is retried (PG_TXN_* override).
+-- The first read takes row locks (FOR UPDATE), which PgPool never load-balances,
+-- so the whole transaction stays on the primary. Ordered locking keeps
+-- deadlocks rare; with a skewed PG_KEY_DIST lock waits and aborts grow.
+-- @txn isolation=repeatable_read retries=3
+-- @keys device_ids device 5
+SELECT "Id", "DeviceStatus"
+FROM "DM"."Device"
+WHERE "Id" = ANY(%(device_ids)s)
+ORDER BY "Id"
+FOR UPDATE;
+
+UPDATE "DM"."Device"
+SET "DeviceStatus"     = ("DeviceStatus" %% 5) + 1,
+    "ModificationDate" = NOW()
+WHERE "Id" = ANY(%(device_ids)s);
+
+INSERT INTO "DM"."SimCard"
+    ("Number", "Serial", "NetworkOperatorType", "Activated", "DeviceId", "CreationDate", "IsDeleted")
+SELECT (9000000000 + FLOOR(RANDOM() * 999999999))::BIGINT,
+       MD5(RANDOM()::TEXT),
+       'MCI',
+       TRUE,
+       d."Id",
+       NOW(),
+       FALSE
+FROM "DM"."Device" d
+WHERE d."Id" = ANY(%(device_ids)s);
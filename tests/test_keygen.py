@@ -0,0 +1,17 @@
+"""keygen.KeySpace refresh failures."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keygen import KeyChooser, KeySpace  # noqa: E402
+
+
+def test_empty_refresh_keeps_the_old_keys():
+    answers = [[(1, 10)], []]
+    space = KeySpace(lambda _source: answers.pop(0), ttl=30)
+    chooser = KeyChooser()
+    assert len(space.keys(3, chooser)) == 3
+    space._expires = 0                       # stale: the next call refreshes
+    keys = space.keys(3, chooser)
+    assert len(keys) == 3 and all(1 <= k <= 10 for k in keys)
@@ -0,0 +1,28 @@
+"""probe_log.compute_rto recovery detection."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from probe_log import compute_rto  # noqa: E402
+
+
+def _event(end_ns, ok):
+    return {"end_ns": end_ns, "ok": ok, "latency_ms": 1.0, "op": "INSERT",
+            "error": "" if ok else "OperationalError", "backend": "a:5432"}
+
+
+def test_short_clean_tail_is_not_recovered():
+    events = [_event(10, True), _event(20, False), _event(30, True)]
+    assert compute_rto(events, inject_ns=15, clean_run=10)["recovered"] is False
+
+
+def test_full_clean_run_recovers():
+    events = [_event(20, False)] + [_event(30 + i, True) for i in range(10)]
+    assert compute_rto(events, inject_ns=15, clean_run=10)["recovered"] is True
+
+
+def test_no_outage_has_the_same_keys():
+    outage = compute_rto([_event(20, False), _event(30, True)], inject_ns=15)
+    clean = compute_rto([_event(20, True)], inject_ns=15)
+    assert clean.keys() == outage.keys() and clean["error_classes"] == []
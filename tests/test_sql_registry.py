@@ -0,0 +1,24 @@
+"""db_tasks.SqlRegistry hot reload."""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_tasks import SqlRegistry  # noqa: E402
+
+
+def test_hot_file_is_reloaded_while_called_in_a_loop(tmp_path):
+    path = tmp_path / "q.sql"
+    path.write_text("SELECT 1")
+    registry = SqlRegistry(str(tmp_path), check_every=0.2).index()
+    assert registry.get("q").text == "SELECT 1"
+
+    time.sleep(0.01)                  # a distinct mtime on coarse filesystems
+    path.write_text("SELECT 2 -- edited")
+    deadline = time.monotonic() + 1.5
+    while time.monotonic() < deadline:
+        if registry.get("q").text != "SELECT 1":
+            break
+        time.sleep(0.01)              # far more often than check_every
+    assert registry.get("q").text == "SELECT 2 -- edited"